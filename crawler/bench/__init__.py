@@ -0,0 +1 @@
+"""Micro-benchmarks. Run a module directly, e.g. ``python -m crawler.bench.bench_dedup``."""
@@ -0,0 +1,58 @@
+"""Compare per-object and batch Article validation/serialization.
+
+Usage: python -m crawler.bench.bench_articles [--n 20000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from ..models.schemas import Article
+from ..pipelines.article import articles_adapter, articles_from_rows, articles_to_rows
+
+
+def _rows(n: int):
+    return [
+        {
+            "url": f"https://example.com/news/{i}",
+            "title": f"Title {i}",
+            "text": "Lorem ipsum dolor sit amet. " * 20,
+            "authors": [],
+            "published_at": None,
+            "country": "MZ",
+            "language": "pt",
+            "source": "example-news",
+            "content_hash": f"{i:064x}",
+        }
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = _rows(args.n)
+    articles_adapter()  # exclude one-off schema build from timings
+    records = [Article(**r) for r in rows]
+
+    def best(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat))
+
+    cases = [
+        ("validate per-object", lambda: [Article(**r) for r in rows]),
+        ("validate batch", lambda: articles_from_rows(rows)),
+        ("model_construct", lambda: [Article.model_construct(**r) for r in rows]),
+        ("dump per-object", lambda: [r.model_dump() for r in records]),
+        ("dump batch", lambda: articles_to_rows(records)),
+    ]
+    for name, fn in cases:
+        t = best(fn)
+        print(f"{name:<22} {t * 1e6 / args.n:8.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
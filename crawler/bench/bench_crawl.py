@@ -0,0 +1,139 @@
+"""End-to-end crawl throughput against a local synthetic web.
+
+Starts crawler.bench.synthetic_web in a child process (so its CPU is not
+counted), then drives either ``cli.run_source`` (robots.txt sitemap
+discovery -> fetch -> parse -> optional raw writes to the in-memory backend)
+or ``workers.tasks`` crawls with N concurrent tasks, and reports pages/sec,
+CPU ms per page, RSS growth and the politeness violations the server saw.
+
+Usage:
+  python -m crawler.bench.bench_crawl [--mode run_source|tasks] [--hosts 2] [--pages 200]
+      [--latency-ms 20] [--error-rate 0.01] [--throttle-rate 0.01] [--large-rate 0.01]
+      [--concurrency 16] [--no-delay] [--write-raw]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+from .synthetic_web import SyntheticWeb, WebConfig
+
+
+def _serve(cfg: WebConfig, hosts: int, conn) -> None:
+    async def run():
+        web = SyntheticWeb(cfg, hosts=hosts)
+        conn.send(await web.start())
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu() -> float:
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    return ru.ru_utime + ru.ru_stime
+
+
+async def _drive_run_source(hosts: List[str], pages: int, write_raw: bool, state_dir: str) -> None:
+    from .. import cli
+    from ..core import blobs, catalog, discovery, journal
+    from ..ops import hoststats
+
+    path = Path(state_dir) / "sources.yaml"
+    entry = {"name": "synthetic", "country": "ZZ", "language": "pt", "base_urls": [f"{h}/" for h in hosts],
+             "discover": True, "max_pages": pages * len(hosts)}
+    path.write_text(json.dumps({"sources": [entry]}))  # JSON is valid YAML
+    catalog.DEFAULT_CATALOG_PATH = path
+    discovery.STATE_DIR = journal.STATE_DIR = blobs.STATE_DIR = hoststats.STATE_DIR = Path(state_dir)
+    await cli.run_source("synthetic", "ZZ", entry["max_pages"], write_raw=write_raw)
+
+
+async def _drive_tasks(hosts: List[str], pages: int, concurrency: int) -> None:
+    from ..core.fetch import http_client
+    from ..workers import tasks
+
+    job = {"source": "synthetic", "country": "ZZ", "language": "pt"}
+    urls = [f"{h}/p/{i}" for i in range(pages) for h in hosts]
+    sem = asyncio.Semaphore(concurrency)
+
+    async with http_client() as client:
+        async def one(url: str) -> None:
+            async with sem:
+                try:
+                    await tasks._crawl(client, job, url)
+                except Exception:
+                    pass
+
+        await asyncio.gather(*(one(u) for u in urls))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("run_source", "tasks"), default="run_source")
+    parser.add_argument("--hosts", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent tasks (tasks mode)")
+    parser.add_argument("--no-delay", action="store_true", help="Disable the fetch politeness sleep")
+    parser.add_argument("--write-raw", action="store_true", help="Write raw pages to the in-memory backend")
+    parser.add_argument("--log-level", default="WARNING")
+    for f in WebConfig.__dataclass_fields__.values():
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+    parser.set_defaults(pages=200)
+    args = parser.parse_args()
+    cfg = WebConfig(**{k: getattr(args, k) for k in WebConfig.__dataclass_fields__})
+
+    os.environ["LOG_LEVEL"] = args.log_level
+    os.environ.setdefault("STORAGE_BACKEND", "memory")
+    if args.no_delay:
+        from ..core import fetch
+
+        fetch._polite_delay = lambda: 0.0
+
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe()
+    server = ctx.Process(target=_serve, args=(cfg, args.hosts, child), daemon=True)
+    server.start()
+    hosts = parent.recv()
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            rss0, cpu0, t0 = _rss_bytes(), _cpu(), time.perf_counter()
+            if args.mode == "run_source":
+                asyncio.run(_drive_run_source(hosts, cfg.pages, args.write_raw, state_dir))
+            else:
+                asyncio.run(_drive_tasks(hosts, cfg.pages, args.concurrency))
+            wall, cpu, rss = time.perf_counter() - t0, _cpu() - cpu0, _rss_bytes() - rss0
+        with urllib.request.urlopen(f"{hosts[0]}/__stats") as r:
+            stats: Dict[str, Dict] = json.load(r)
+    finally:
+        server.terminate()
+
+    ok = sum(s["status"].get("200", 0) for s in stats.values())
+    requests = sum(s["requests"] for s in stats.values())
+    violations: Dict[str, int] = {}
+    for s in stats.values():
+        for k, v in s["violations"].items():
+            violations[k] = violations.get(k, 0) + v
+    print(f"mode={args.mode} hosts={args.hosts} pages/host={cfg.pages} no_delay={args.no_delay}")
+    print(f"requests={requests} ok={ok} wall={wall:.2f}s pages/sec={ok / wall:.1f}")
+    print(f"cpu={cpu:.2f}s cpu/page={cpu * 1000 / max(ok, 1):.2f}ms rss_growth={rss / 2**20:.1f}MiB")
+    print("politeness_violations " + " ".join(f"{k}={v}" for k, v in sorted(violations.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Compare content fingerprint algorithms on a typical HTML body.
+
+Usage: python -m crawler.bench.bench_dedup [--size-kb 256] [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from ..core.dedup import HASHERS, content_hash, fingerprint
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    body = ("<p>Olá mundo, notícias de hoje.</p>\n" * (args.size_kb * 1024 // 36)).encode("utf-8")
+    text = body.decode("utf-8")
+    mb = len(body) * args.repeat / 1e6
+
+    baseline = timeit.timeit(lambda: content_hash(text), number=args.repeat)
+    print(f"{'sha256(str) [baseline]':<24} {mb / baseline:9.1f} MB/s")
+    for algo in HASHERS:
+        t = timeit.timeit(lambda: fingerprint(body, algo), number=args.repeat)
+        print(f"{algo + '(bytes)':<24} {mb / t:9.1f} MB/s  x{baseline / t:.1f}")
+
+
+if __name__ == "__main__":
+    main()
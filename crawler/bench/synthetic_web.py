@@ -0,0 +1,212 @@
+"""Local synthetic web for end-to-end crawl tests (stdlib asyncio, HTTP/1.1 keep-alive).
+
+Each port is one "host" serving a deterministic link graph:
+
+- ``/p/<i>``: HTML article page linking to ``links`` other pages
+- ``/private/<i>``: disallowed by robots.txt (fetching it is a violation)
+- ``/robots.txt``: ``Disallow: /private/`` plus a ``Sitemap:`` line
+- ``/sitemap.xml``: every page (and a few private ones) with ``lastmod``
+- ``/__stats``: JSON request counters and politeness violations
+
+Latency, 5xx/429 rates and the share of large bodies are configurable.
+A violation is counted when a request arrives less than ``min_gap`` after the
+previous one to the same host, before a 429's ``Retry-After`` has elapsed,
+or for a path disallowed by robots.txt.
+
+Usage: python -m crawler.bench.synthetic_web [--hosts 2] [--pages 1000] [--latency-ms 20] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+WORDS = "o a de que e do da em um para com não uma os no se na por mais as dos como mas foi ao ele das tem".split()
+
+
+@dataclass
+class WebConfig:
+    pages: int = 1000
+    links: int = 10
+    latency_ms: float = 20.0  # mean of an exponential distribution
+    error_rate: float = 0.0  # share of 500 responses
+    throttle_rate: float = 0.0  # share of 429 responses
+    retry_after: int = 1
+    body_kb: int = 20
+    large_rate: float = 0.0  # share of pages with a large body
+    large_kb: int = 2048
+    private_pages: int = 10
+    min_gap: float = 0.15  # politeness: min seconds between requests to one host
+    seed: int = 0
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    status: Dict[int, int] = field(default_factory=dict)
+    too_fast: int = 0
+    ignored_retry_after: int = 0
+    disallowed: int = 0
+    last_request: float = 0.0
+    retry_after_until: float = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "status": {str(k): v for k, v in sorted(self.status.items())},
+            "violations": {
+                "too_fast": self.too_fast,
+                "ignored_retry_after": self.ignored_retry_after,
+                "disallowed": self.disallowed,
+            },
+        }
+
+
+def _page(i: int, cfg: WebConfig, host: str) -> bytes:
+    rng = random.Random(cfg.seed * 1_000_003 + i)
+    size = (cfg.large_kb if rng.random() < cfg.large_rate else cfg.body_kb) * 1024
+    links = "".join(f'<li><a href="/p/{rng.randrange(cfg.pages)}">Ligação {j}</a></li>' for j in range(cfg.links))
+    para = " ".join(rng.choice(WORDS) for _ in range(60))
+    paras = []
+    total = 0
+    while total < size:
+        p = f"<p>{para}</p>\n"
+        paras.append(p)
+        total += len(p)
+    return (
+        f'<!doctype html><html lang="pt"><head><meta charset="utf-8"><title>Notícia {i} em {host}</title>'
+        f'<meta name="author" content="Autor {i % 17}"><meta property="article:published_time" content="2025-08-{1 + i % 28:02d}">'
+        f"</head><body><nav><ul>{links}</ul></nav><article><h1>Notícia {i}</h1>{''.join(paras)}</article></body></html>"
+    ).encode("utf-8")
+
+
+class SyntheticWeb:
+    """One asyncio server per host; start() returns the base URLs."""
+
+    def __init__(self, cfg: WebConfig, hosts: int = 1, bind: str = "127.0.0.1"):
+        self.cfg = cfg
+        self.bind = bind
+        self.n_hosts = hosts
+        self.servers: List[asyncio.base_events.Server] = []
+        self.stats: Dict[str, HostStats] = {}
+        self.rng = random.Random(cfg.seed)
+
+    async def start(self, base_port: int = 0) -> List[str]:
+        urls = []
+        for h in range(self.n_hosts):
+            server = await asyncio.start_server(self._conn, self.bind, base_port + h if base_port else 0)
+            port = server.sockets[0].getsockname()[1]
+            host = f"{self.bind}:{port}"
+            self.stats[host] = HostStats()
+            self.servers.append(server)
+            urls.append(f"http://{host}")
+        return urls
+
+    async def close(self) -> None:
+        for s in self.servers:
+            s.close()
+            await s.wait_closed()
+
+    def report(self) -> Dict[str, object]:
+        return {host: st.as_dict() for host, st in self.stats.items()}
+
+    def _route(self, host: str, path: str, st: HostStats) -> Tuple[int, str, bytes, Dict[str, str]]:
+        cfg = self.cfg
+        if path == "/__stats":
+            return 200, "application/json", json.dumps(self.report()).encode(), {}
+        if path == "/robots.txt":
+            body = f"User-agent: *\nDisallow: /private/\nSitemap: http://{host}/sitemap.xml\n"
+            return 200, "text/plain", body.encode(), {}
+        if path == "/sitemap.xml":
+            locs = [f"/p/{i}" for i in range(cfg.pages)] + [f"/private/{i}" for i in range(cfg.private_pages)]
+            body = '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            body += "".join(
+                f"<url><loc>http://{host}{loc}</loc><lastmod>2025-08-{1 + n % 28:02d}</lastmod></url>" for n, loc in enumerate(locs)
+            )
+            return 200, "application/xml", (body + "</urlset>").encode(), {}
+        if path.startswith("/private/"):
+            st.disallowed += 1
+        if path.startswith(("/p/", "/private/")):
+            r = self.rng.random()
+            if r < cfg.throttle_rate:
+                st.retry_after_until = time.monotonic() + cfg.retry_after
+                return 429, "text/plain", b"slow down", {"Retry-After": str(cfg.retry_after)}
+            if r < cfg.throttle_rate + cfg.error_rate:
+                return 500, "text/plain", b"error", {}
+            try:
+                i = int(path.rsplit("/", 1)[1])
+            except ValueError:
+                i = -1
+            if 0 <= i < cfg.pages:
+                return 200, "text/html; charset=utf-8", _page(i, cfg, host), {}
+        return 404, "text/plain", b"not found", {}
+
+    async def _conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        port = writer.get_extra_info("sockname")[1]
+        host = f"{self.bind}:{port}"
+        st = self.stats[host]
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+                if int(headers.get("content-length", "0")):
+                    await reader.readexactly(int(headers["content-length"]))
+                path = target.split("?", 1)[0]
+                if path != "/__stats":
+                    now = time.monotonic()
+                    st.requests += 1
+                    if st.last_request and now - st.last_request < self.cfg.min_gap:
+                        st.too_fast += 1
+                    if now < st.retry_after_until:
+                        st.ignored_retry_after += 1
+                    st.last_request = now
+                    if self.cfg.latency_ms:
+                        await asyncio.sleep(self.rng.expovariate(1000.0 / self.cfg.latency_ms))
+                status, ctype, body, extra = self._route(host, path, st)
+                if path != "/__stats":
+                    st.status[status] = st.status.get(status, 0) + 1
+                    st.bytes_sent += len(body)
+                hdrs = {"Content-Type": ctype, "Content-Length": str(len(body)), **extra}
+                out = f"HTTP/1.1 {status} X\r\n" + "".join(f"{k}: {v}\r\n" for k, v in hdrs.items()) + "\r\n"
+                writer.write(out.encode("latin-1") + (b"" if method == "HEAD" else body))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic web until interrupted")
+    parser.add_argument("--hosts", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8800, help="First port; one port per host")
+    for f in WebConfig.__dataclass_fields__.values():
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+    args = parser.parse_args()
+    cfg = WebConfig(**{k: getattr(args, k) for k in WebConfig.__dataclass_fields__})
+
+    async def serve():
+        web = SyntheticWeb(cfg, hosts=args.hosts)
+        for url in await web.start(args.port):
+            print(url, flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,102 +2,287 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import json
 import logging
 import os
-from pathlib import Path
-from typing import List
-from datetime import datetime
+from collections import deque
+from contextlib import AsyncExitStack
+from typing import Any, Deque, List, Optional, Set, Tuple
+from datetime import date, datetime, timezone
 
 from .core.fetch import fetch, http_client
 from .core.robots import allowed
 from .core.dedup import content_hash
+from .core.encoding import Body, decode_response
 from .ops.logging import configure_logging
-from .pipelines.article import to_article
-from .ops.metrics import start_metrics_server, crawled_pages_total, fetch_errors_total, bytes_written_total
-
-# Expose yaml at module level so tests can patch crawler.cli.yaml.safe_load
-try:
-    import yaml  # type: ignore
-except Exception:  # pragma: no cover
-    yaml = None  # type: ignore
+from .ops.metrics import start_metrics_server, crawled_pages_total, fetch_errors_total, bytes_written_total, \
+    recrawl_unchanged_total, raw_blobs_reused_total, render_decisions_total
 
 
 async def crawl_once(urls: List[str]) -> None:
+    from .pipelines.article import to_article  # lazy import: pydantic models are costly to build
+
     configure_logging()
     log = logging.getLogger("crawler")
     async with http_client() as client:
         for url in urls:
             if not allowed(url, agent="AdvancedCrawler/1.0"):
-                log.warning("robots_disallow", extra={"message": f"Disallowed by robots: {url}"})
+                log.warning("robots_disallow", extra={"detail": f"Disallowed by robots: {url}"})
                 continue
             try:
                 r = await fetch(url, client)
-                h = content_hash(r.text)
-                art = to_article(url, r.text, country="", language=None, source="cli")
+                body = decode_response(r)
+                h = content_hash(body.content)
+                art = to_article(url, body.text, country="", language=None, source="cli")
                 crawled_pages_total.labels(source="cli", country="").inc()
-                log.info("fetched", extra={"message": f"{url} status={r.status_code} hash={h} title={art.title}"})
+                log.info("fetched", extra={"detail": f"{url} status={r.status_code} hash={h} title={art.title}"})
             except Exception:
                 fetch_errors_total.labels(source="cli", country="").inc()
                 log.error("fetch_error", exc_info=True)
 
 
-async def run_source(source: str, country: str, max_pages: int, *, write_raw: bool = False, metrics_port: int | None = None) -> None:
+async def run_source(source: str, country: str, max_pages: int, *, write_raw: bool = False, metrics_port: int | None = None,
+                     parse_workers: int = 0, restart: bool = False) -> None:
+    from .pipelines.article import to_article  # lazy import: pydantic models are costly to build
+
     configure_logging()
     log = logging.getLogger("crawler")
 
     if metrics_port:
         start_metrics_server(metrics_port)
 
-    # Load YAML sources catalog (lazy dependency)
-    if yaml is None:
-        log.error("yaml_missing", extra={"message": "PyYAML is required for 'run' mode. Install pyyaml."})
-        return
+    # Parsed catalog is cached per process and reloaded only when the file changes
+    from .core.catalog import DEFAULT_CATALOG_PATH, load_catalog
 
-    config_path = Path(__file__).resolve().parent / "config" / "sources.yaml"
-    if not config_path.exists():
-        log.error("config_missing", extra={"message": f"Sources config not found at {config_path}"})
+    try:
+        catalog = load_catalog(DEFAULT_CATALOG_PATH)
+    except FileNotFoundError:
+        log.error("config_missing", extra={"detail": f"Sources config not found at {DEFAULT_CATALOG_PATH}"})
+        return
+    except RuntimeError:
+        log.error("yaml_missing", extra={"detail": "PyYAML is required for 'run' mode. Install pyyaml."})
         return
 
-    data = yaml.safe_load(config_path.read_text()) or {}
-    sources = data.get("sources", [])
-    entry = next((s for s in sources if s.get("name") == source and s.get("country") == country), None)
+    entry = catalog.get(source, country)
     if not entry:
-        log.error("source_not_found", extra={"message": f"No source '{source}' for country '{country}' in catalog."})
+        log.error("source_not_found", extra={"detail": f"No source '{source}' for country '{country}' in catalog."})
         return
 
-    base_urls: List[str] = entry.get("base_urls", [])[:max_pages]
+    base_urls: List[str] = entry.base_urls[:max_pages]
     today = datetime.utcnow().date()
 
-    async with http_client() as client:
-        for idx, url in enumerate(base_urls, start=1):
+    async with AsyncExitStack() as stack:
+        client = await stack.enter_async_context(http_client())
+        pool = None
+        if parse_workers > 0:
+            # Parse in worker processes; bodies travel through shared memory
+            from .core.parse_pool import SharedMemoryParsePool
+
+            pool = await stack.enter_async_context(SharedMemoryParsePool(max_workers=parse_workers))
+        discovery = None
+        if entry.sitemaps or entry.feeds or entry.discover:
+            # Crawl only URLs that sitemaps/feeds list as new since the last complete run
+            from .core.discovery import DiscoveryState, discover
+
+            discovery = DiscoveryState(source, country)
+            stack.callback(discovery.close)
+            started = datetime.now(timezone.utc)
+            candidates = await discover(entry, client, since=discovery.last_run, state=discovery)
+            base_urls = candidates[:max_pages]
+            complete = len(candidates) <= max_pages
+        policy = None
+        if entry.recrawl_budget > 0:
+            # New URLs first; known ones only when likely to have changed, in the room left under max_pages
+            from .ops.recrawl import RecrawlPolicy
+
+            policy = RecrawlPolicy(source, country)
+            stack.callback(policy.close)
+            fresh = [u for u in base_urls if not policy.known(u)]
+            base_urls = fresh + policy.due(min(entry.recrawl_budget, max_pages - len(fresh)), exclude=fresh)
+        # Resume an interrupted run of this source: same run id and partition, completed URLs skipped
+        from .core.journal import RunJournal
+
+        journal = RunJournal(source, country)
+        stack.callback(journal.close)
+        for run_id, dt in journal.begin(today, restart=restart):
+            _close_run(journal, run_id, dt, source, country, log)
+        if journal.resumed:
+            log.info("run_resumed", extra={"detail": f"{journal.run_id} completed={len(journal)}"})
+            base_urls = [u for u in base_urls if not journal.is_done(u)]
+        blobs = None
+        if write_raw:
+            # Content-addressed raw bodies; the run's URL -> hash manifest is written from the journal
+            from .core.blobs import BlobStore
+
+            blobs = BlobStore()
+            stack.callback(blobs.close)
+        from .ops.memory import get_budget
+
+        budget = get_budget()
+        renderer = None
+        rendering: Set[asyncio.Task] = set()
+        if entry.render:
+            # Static first; only pages whose HTML lacks the article are queued to the browser pool
+            from .core.parse import parse_article
+            from .core.render import RenderPool, needs_render
+
+            renderer = await stack.enter_async_context(RenderPool())
+            render_slots = asyncio.Semaphore(renderer.queue_size + renderer.concurrency)
+
+        def failed() -> None:
+            nonlocal complete
+            fetch_errors_total.labels(source=source, country=country).inc()
+            log.error("run_error", exc_info=True)
+            complete = False
+
+        def store(url: str, r: Any, body: Body, parsed: Optional[dict]) -> None:
+            art = to_article(url, None if parsed is not None else body.text, country=country, language=entry.language,
+                             source=source, parsed=parsed)
+            crawled_pages_total.labels(source=source, country=country).inc()
+            log.info("fetched_parsed", extra={"detail": f"{url} title={art.title!r}"})
+            if discovery is not None:
+                discovery.mark_seen([url])
+            if policy is not None:
+                refetch = policy.known(url)
+                if not policy.observe(url, art.content_hash) and refetch:
+                    recrawl_unchanged_total.labels(source=source, country=country).inc()
+
+            h = None
+            if blobs is not None:
+                try:
+                    h = content_hash(body.content)
+                    # Raw bytes are stored as received (rendered pages: as rendered), once per distinct body
+                    key, uploaded = blobs.put(body.content, digest=h, content_type=body.content_type,
+                                              charset=body.encoding)
+                    if uploaded:
+                        bytes_written_total.labels(layer="raw", source=source, country=country).inc(body.size)
+                    else:
+                        raw_blobs_reused_total.labels(source=source, country=country).inc()
+                    log.info("raw_written" if uploaded else "raw_reused", extra={"detail": f"{url} {key}"})
+                except Exception:
+                    log.error("raw_write_failed", exc_info=True)
+                    return  # not journaled: a resumed run retries it
+            journal.record(url, digest=h, status=r.status_code, charset=body.encoding, content_type=body.content_type)
+
+        async def handle(url: str, r: Any, body: Body, parsed: Optional[dict]) -> None:
+            if renderer is not None:
+                parsed = parsed or parse_article(body.text)
+                reason = needs_render(body.text, parsed)
+                render_decisions_total.labels(source=source, country=country, decision=reason or "static").inc()
+                if reason:
+                    # Rendering continues in the background while static pages keep flowing
+                    await render_slots.acquire()
+                    task = asyncio.create_task(render_and_store(url, r, body, parsed))
+                    rendering.add(task)
+                    task.add_done_callback(rendering.discard)
+                    return
+            store(url, r, body, parsed)
+
+        # Pool parses run while the next pages are fetched; results are handled in fetch order
+        parsing: Deque[Tuple[str, Any, Body, asyncio.Future]] = deque()
+
+        async def collect(keep: int) -> None:
+            while len(parsing) > keep:
+                url, r, body, parse = parsing.popleft()
+                try:
+                    await handle(url, r, body, await parse)
+                except Exception:
+                    failed()
+
+        async def render_and_store(url: str, r: Any, body: Body, parsed: dict) -> None:
+            try:
+                try:
+                    html = await renderer.render(url)
+                    body, parsed = Body(html.encode("utf-8"), "utf-8"), parse_article(html)
+                except Exception as exc:
+                    # Keep the static result; RenderNotAvailable means Playwright/browsers are missing
+                    log.warning("render_failed", extra={"detail": f"{url}: {exc}"})
+                store(url, r, body, parsed)
+            except Exception:
+                failed()
+            finally:
+                render_slots.release()
+
+        for url in base_urls:
+            if budget is not None:
+                # Backpressure: under hard memory pressure, wait before fetching more
+                await budget.relieve()
             if not allowed(url, agent="AdvancedCrawler/1.0"):
-                log.warning("robots_disallow", extra={"message": f"Disallowed by robots: {url}"})
+                log.warning("robots_disallow", extra={"detail": f"Disallowed by robots: {url}"})
                 continue
             try:
                 r = await fetch(url, client)
-                art = to_article(url, r.text, country=country, language=entry.get("language"), source=source)
-                crawled_pages_total.labels(source=source, country=country).inc()
-                log.info("fetched_parsed", extra={"message": f"{url} title={art.title!r}"})
-
-                if write_raw:
-                    try:
-                        from .core.storage import put_gz, S3Config  # lazy import
-                        key = f"raw/{source}/{country}/dt={today:%Y-%m-%d}/page-{idx:06d}.html.gz"
-                        meta = {
-                            "content_hash": content_hash(r.text),
-                            "status": str(r.status_code),
-                            "source": source,
-                            "country": country,
-                        }
-                        put_gz(key, r.text.encode("utf-8"), metadata=meta)
-                        bytes_written_total.labels(layer="raw", source=source, country=country).inc(len(r.text.encode("utf-8")))
-                        log.info("raw_written", extra={"message": key})
-                    except Exception:
-                        log.error("raw_write_failed", exc_info=True)
-
+                # Decode once; parse, hash, storage and metrics share the same body
+                body = decode_response(r)
+                if pool is None:
+                    await handle(url, r, body, None)
+                else:
+                    parsing.append((url, r, body, asyncio.ensure_future(pool.parse(body.content, body.encoding))))
             except Exception:
-                fetch_errors_total.labels(source=source, country=country).inc()
-                log.error("run_error", exc_info=True)
+                failed()
+            if pool is not None:
+                # Keep at most one parse per shared-memory slot in flight
+                await collect(pool.slots - 1)
+        await collect(0)
+        if rendering:
+            await asyncio.gather(*rendering)
+        if discovery is not None and complete:
+            discovery.finish(started)
+        _close_run(journal, journal.run_id, journal.dt, source, country, log)
+    # Final per-host snapshot for `stats` and the host_* gauges
+    from .ops.hoststats import get_registry
+
+    get_registry().flush()
+
+
+def _close_run(journal, run_id: str, dt: date, source: str, country: str, log: logging.Logger) -> None:
+    """Write a run's manifest from its journal and mark it finished (left open if the write fails)."""
+    from .core.blobs import RunManifest
+
+    manifest = RunManifest(source, country, dt, run_id=run_id)
+    for url, h, status, charset, ctype, fetched_at in journal.entries(run_id):
+        manifest.add(url, h, status=status, charset=charset, content_type=ctype, fetched_at=fetched_at)
+    try:
+        key = manifest.write()
+    except Exception:
+        log.error("manifest_write_failed", exc_info=True)
+        return
+    journal.finish(run_id)
+    if key:
+        log.info("manifest_written", extra={"detail": f"{key} urls={len(manifest)}"})
+
+
+def reprocess(source: str, country: str, *, dt_from: date | None = None, dt_to: date | None = None,
+              workers: int | None = None, restart: bool = False) -> dict:
+    """Rebuild curated Articles for a source from its stored raw pages (no network)."""
+    from .core.catalog import load_catalog
+    from .pipelines.reprocess import reprocess_source
+
+    try:
+        entry = load_catalog().get(source, country)
+    except FileNotFoundError:
+        entry = None
+    return reprocess_source(source, country, language=entry.language if entry else None, dt_from=dt_from,
+                            dt_to=dt_to, workers=workers, restart=restart)
+
+
+def stats(*, top: int = 20, sort: str = "requests", max_age: float = 86400.0, as_json: bool = False,
+          p90: float = 2.0, error_rate: float = 0.05, throttle_rate: float = 0.01) -> str:
+    """Per-host table (or JSON) merged from every process's hoststats snapshot, plus slow hosts."""
+    from .ops.hoststats import format_table, load_snapshots, slow_hosts
+
+    summaries = load_snapshots(max_age=max_age)
+    slow = slow_hosts(summaries, p90=p90, error_rate=error_rate, throttle_rate=throttle_rate)
+    if as_json:
+        return json.dumps({"hosts": summaries, "slow": {h: reasons for h, reasons in slow}}, indent=2, sort_keys=True)
+    out = format_table(summaries, sort=sort, top=top)
+    if slow:
+        out += "\n\nslow hosts:\n" + "\n".join(f"  {h}: {', '.join(reasons)}" for h, reasons in slow)
+    return out
+
+
+def _date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
 
 
 def main() -> None:
@@ -113,13 +298,54 @@ def main() -> None:
     p_run.add_argument("--max-pages", type=int, default=50, help="Max pages to crawl from base_urls")
     p_run.add_argument("--write-raw", action="store_true", help="Write raw HTML to MinIO if storage deps available")
     p_run.add_argument("--metrics-port", type=int, default=None, help="Expose Prometheus /metrics on this port")
+    p_run.add_argument("--parse-workers", type=int, default=0, help="Parse pages in this many worker processes (0 = in-process)")
+    p_run.add_argument("--restart", action="store_true", help="Start a new run instead of resuming an interrupted one")
+
+    p_sync = sub.add_parser("sync", help="Upload a local storage spool (STORAGE_BACKEND=local) to S3")
+    p_sync.add_argument("--root", default=os.getenv("STORAGE_LOCAL_ROOT", "spool"), help="Spool directory")
+    p_sync.add_argument("--prefix", default="", help="Only upload paths starting with this prefix")
+    p_sync.add_argument("--workers", type=int, default=16, help="Parallel uploads")
+    p_sync.add_argument("--keep", action="store_true", help="Keep local files after upload")
+
+    p_re = sub.add_parser("reprocess", help="Re-parse stored raw HTML into curated Parquet without refetching")
+    p_re.add_argument("--source", required=True, help="Source name from catalog")
+    p_re.add_argument("--country", required=True, help="Country code (e.g., MZ)")
+    p_re.add_argument("--from", dest="dt_from", type=_date, default=None, help="First partition (YYYY-MM-DD)")
+    p_re.add_argument("--to", dest="dt_to", type=_date, default=None, help="Last partition (YYYY-MM-DD)")
+    p_re.add_argument("--workers", type=int, default=None, help="Parse processes (default: CPU count)")
+    p_re.add_argument("--restart", action="store_true", help="Ignore the checkpoint and reprocess every partition")
+
+    p_stats = sub.add_parser("stats", help="Per-host latency, status mix, bytes and retries from recent crawls")
+    p_stats.add_argument("--top", type=int, default=20, help="Rows to show")
+    p_stats.add_argument("--sort", default="requests", choices=("requests", "rps", "p50", "p90", "p99", "error_rate",
+                                                                "throttle_rate", "retries", "bytes", "inflight"))
+    p_stats.add_argument("--max-age", type=float, default=86400.0, help="Ignore snapshots older than this (seconds)")
+    p_stats.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    p_stats.add_argument("--slow-p90", type=float, default=2.0, help="Flag hosts with p90 latency above this (seconds)")
+    p_stats.add_argument("--slow-error-rate", type=float, default=0.05, help="Flag hosts with more 5xx/transport errors")
+    p_stats.add_argument("--slow-throttle-rate", type=float, default=0.01, help="Flag hosts with more 429 responses")
 
     args = parser.parse_args()
 
     if args.cmd == "urls":
         asyncio.run(crawl_once(args.urls))
     elif args.cmd == "run":
-        asyncio.run(run_source(args.source, args.country, args.max_pages, write_raw=args.write_raw, metrics_port=args.metrics_port))
+        asyncio.run(run_source(args.source, args.country, args.max_pages, write_raw=args.write_raw, metrics_port=args.metrics_port,
+                               parse_workers=args.parse_workers, restart=args.restart))
+    elif args.cmd == "sync":
+        from .core.storage import LocalBackend, sync_to_s3
+
+        configure_logging()
+        n, size = sync_to_s3(LocalBackend(args.root), prefix=args.prefix, workers=args.workers, delete=not args.keep)
+        logging.getLogger("crawler").info("spool_synced", extra={"detail": f"{n} objects, {size} bytes from {args.root}"})
+    elif args.cmd == "reprocess":
+        configure_logging()
+        totals = reprocess(args.source, args.country, dt_from=args.dt_from, dt_to=args.dt_to, workers=args.workers,
+                           restart=args.restart)
+        logging.getLogger("crawler").info("reprocess_done", extra={"detail": " ".join(f"{k}={v}" for k, v in totals.items())})
+    elif args.cmd == "stats":
+        print(stats(top=args.top, sort=args.sort, max_age=args.max_age, as_json=args.json, p90=args.slow_p90,
+                    error_rate=args.slow_error_rate, throttle_rate=args.slow_throttle_rate))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+"""
+Content-addressed raw storage: one blob per distinct body, plus per-run manifests.
+
+- blobs: ``blobs/sha256/<h[:2]>/<h>.html.gz``, keyed by core.dedup.content_hash
+  of the bytes as received (gzipped, with their content type and charset)
+- manifests: ``raw/<source>/<country>/dt=YYYY-MM-DD/manifest-<run>.jsonl``,
+  one JSON line per fetched URL: url, hash, status, charset, content_type,
+  fetched_at
+
+A page identical to anything stored before costs no upload. Hashes known to
+exist are kept in a local SQLite cache (``CRAWL_STATE_DIR/blobs.sqlite``), so
+repeat content needs neither a PUT nor a HEAD; only a cache miss checks the
+backend with ``exists()`` before uploading. core.reader expands manifests
+back into RawPage objects, so reprocessing works on both layouts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from .dedup import content_hash
+from . import storage
+from .storage import S3Config, get_backend
+
+log = logging.getLogger("crawler.blobs")
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+BLOB_PREFIX = "blobs/sha256"
+MANIFEST_PREFIX = "manifest-"
+COMMIT_EVERY = 100
+
+
+def blob_key(digest: str) -> str:
+    """Bucket-relative key of the blob with sha256 hex ``digest``."""
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest}.html.gz"
+
+
+def quote_url(url: str) -> str:
+    # S3 user metadata must be ASCII; reader.RawPage.url unquotes it
+    return quote(url, safe=":/?&=#%~+,;@!$'()*[]")
+
+
+def is_manifest(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name.startswith(MANIFEST_PREFIX) and name.endswith(".jsonl")
+
+
+class BlobStore:
+    """Uploads bodies by content hash, skipping those already stored."""
+
+    def __init__(self, state_dir: Path | None = None):
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.bucket = S3Config().bucket
+        self.db = sqlite3.connect(state_dir / "blobs.sqlite")
+        self.db.execute("CREATE TABLE IF NOT EXISTS blobs (bucket TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (bucket, hash)) WITHOUT ROWID")
+        self._pending = 0
+        self.stats = {"uploaded": 0, "reused": 0, "bytes": 0}
+
+    def known(self, digest: str) -> bool:
+        """Whether the local cache has seen ``digest`` stored in this bucket."""
+        return self.db.execute("SELECT 1 FROM blobs WHERE bucket = ? AND hash = ?", (self.bucket, digest)).fetchone() is not None
+
+    def _remember(self, digest: str) -> None:
+        self.db.execute("INSERT OR IGNORE INTO blobs (bucket, hash) VALUES (?, ?)", (self.bucket, digest))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.db.commit()
+            self._pending = 0
+
+    def put(self, data: bytes, *, digest: Optional[str] = None, content_type: str = "text/html; charset=utf-8",
+            charset: Optional[str] = None) -> Tuple[str, bool]:
+        """Store ``data`` unless an identical body exists; returns (blob key, uploaded)."""
+        digest = digest or content_hash(data)
+        key = blob_key(digest)
+        if self.known(digest) or get_backend().exists(f"{self.bucket}/{key}"):
+            self._remember(digest)
+            self.stats["reused"] += 1
+            return key, False
+        meta = {"content_hash": digest}
+        if charset:
+            meta["charset"] = charset
+        storage.put_gz(key, data, content_type=content_type, metadata=meta)
+        self._remember(digest)
+        self.stats["uploaded"] += 1
+        self.stats["bytes"] += len(data)
+        return key, True
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+
+class RunManifest:
+    """URL -> hash entries of one run for one source/country/day, written as JSON lines."""
+
+    def __init__(self, source: str, country: str, dt: date, run_id: Optional[str] = None):
+        run_id = run_id or f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.key = f"raw/{source}/{country}/dt={dt:%Y-%m-%d}/{MANIFEST_PREFIX}{run_id}.jsonl"
+        self.entries: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, url: str, digest: str, *, status: int, charset: Optional[str] = None,
+            content_type: Optional[str] = None, fetched_at: Optional[datetime] = None) -> None:
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        self.entries.append({"url": url, "hash": digest, "status": status, "charset": charset,
+                             "content_type": content_type, "fetched_at": fetched_at.isoformat()})
+
+    def write(self) -> Optional[str]:
+        """Upload the manifest (nothing when empty); returns its key."""
+        if not self.entries:
+            return None
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self.entries).encode("utf-8")
+        storage.put_bytes(self.key, data, content_type="application/x-ndjson")
+        return self.key
+
+
+def read_manifest(path: str) -> Iterator[Tuple[str, Dict[str, str], Optional[str]]]:
+    """(blob path, RawPage metadata, content type) per entry of the manifest at ``path``."""
+    bucket = S3Config().bucket
+    for line in get_backend().get(path).decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        e = json.loads(line)
+        meta = {"url": quote_url(e["url"]), "content_hash": e["hash"], "status": str(e["status"])}
+        if e.get("charset"):
+            meta["charset"] = e["charset"]
+        yield f"{bucket}/{blob_key(e['hash'])}", meta, e.get("content_type")
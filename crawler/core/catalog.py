@@ -0,0 +1,83 @@
+"""
+Sources catalog loader.
+
+Parses sources.yaml once (with the libyaml C loader when available), validates
+entries into SourceEntry models and indexes them by (name, country). Loaded
+catalogs are cached per path and re-read only when the file's mtime or size
+changes, so frequent cron runs and the scheduler share one parse.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.schemas import SourceEntry
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "config" / "sources.yaml"
+
+
+class Catalog:
+    def __init__(self, entries: List[SourceEntry]):
+        self.entries = entries
+        # First entry wins on duplicate keys, matching the old linear scan.
+        self.index: Dict[Tuple[str, str], SourceEntry] = {}
+        for e in entries:
+            self.index.setdefault((e.name, e.country), e)
+
+    def get(self, name: str, country: str) -> Optional[SourceEntry]:
+        return self.index.get((name, country))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Catalog":
+        log = logging.getLogger("crawler.catalog")
+        entries: List[SourceEntry] = []
+        for raw in (data or {}).get("sources", []) or []:
+            try:
+                entries.append(SourceEntry.model_validate(raw))
+            except Exception:
+                log.warning("invalid_source_entry", extra={"detail": f"Skipping invalid catalog entry: {raw!r}"})
+        return cls(entries)
+
+
+def _yaml_load(text: str) -> Dict[str, Any]:
+    try:
+        import yaml  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError("PyYAML is required to load the catalog.") from e
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader) or {}
+
+
+_cache: Dict[Path, Tuple[Tuple[int, int], Catalog]] = {}
+_lock = threading.Lock()
+
+
+def load_catalog(path: Path = DEFAULT_CATALOG_PATH) -> Catalog:
+    """Return the parsed catalog at ``path``, re-parsing only if the file changed.
+
+    Raises FileNotFoundError if the file does not exist and RuntimeError if
+    PyYAML is not installed.
+    """
+    path = Path(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        hit = _cache.get(path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    catalog = Catalog.from_dict(_yaml_load(path.read_text()))
+    with _lock:
+        _cache[path] = (stamp, catalog)
+    return catalog
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -1,7 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+from typing import Callable, Dict, Union
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
+# Optional fast non-cryptographic hashes. Both are used only for in-memory
+# dedup keys; the canonical fingerprint stored on models stays sha256.
+try:
+    import xxhash  # type: ignore
+except Exception:  # pragma: no cover
+    xxhash = None  # type: ignore
+
+try:
+    import mmh3  # type: ignore
+except Exception:  # pragma: no cover
+    mmh3 = None  # type: ignore
+
 TRACKING_PARAMS = {
     "utm_source",
     "utm_medium",
@@ -10,6 +24,8 @@ TRACKING_PARAMS = {
     "fbclid",
 }
 
+Data = Union[str, bytes, bytearray, memoryview]
+
 
 def canonical(url: str) -> str:
     parts = urlsplit(url)
@@ -20,9 +36,69 @@ def canonical(url: str) -> str:
     return urlunsplit((parts.scheme, netloc, path, query, ""))
 
 
+def _as_bytes(data: Data) -> bytes | bytearray | memoryview:
+    # Bytes are hashed as-is so response bodies are never decoded/re-encoded.
+    if isinstance(data, str):
+        return data.encode("utf-8", errors="ignore")
+    return data
+
+
+def _sha256(b) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+
+def _blake2b64(b) -> str:
+    return hashlib.blake2b(b, digest_size=8).hexdigest()
+
+
+def _blake2b128(b) -> str:
+    return hashlib.blake2b(b, digest_size=16).hexdigest()
+
+
+HASHERS: Dict[str, Callable[..., str]] = {
+    "sha256": _sha256,
+    "blake2b64": _blake2b64,
+    "blake2b128": _blake2b128,
+}
+
+if xxhash is not None:
+    HASHERS["xxh64"] = lambda b: xxhash.xxh64_hexdigest(b)
+    HASHERS["xxh128"] = lambda b: xxhash.xxh3_128_hexdigest(b)
+
+if mmh3 is not None:
+    HASHERS["mmh3_64"] = lambda b: f"{mmh3.hash64(bytes(b), signed=False)[0]:016x}"
+    HASHERS["mmh3_128"] = lambda b: f"{mmh3.hash128(bytes(b), signed=False):032x}"
+
+# Best available 64/128-bit algorithms, in order of preference.
+FAST64 = next(a for a in ("xxh64", "mmh3_64", "blake2b64") if a in HASHERS)
+FAST128 = next(a for a in ("xxh128", "mmh3_128", "blake2b128") if a in HASHERS)
+
+
+def fingerprint(data: Data, algo: str = "sha256") -> str:
+    """Return the hex fingerprint of ``data`` using ``algo``.
+
+    ``sha256`` is the canonical default. The 64/128-bit algorithms are meant
+    for in-memory dedup indexes; values differ between algorithms, so do not
+    persist them unless the algorithm name is stored alongside.
+    """
+    try:
+        hasher = HASHERS[algo]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable hash algorithm: {algo!r}") from None
+    return hasher(_as_bytes(data))
+
+
+def key64(data: Data, algo: str | None = None) -> int:
+    """Return a stable unsigned 64-bit integer key for ``data``.
+
+    Unlike ``hash()``, the key does not change between processes. Uses the
+    fastest installed backend unless ``algo`` pins one explicitly.
+    """
+    return int(fingerprint(data, algo or FAST64), 16)
+
+
 # For deterministic behavior across environments, use sha256 for content fingerprints.
-# mmh3 may be installed, but tests expect a 64-character hex digest.
+# Tests and stored metadata expect a 64-character hex digest.
 
-def content_hash(text: str) -> str:
-    import hashlib
-    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+def content_hash(text: Data) -> str:
+    return fingerprint(text, "sha256")
@@ -0,0 +1,263 @@
+"""
+URL discovery from sitemaps and RSS/Atom feeds.
+
+Sources opt in through the catalog (``sitemaps``, ``feeds`` and/or
+``discover: true`` to read ``Sitemap:`` lines from robots.txt). Documents
+are streamed from the network into an incremental XML parser (gzip is
+detected from the magic bytes), and each ``<url>``/``<item>``/``<entry>`` is
+dropped from the tree as soon as it has been read, so memory stays flat for
+sitemaps of any size.
+
+Child sitemaps and pages whose ``lastmod`` is not newer than the previous
+successful run are skipped, and URLs already crawled are filtered through
+a per-source SQLite set in CRAWL_STATE_DIR, so only new URLs reach the crawl.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .dedup import canonical
+from .parse import normalize_date
+from .robots import allowed, robots_for
+
+log = logging.getLogger("crawler.discovery")
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+MAX_DOCUMENT_BYTES = int(os.getenv("DISCOVERY_MAX_BYTES", str(1 << 30)))  # decompressed, per document
+MAX_DEPTH = 3  # sitemap index nesting
+
+# record element -> parent elements it is valid under
+_RECORDS = {
+    "url": ("urlset",),
+    "sitemap": ("sitemapindex",),
+    "item": ("channel", "RDF"),
+    "entry": ("feed",),
+}
+
+
+@dataclass(frozen=True)
+class Discovered:
+    url: str
+    lastmod: Optional[datetime]
+    kind: str  # "page" or "sitemap" (a child document to follow)
+
+
+def _local(tag: Any) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _text(children: Dict[str, ET.Element], *names: str) -> Optional[str]:
+    for name in names:
+        el = children.get(name)
+        if el is not None and el.text and el.text.strip():
+            return el.text.strip()
+    return None
+
+
+def _record(name: str, elem: ET.Element) -> Optional[Discovered]:
+    children: Dict[str, ET.Element] = {}
+    for child in elem:
+        children.setdefault(_local(child.tag), child)
+    if name in ("url", "sitemap"):
+        loc = _text(children, "loc")
+        news = children.get("news")
+        when = _text(children, "lastmod")
+        if when is None and news is not None:  # Google News sitemaps
+            when = _text({_local(c.tag): c for c in news}, "publication_date")
+        return Discovered(loc, normalize_date(when), "sitemap" if name == "sitemap" else "page") if loc else None
+    if name == "item":
+        link = _text(children, "link")
+        guid = children.get("guid")
+        if not link and guid is not None and guid.get("isPermaLink", "true") == "true":
+            link = _text(children, "guid")
+        return Discovered(link, normalize_date(_text(children, "pubDate", "date", "updated")), "page") if link else None
+    # Atom entry
+    href = None
+    for child in elem:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            href = child.get("href")
+            break
+    return Discovered(href, normalize_date(_text(children, "updated", "published")), "page") if href else None
+
+
+class FeedParser:
+    """Incremental parser for sitemaps, sitemap indexes, RSS and Atom.
+
+    Feed raw bytes (optionally gzip-compressed) in chunks; each call returns
+    the records completed so far. Raises ValueError past ``max_bytes`` of
+    decompressed XML and ``xml.etree.ElementTree.ParseError`` on bad XML.
+    """
+
+    def __init__(self, max_bytes: int = MAX_DOCUMENT_BYTES):
+        self.max_bytes = max_bytes
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+        self._head = b""
+        self._inflate: Optional[Any] = None
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> List[Discovered]:
+        if self._head is not None:
+            # Sniff gzip from the first two bytes, whatever the chunking
+            self._head += chunk
+            if len(self._head) < 2:
+                return []
+            chunk, self._head = self._head, None
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflate = zlib.decompressobj(wbits=31)
+        if self._inflate is not None:
+            chunk = self._inflate.decompress(chunk)
+        self._size += len(chunk)
+        if self._size > self.max_bytes:
+            raise ValueError(f"document exceeds {self.max_bytes} bytes")
+        self._parser.feed(chunk)
+        return list(self._events())
+
+    def close(self) -> List[Discovered]:
+        if self._head:
+            self._parser.feed(self._head)
+        self._parser.close()
+        return list(self._events())
+
+    def _events(self) -> Iterator[Discovered]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            name = _local(elem.tag)
+            parent = self._stack[-1] if self._stack else None
+            if parent is not None and _local(parent.tag) in _RECORDS.get(name, ()):
+                rec = _record(name, elem)
+                parent.remove(elem)  # keep the tree empty behind the cursor
+                if rec is not None:
+                    yield rec
+
+
+def parse_feed(chunks: Iterable[bytes], max_bytes: int = MAX_DOCUMENT_BYTES) -> Iterator[Discovered]:
+    """Synchronous convenience wrapper around FeedParser."""
+    parser = FeedParser(max_bytes)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class DiscoveryState:
+    """Per (source, country) set of crawled canonical URLs plus the last complete run."""
+
+    def __init__(self, source: str, country: str, state_dir: Path | None = None):
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(state_dir / f"discovery-{source}-{country}.sqlite")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen (url_key TEXT PRIMARY KEY, first_seen TEXT) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT);
+            """
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    @property
+    def last_run(self) -> Optional[datetime]:
+        row = self.db.execute("SELECT v FROM meta WHERE k = 'last_run'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def is_new(self, url: str) -> bool:
+        return self.db.execute("SELECT 1 FROM seen WHERE url_key = ?", (canonical(url),)).fetchone() is None
+
+    def mark_seen(self, urls: Iterable[str]) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", ((canonical(u), now) for u in urls))
+
+    def finish(self, started_at: datetime) -> None:
+        """Advance the ``lastmod`` watermark; call only after every candidate was crawled."""
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('last_run', ?)", (started_at.isoformat(),))
+
+
+def robots_sitemaps(base_urls: Iterable[str]) -> List[str]:
+    """``Sitemap:`` URLs from robots.txt of every host in ``base_urls``."""
+    out: List[str] = []
+    for scheme, netloc in dict.fromkeys(urlparse(u)[:2] for u in base_urls):
+        try:
+            out.extend(robots_for(netloc, "http" if scheme == "http" else "https").site_maps() or [])
+        except Exception:
+            log.warning("robots_sitemaps_failed", extra={"detail": netloc}, exc_info=True)
+    return out
+
+
+def _permitted(url: str, allow: List[str], deny: List[str]) -> bool:
+    path = urlparse(url).path or "/"
+    if any(d in path for d in deny):
+        return False
+    return not allow or any(a in path for a in allow)
+
+
+async def _stream(client: Any, url: str) -> AsyncIterator[Discovered]:
+    parser = FeedParser()
+    async with client.stream("GET", url) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_bytes():
+            for rec in parser.feed(chunk):
+                yield rec
+    for rec in parser.close():
+        yield rec
+
+
+async def discover(entry: Any, client: Any, *, since: Optional[datetime] = None,
+                   state: Optional[DiscoveryState] = None, agent: str = "AdvancedCrawler/1.0") -> List[str]:
+    """New page URLs for a catalog entry, newest first.
+
+    Walks ``entry.sitemaps``, ``entry.feeds`` and (with ``entry.discover``)
+    robots.txt sitemaps, following sitemap indexes. Pages and child sitemaps
+    with ``lastmod <= since`` are skipped, as are URLs outside the entry's
+    allow/deny rules and URLs already in ``state``. Unreadable documents are
+    logged and skipped.
+    """
+    seeds = list(entry.sitemaps) + list(entry.feeds)
+    if entry.discover:
+        seeds += robots_sitemaps(entry.base_urls)
+    queue = deque((url, 0) for url in dict.fromkeys(seeds))
+    visited = set()
+    found: Dict[str, Tuple[str, Optional[datetime]]] = {}
+    while queue:
+        doc, depth = queue.popleft()
+        if doc in visited or not allowed(doc, agent=agent):
+            continue
+        visited.add(doc)
+        try:
+            async for rec in _stream(client, doc):
+                if since is not None and rec.lastmod is not None and rec.lastmod <= since:
+                    continue
+                if rec.kind == "sitemap":
+                    if depth < MAX_DEPTH:
+                        queue.append((rec.url, depth + 1))
+                    continue
+                key = canonical(rec.url)
+                if key in found or not _permitted(rec.url, entry.allow, entry.deny):
+                    continue
+                if state is not None and not state.is_new(rec.url):
+                    continue
+                found[key] = (rec.url, rec.lastmod)
+        except Exception:
+            # Records read before the failure are kept
+            log.warning("discovery_failed", extra={"detail": doc}, exc_info=True)
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    ranked = sorted(found.values(), key=lambda item: item[1] or oldest, reverse=True)
+    log.info("discovered", extra={"detail": f"{len(ranked)} new urls from {len(visited)} documents"})
+    return [url for url, _ in ranked]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Optional
+
+# Bytes-first body handling: keep the raw response bytes, detect the charset
+# once (BOM -> header -> <meta> -> UTF-8 check -> optional detector) and decode
+# lazily a single time. Parse, hash, storage and metrics share the same Body.
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),  # the utf-16 codec consumes the BOM
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+META_SNIFF_BYTES = 4096
+DETECT_SNIFF_BYTES = 64 * 1024
+
+# Per the HTML spec, these labels are decoded as windows-1252.
+_ALIASES = {"ascii": "cp1252", "latin-1": "cp1252", "iso8859-1": "cp1252"}
+
+
+def _normalize(label: Optional[str]) -> Optional[str]:
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip()).name
+    except LookupError:
+        return None
+    return _ALIASES.get(name, name)
+
+
+def _detect(sample: bytes) -> Optional[str]:
+    # Optional statistical detector, only used for undeclared non-UTF-8 bodies.
+    try:
+        from charset_normalizer import from_bytes  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    best = from_bytes(sample).best()
+    return _normalize(best.encoding) if best else None
+
+
+def detect_charset(body: bytes, content_type: Optional[str] = None) -> str:
+    """Return the codec name to decode ``body`` with."""
+    # A byte-order mark is authoritative, even over the Content-Type charset (WHATWG sniffing)
+    for bom, enc in _BOMS:
+        if body.startswith(bom):
+            return enc
+    if content_type:
+        m = _HEADER_CHARSET.search(content_type)
+        if m and (enc := _normalize(m.group(1))):
+            return enc
+    m = _META_CHARSET.search(body[:META_SNIFF_BYTES])
+    if m and (enc := _normalize(m.group(1).decode("ascii", "ignore"))):
+        return enc
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    return _detect(body[:DETECT_SNIFF_BYTES]) or "cp1252"
+
+
+@dataclass(frozen=True)
+class Body:
+    """Raw response bytes plus the detected encoding; text is decoded once."""
+
+    content: bytes
+    encoding: str
+
+    @cached_property
+    def text(self) -> str:
+        # utf-8-sig strips a BOM if present
+        enc = "utf-8-sig" if self.encoding == "utf-8" else self.encoding
+        return self.content.decode(enc, errors="replace")
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    @property
+    def content_type(self) -> str:
+        return f"text/html; charset={self.encoding}"
+
+    @classmethod
+    def from_bytes(cls, content: bytes, content_type: Optional[str] = None) -> "Body":
+        return cls(content, detect_charset(content, content_type))
+
+
+def decode_response(r: Any) -> Body:
+    """Build a Body from an httpx.Response without touching ``r.text``."""
+    return Body.from_bytes(r.content, r.headers.get("content-type"))
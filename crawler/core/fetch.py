@@ -3,12 +3,15 @@ from __future__ import annotations
 import asyncio
 import os
 import random
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
 
 import httpx
 from backoff import on_exception, expo
 
+from ..ops.hoststats import get_registry
+
 DEFAULT_TIMEOUT = float(os.getenv("REQUESTS_TIMEOUT", "30"))
 USER_AGENT = os.getenv("HTTP_USER_AGENT", "AdvancedCrawler/1.0 (+contact@example.org)")
 PROXY_URL = os.getenv("PROXY_URL") or None
@@ -20,12 +23,14 @@ async def http_client() -> AsyncIterator[httpx.AsyncClient]:
     timeout = httpx.Timeout(DEFAULT_TIMEOUT)
     headers = {"User-Agent": USER_AGENT}
     limits = httpx.Limits(max_keepalive_connections=MAX_CONCURRENCY, max_connections=MAX_CONCURRENCY)
+    # httpx 0.28 removed ``proxies=``; ``proxy=`` exists since 0.26
+    proxy = {"proxy": PROXY_URL} if PROXY_URL else {}
     async with httpx.AsyncClient(
         timeout=timeout,
         headers=headers,
         follow_redirects=True,
         limits=limits,
-        proxies=PROXY_URL,
+        **proxy,
     ) as client:
         yield client
 
@@ -35,9 +40,21 @@ def _polite_delay() -> float:
     return random.uniform(0.15, 0.6)
 
 
-@on_exception(expo, (httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError), max_tries=5, jitter=None)
+def _on_retry(details: dict) -> None:
+    get_registry().retry(details["args"][1])
+
+
+@on_exception(expo, (httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError), max_tries=5, jitter=None,
+              on_backoff=_on_retry)
 async def _get(client: httpx.AsyncClient, url: str) -> httpx.Response:
-    r = await client.get(url)
+    # Per-host latency/status/bytes feed ops.hoststats (slow-host detection, `cli stats`)
+    started = time.perf_counter()
+    try:
+        r = await client.get(url)
+    except Exception:
+        get_registry().record(url, time.perf_counter() - started, None)
+        raise
+    get_registry().record(url, time.perf_counter() - started, r.status_code, len(getattr(r, "content", b"") or b""))
     r.raise_for_status()
     await asyncio.sleep(_polite_delay())
     return r
@@ -0,0 +1,199 @@
+"""
+Shared crawl frontier and seen-set on Redis for multi-worker crawls.
+
+Keys under ``<prefix>:{<source>:<country>}``:
+
+- ``seen``: SET of canonical-URL fingerprints ever enqueued
+- ``queue``: ZSET url -> not-before timestamp
+- ``leases``: ZSET url -> lease expiry, ``owners``: HASH url -> worker id
+- ``attempts``: HASH url -> claims so far, ``dead``: SET of abandoned URLs
+
+``add`` is one Lua script call per batch that SADDs each fingerprint and
+ZADDs only the URLs that were new, so a URL is queued at most once however
+many workers discover it, and a crash can never leave it seen but unqueued.
+``claim`` runs as a Lua script that first returns
+expired leases (crashed workers) to the queue, then moves ready URLs to
+``leases`` atomically, so no two workers hold the same URL. ``complete`` and
+``release`` only act for the current lease owner.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from .dedup import canonical, key64
+
+FRONTIER_URL = os.getenv("FRONTIER_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+FRONTIER_PREFIX = os.getenv("FRONTIER_PREFIX", "frontier")
+LEASE_SECONDS = float(os.getenv("FRONTIER_LEASE_SECONDS", "300"))
+MAX_ATTEMPTS = int(os.getenv("FRONTIER_MAX_ATTEMPTS", "5"))
+BATCH_SIZE = 500
+
+# KEYS: seen, queue; ARGV: score, then fingerprint, url pairs
+_ADD = """
+local added = 0
+for i = 2, #ARGV, 2 do
+  if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+    redis.call('ZADD', KEYS[2], tonumber(ARGV[1]), ARGV[i + 1])
+    added = added + 1
+  end
+end
+return added
+"""
+
+# KEYS: queue, leases, owners, attempts, dead
+# ARGV: now, lease_seconds, n, worker, max_attempts
+_CLAIM = """
+local now = tonumber(ARGV[1])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, url in ipairs(expired) do
+  redis.call('ZREM', KEYS[2], url)
+  redis.call('HDEL', KEYS[3], url)
+  if tonumber(redis.call('HGET', KEYS[4], url) or '0') >= tonumber(ARGV[5]) then
+    redis.call('SADD', KEYS[5], url)
+    redis.call('HDEL', KEYS[4], url)
+  else
+    redis.call('ZADD', KEYS[1], now, url)
+  end
+end
+local urls = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[3]))
+local expiry = now + tonumber(ARGV[2])
+for _, url in ipairs(urls) do
+  redis.call('ZREM', KEYS[1], url)
+  redis.call('ZADD', KEYS[2], expiry, url)
+  redis.call('HSET', KEYS[3], url, ARGV[4])
+  redis.call('HINCRBY', KEYS[4], url, 1)
+end
+return urls
+"""
+
+# KEYS: leases, owners, attempts; ARGV: url, worker
+_COMPLETE = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return 1
+"""
+
+# KEYS: queue, leases, owners, attempts, dead; ARGV: url, worker, not_before, max_attempts
+_RELEASE = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if tonumber(redis.call('HGET', KEYS[4], ARGV[1]) or '0') >= tonumber(ARGV[4]) then
+  redis.call('SADD', KEYS[5], ARGV[1])
+  redis.call('HDEL', KEYS[4], ARGV[1])
+else
+  redis.call('ZADD', KEYS[1], tonumber(ARGV[3]), ARGV[1])
+end
+return 1
+"""
+
+# KEYS: leases, owners; ARGV: url, worker, expiry
+_RENEW = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZADD', KEYS[1], 'XX', tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+
+def fingerprint_url(url: str) -> str:
+    """Compact seen-set member: 64-bit hash of the canonical URL, as hex."""
+    return f"{key64(canonical(url)):016x}"
+
+
+def redis_client(url: str = FRONTIER_URL) -> Any:
+    try:
+        import redis  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError("The redis package is required for the shared frontier. Install redis.") from e
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+class Frontier:
+    """Per (source, country) URL queue shared by all workers through Redis.
+
+    ``client`` is a ``redis.Redis`` (or ``fakeredis.FakeRedis``) created with
+    ``decode_responses=True``.
+    """
+
+    def __init__(self, client: Any, source: str, country: str, *, prefix: str = FRONTIER_PREFIX,
+                 worker_id: Optional[str] = None, lease_seconds: float = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.r = client
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Hash tag keeps all keys in one cluster slot, as the Lua scripts require
+        base = f"{prefix}:{{{source}:{country}}}"
+        self.keys = {name: f"{base}:{name}" for name in ("seen", "queue", "leases", "owners", "attempts", "dead")}
+        self._add = client.register_script(_ADD)
+        self._claim = client.register_script(_CLAIM)
+        self._complete = client.register_script(_COMPLETE)
+        self._release = client.register_script(_RELEASE)
+        self._renew = client.register_script(_RENEW)
+
+    def add(self, urls: Iterable[str], *, not_before: Optional[float] = None, batch_size: int = BATCH_SIZE) -> int:
+        """Enqueue URLs never seen before; returns how many were new."""
+        score = time.time() if not_before is None else not_before
+        added = 0
+        batch: List[str] = []
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= batch_size:
+                added += self._add_batch(batch, score)
+                batch = []
+        if batch:
+            added += self._add_batch(batch, score)
+        return added
+
+    def _add_batch(self, urls: List[str], score: float) -> int:
+        # Seen-check and enqueue in one script: exactly one caller adds a given URL, and atomically
+        args: List[Any] = [score]
+        for url in urls:
+            args += [fingerprint_url(url), url]
+        return int(self._add(keys=[self.keys["seen"], self.keys["queue"]], args=args))
+
+    def seen(self, url: str) -> bool:
+        return bool(self.r.sismember(self.keys["seen"], fingerprint_url(url)))
+
+    def claim(self, n: int = 1, now: Optional[float] = None) -> List[str]:
+        """Lease up to ``n`` ready URLs to this worker (expired leases are reclaimed first)."""
+        k = self.keys
+        return list(self._claim(
+            keys=[k["queue"], k["leases"], k["owners"], k["attempts"], k["dead"]],
+            args=[time.time() if now is None else now, self.lease_seconds, n, self.worker_id, self.max_attempts],
+        ))
+
+    def complete(self, url: str) -> bool:
+        """Mark a leased URL done. False if the lease was lost (expired and reclaimed)."""
+        k = self.keys
+        return bool(self._complete(keys=[k["leases"], k["owners"], k["attempts"]], args=[url, self.worker_id]))
+
+    def release(self, url: str, delay: float = 0.0, now: Optional[float] = None) -> bool:
+        """Give a leased URL back to the queue, ready after ``delay`` seconds (e.g. on a retryable error).
+
+        After ``max_attempts`` claims the URL goes to the dead set instead.
+        """
+        k = self.keys
+        ready = (time.time() if now is None else now) + delay
+        return bool(self._release(keys=[k["queue"], k["leases"], k["owners"], k["attempts"], k["dead"]],
+                                  args=[url, self.worker_id, ready, self.max_attempts]))
+
+    def renew(self, url: str, now: Optional[float] = None) -> bool:
+        """Extend this worker's lease on ``url`` by another ``lease_seconds``."""
+        k = self.keys
+        expiry = (time.time() if now is None else now) + self.lease_seconds
+        return bool(self._renew(keys=[k["leases"], k["owners"]], args=[url, self.worker_id, expiry]))
+
+    def stats(self) -> Dict[str, int]:
+        k = self.keys
+        pipe = self.r.pipeline(transaction=False)
+        pipe.scard(k["seen"]).zcard(k["queue"]).zcard(k["leases"]).scard(k["dead"])
+        seen, queued, leased, dead = pipe.execute()
+        return {"seen": seen, "queued": queued, "leased": leased, "dead": dead}
@@ -0,0 +1,114 @@
+"""
+Crash-safe journal of a ``run_source`` run, so a rerun resumes instead of restarting.
+
+One SQLite file per (source, country) in CRAWL_STATE_DIR records the open
+run (id and ``dt`` partition) and every URL completed in it, committed as
+soon as the page (and its raw blob, if written) is done. A later run of the
+same source picks the unfinished run up again with the same id and
+partition, skips the completed URLs, and at the end writes one manifest
+(core.blobs.RunManifest, key ``manifest-<run_id>.jsonl``) from the journal.
+
+Raw writes are idempotent: blobs are keyed by content hash and the manifest
+key is fixed per run, so retrying after a crash at any point rewrites the
+same objects instead of adding page copies. Unfinished runs older than
+``RUN_RESUME_MAX_AGE_HOURS`` (default 24) are closed out rather than resumed.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+from .dedup import canonical
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+RESUME_MAX_AGE = timedelta(hours=float(os.getenv("RUN_RESUME_MAX_AGE_HOURS", "24")))
+
+
+class RunJournal:
+    """Open run of one (source, country), with its completed URLs."""
+
+    def __init__(self, source: str, country: str, state_dir: Path | None = None):
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.source, self.country = source, country
+        self.db = sqlite3.connect(state_dir / f"run-{source}-{country}.sqlite")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # commits survive a process crash; only power loss may drop the last few
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, dt TEXT NOT NULL, started_at TEXT NOT NULL,
+                                             finished_at TEXT);
+            CREATE TABLE IF NOT EXISTS done (run_id TEXT NOT NULL, url_key TEXT NOT NULL, url TEXT NOT NULL,
+                                             hash TEXT, status INTEGER, charset TEXT, content_type TEXT,
+                                             fetched_at TEXT NOT NULL, PRIMARY KEY (run_id, url_key)) WITHOUT ROWID;
+            """
+        )
+        self.run_id: Optional[str] = None
+        self.dt: Optional[date] = None
+        self.resumed = False
+        self._done: Set[str] = set()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def unfinished(self) -> List[Tuple[str, date, datetime]]:
+        """(run_id, dt, started_at) of runs that never finished, newest first."""
+        rows = self.db.execute("SELECT run_id, dt, started_at FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC")
+        return [(r, date.fromisoformat(d), datetime.fromisoformat(s)) for r, d, s in rows]
+
+    def begin(self, today: date, *, restart: bool = False, now: Optional[datetime] = None) -> List[Tuple[str, date]]:
+        """Resume the newest unfinished run, or start a new one for partition ``today``.
+
+        Returns the (run_id, dt) of older unfinished runs that were not resumed
+        (all of them with ``restart``, or when stale); the caller writes their
+        manifests and then calls ``finish()`` on each.
+        """
+        now = now or datetime.now(timezone.utc)
+        stale = self.unfinished()
+        if stale and not restart and now - stale[0][2] <= RESUME_MAX_AGE:
+            self.run_id, self.dt, _ = stale.pop(0)
+            self.resumed = True
+            self._done = {k for (k,) in self.db.execute("SELECT url_key FROM done WHERE run_id = ?", (self.run_id,))}
+        else:
+            self.run_id = f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+            self.dt = today
+            with self.db:
+                self.db.execute("INSERT INTO runs VALUES (?, ?, ?, NULL)", (self.run_id, today.isoformat(), now.isoformat()))
+        return [(r, d) for r, d, _ in stale]
+
+    def is_done(self, url: str) -> bool:
+        return canonical(url) in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def record(self, url: str, *, digest: Optional[str] = None, status: Optional[int] = None,
+               charset: Optional[str] = None, content_type: Optional[str] = None) -> None:
+        """Commit ``url`` as completed in the open run."""
+        key = canonical(url)
+        now = datetime.now(timezone.utc).isoformat()
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO done VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (self.run_id, key, url, digest, status, charset, content_type, now))
+        self._done.add(key)
+
+    def entries(self, run_id: Optional[str] = None) -> Iterator[Tuple[str, str, int, Optional[str], Optional[str], datetime]]:
+        """(url, hash, status, charset, content_type, fetched_at) of stored pages, in completion order."""
+        rows = self.db.execute(
+            "SELECT url, hash, status, charset, content_type, fetched_at FROM done WHERE run_id = ? AND hash IS NOT NULL "
+            "ORDER BY fetched_at", (run_id or self.run_id,))
+        for url, h, status, charset, ctype, at in rows:
+            yield url, h, status, charset, ctype, datetime.fromisoformat(at)
+
+    def finish(self, run_id: Optional[str] = None) -> None:
+        """Close a run; its URL list is dropped (the manifest holds what was stored)."""
+        run_id = run_id or self.run_id
+        with self.db:
+            self.db.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                            (datetime.now(timezone.utc).isoformat(), run_id))
+            self.db.execute("DELETE FROM done WHERE run_id = ?", (run_id,))
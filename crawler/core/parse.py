@@ -1,56 +1,299 @@
 from __future__ import annotations
 
+import codecs
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# <meta> names/properties mapped to the metadata field they fill. Checked in a
+# single pass alongside title/text extraction.
+_META_AUTHOR = {"author", "article:author", "dc.creator", "parsely-author", "sailthru.author"}
+_META_DATE = {
+    "article:published_time", "og:published_time", "date", "pubdate", "publishdate",
+    "dc.date", "dc.date.issued", "datepublished", "sailthru.date", "parsely-pub-date",
+}
+_META_LANG = {"og:locale", "language", "dc.language", "content-language"}
+# Subtrees whose text is never article content. Form controls are skipped, not
+# <form> itself: ASP.NET WebForms pages wrap the whole body in one. (<input> is
+# void and has no text.)
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "math", "object", "canvas",
+    "nav", "footer", "aside", "button", "select", "textarea", "option",
+}
+# Elements that start/end a text block for link-density scoring.
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "li", "ul", "ol", "dl", "dd", "dt",
+    "h1", "h2", "h3", "h4", "h5", "h6", "table", "tr", "td", "th", "blockquote", "pre",
+    "figure", "figcaption", "br", "hr", "body",
+}
+# Blocks whose share of characters inside <a> exceeds this are menus/link lists.
+MAX_LINK_DENSITY = 0.5
+MAX_TEXT_CHARS = int(os.getenv("PARSE_MAX_TEXT_CHARS", "200000"))
+
+_LD_ARTICLE_TYPES = {"article", "newsarticle", "blogposting", "reportagenewsarticle"}
+
+
+def normalize_date(value: Any) -> Optional[datetime]:
+    """Parse ISO 8601 or RFC 2822 dates into UTC-aware datetimes; naive values are taken as UTC.
+
+    Anything but a non-empty string (e.g. a JSON-LD number) gives None.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def normalize_language(value: Optional[str]) -> Optional[str]:
+    """Reduce a language tag or locale (``pt-BR``, ``pt_PT``) to its primary subtag."""
+    if not value:
+        return None
+    primary = value.strip().replace("_", "-").split("-")[0].lower()
+    return primary if primary.isalpha() and 2 <= len(primary) <= 3 else None
+
+
+def _ld_names(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value.strip()] if value.strip() else []
+    if isinstance(value, dict):
+        return _ld_names(value.get("name"))
+    if isinstance(value, list):
+        return [n for v in value for n in _ld_names(v)]
+    return []
+
+
+def _ld_str(value: Any) -> Optional[str]:
+    """A JSON-LD value as a string: itself, or the first string of a list."""
+    if isinstance(value, list):
+        value = next((v for v in value if isinstance(v, str)), None)
+    return value if isinstance(value, str) else None
+
+
+def _ld_articles(node: Any):
+    """Yield JSON-LD objects that look like articles, including @graph members."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _ld_articles(item)
+    elif isinstance(node, dict):
+        types = node.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if any(isinstance(t, str) and t.lower() in _LD_ARTICLE_TYPES for t in types):
+            yield node
+        if "@graph" in node:
+            yield from _ld_articles(node["@graph"])
 
 
 class _TitleTextParser(HTMLParser):
-    """Very lightweight HTML parser to extract title and visible text.
+    """Very lightweight HTML parser to extract title, visible text and metadata.
 
     Avoids heavy dependencies. Not perfect, but adequate for minimal parsing
-    and unit tests without external libraries.
+    and unit tests without external libraries. Authors, publish date and
+    language are read from JSON-LD, OpenGraph/<meta> tags and ``<html lang>``
+    in the same pass.
+
+    Text from non-content subtrees (scripts, styles, nav, footers, form
+    controls, iframe fallback text and page-level headers) is skipped, blocks dominated by link text are dropped,
+    and output stops growing at ``max_chars``. Input can be fed incrementally
+    with ``feed()``; memory stays bounded by ``max_chars``.
     """
 
-    def __init__(self):
+    def __init__(self, max_chars: int = MAX_TEXT_CHARS):
         super().__init__()
         self._in_title = False
+        self._in_iframe = False  # fallback text right after <iframe>, up to the next tag
+        self._ld_parts: Optional[list[str]] = None
+        self._skip: list[str] = []  # open non-content elements
+        self._content_depth = 0  # open <article>/<main> elements
+        self._link_depth = 0
+        self._block: list[str] = []
+        self._block_chars = 0
+        self._block_link_chars = 0
+        self._chars = 0
+        self._pending: list[str] = []  # current text node, may span feed() calls
+        self._pending_chars = 0
+        self.max_chars = max_chars
         self.title: Optional[str] = None
         self.text_parts: list[str] = []
+        self.ld_json: list[str] = []
+        self.meta_authors: list[str] = []
+        self.meta_date: Optional[str] = None
+        self.meta_lang: Optional[str] = None
+        self.html_lang: Optional[str] = None
 
     def handle_starttag(self, tag, attrs):
-        if tag.lower() == "title":
+        self._flush_text()
+        tag = tag.lower()
+        # Only text belongs in an iframe, so any tag ends it, even without </iframe>
+        self._in_iframe = tag == "iframe" and not self._skip
+        if self._skip:
+            if tag in _SKIP_TAGS or (tag == "header" and not self._content_depth):
+                self._skip.append(tag)
+            return
+        if tag == "title":
             self._in_title = True
+        elif tag == "meta":
+            self._handle_meta(attrs)
+        elif tag == "script" and (dict(attrs).get("type") or "").lower() == "application/ld+json":
+            self._ld_parts = []
+            self._skip.append(tag)
+        elif tag in _SKIP_TAGS or (tag == "header" and not self._content_depth):
+            self._flush_block()
+            self._skip.append(tag)
+        elif tag == "html":
+            self.html_lang = self.html_lang or dict(attrs).get("lang")
+        else:
+            if tag in _BLOCK_TAGS:
+                self._flush_block()
+            if tag in ("article", "main"):
+                self._content_depth += 1
+            elif tag == "a":
+                self._link_depth += 1
+
+    def _handle_meta(self, attrs):
+        a = {k.lower(): v for k, v in attrs if v is not None}
+        key = (a.get("property") or a.get("name") or a.get("itemprop") or a.get("http-equiv") or "").lower()
+        content = (a.get("content") or "").strip()
+        if not key or not content:
+            return
+        if key in _META_AUTHOR and not content.startswith("http"):
+            if content not in self.meta_authors:
+                self.meta_authors.append(content)
+        elif key in _META_DATE:
+            self.meta_date = self.meta_date or content
+        elif key in _META_LANG:
+            self.meta_lang = self.meta_lang or content
 
     def handle_endtag(self, tag):
-        if tag.lower() == "title":
+        self._flush_text()
+        tag = tag.lower()
+        self._in_iframe = False
+        if self._skip:
+            if tag in self._skip:
+                # Also closes elements left open inside it (<option> rarely is closed)
+                while self._skip.pop() != tag:
+                    pass
+                if tag == "script" and self._ld_parts is not None:
+                    self.ld_json.append("".join(self._ld_parts))
+                    self._ld_parts = None
+            elif tag in ("body", "html"):
+                self._skip.clear()  # recover from unclosed non-content elements
+            return
+        if tag == "title":
             self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._flush_block()
+            if tag in ("article", "main"):
+                self._content_depth = max(0, self._content_depth - 1)
+        elif tag == "a":
+            self._link_depth = max(0, self._link_depth - 1)
 
     def handle_data(self, data):
-        if self._in_title:
+        # A text node can arrive in several pieces when input is fed in chunks,
+        # so it is buffered until the next tag.
+        if self._ld_parts is None and (self._skip or self._in_iframe or (
+                not self._in_title and self._chars + self._block_chars + self._pending_chars >= self.max_chars)):
+            return
+        self._pending.append(data)
+        self._pending_chars += len(data)
+
+    def _flush_text(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+        if self._ld_parts is not None:
+            self._ld_parts.append(data)
+        elif self._in_title:
             # keep the first non-empty title
             if (data := data.strip()):
                 self.title = self.title or data
-        else:
+        elif self._chars + self._block_chars < self.max_chars:
             d = data.strip()
             if d:
-                self.text_parts.append(d)
+                self._block.append(d)
+                self._block_chars += len(d)
+                if self._link_depth:
+                    self._block_link_chars += len(d)
+
+    def _flush_block(self) -> None:
+        if self._block and self._block_link_chars <= MAX_LINK_DENSITY * self._block_chars:
+            room = self.max_chars - self._chars
+            if room > 0:
+                text = " ".join(self._block)[:room]
+                self.text_parts.append(text)
+                self._chars += len(text) + 1
+        self._block = []
+        self._block_chars = self._block_link_chars = 0
+
+    def metadata(self) -> Dict[str, Any]:
+        authors: list[str] = []
+        date: Optional[str] = None
+        lang: Optional[str] = None
+        for raw in self.ld_json:
+            try:
+                doc = json.loads(raw)
+            except ValueError:
+                continue
+            for art in _ld_articles(doc):
+                authors = authors or _ld_names(art.get("author"))
+                date = date or _ld_str(art.get("datePublished")) or _ld_str(art.get("dateCreated"))
+                lang = lang or _ld_str(art.get("inLanguage"))
+        return {
+            "authors": authors or self.meta_authors,
+            "published_at": normalize_date(date) or normalize_date(self.meta_date),
+            "language": normalize_language(lang or self.meta_lang or self.html_lang),
+        }
 
-    def result(self) -> Dict[str, Optional[str]]:
+    def result(self) -> Dict[str, Any]:
+        self._flush_text()
+        self._flush_block()
         text = " ".join(self.text_parts).strip() or None
-        return {"title": self.title, "text": text}
+        return {"title": self.title, "text": text, **self.metadata()}
 
 
-def parse_article_basic(html: str) -> Dict[str, Optional[str]]:
+def parse_article_basic(html: str) -> Dict[str, Any]:
     parser = _TitleTextParser()
     parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+def parse_metadata(html: str) -> Dict[str, Any]:
+    """``authors``, ``published_at`` and ``language`` only, without extracting text."""
+    parser = _TitleTextParser(max_chars=0)  # no text budget: body text is not collected or scored
+    parser.feed(html)
+    parser.close()
+    return parser.metadata()
+
+
+def parse_article_stream(chunks: Iterable[Union[str, bytes]], encoding: str = "utf-8") -> Dict[str, Any]:
+    """Basic parse over streamed chunks (str, or bytes decoded incrementally)."""
+    parser = _TitleTextParser()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk)
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
     return parser.result()
 
 
-def parse_article(html: str) -> Dict[str, Optional[str]]:
+def parse_article(html: str) -> Dict[str, Any]:
     """Try to parse article content.
 
-    If BeautifulSoup and readability-lxml are available, prefer them; otherwise
-    fallback to the basic parser.
+    Returns ``title``, ``text``, ``authors``, ``published_at`` and ``language``.
+    If BeautifulSoup and readability-lxml are available, prefer them for
+    title/text; otherwise fallback to the basic parser.
     """
     try:
         from readability import Document  # type: ignore
@@ -60,6 +303,7 @@ def parse_article(html: str) -> Dict[str, Optional[str]]:
         soup = BeautifulSoup(cleaned, "lxml") if BeautifulSoup else None
         title = doc.short_title() or (soup.title.get_text(strip=True) if soup and soup.title else None)
         text = soup.get_text(" ", strip=True) if soup else None
-        return {"title": title, "text": text}
+        # readability drops <head>, so metadata comes from a text-free basic pass
+        return {"title": title, "text": text, **parse_metadata(html)}
     except Exception:
         return parse_article_basic(html)
@@ -0,0 +1,113 @@
+"""
+Process pool for parse_article with a shared-memory body transport.
+
+The parent copies each response body once into a free slot of a single
+multiprocessing.shared_memory slab and submits only (slot, length, encoding)
+to a worker, which decodes straight from the shared buffer. Slots are
+returned to the free list when the parse completes. Bodies larger than a slot
+fall back to regular pickling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+from .parse import parse_article
+
+DEFAULT_SLOT_BYTES = int(os.getenv("PARSE_SHM_SLOT_BYTES", str(4 * 1024 * 1024)))
+
+# Worker-process state, set by _init_worker
+_slab: Optional[shared_memory.SharedMemory] = None
+_slot_bytes = 0
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Pool workers inherit the parent's resource tracker, so a duplicate
+    # registration is harmless; the parent unlinks the slab in close().
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]  # 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(name: str, slot_bytes: int) -> None:
+    global _slab, _slot_bytes
+    _slab = _attach(name)
+    _slot_bytes = slot_bytes
+
+
+def _parse_slot(slot: int, length: int, encoding: str) -> Dict[str, Any]:
+    assert _slab is not None
+    start = slot * _slot_bytes
+    view = _slab.buf[start:start + length]
+    try:
+        html = str(view, encoding, "replace")
+    finally:
+        view.release()
+    return parse_article(html)
+
+
+def _parse_bytes(content: bytes, encoding: str) -> Dict[str, Any]:
+    return parse_article(content.decode(encoding, "replace"))
+
+
+class SharedMemoryParsePool:
+    """Parse HTML bodies in worker processes without pickling the bodies.
+
+    Use as ``async with SharedMemoryParsePool() as pool: await pool.parse(body)``.
+    At most ``slots`` bodies are in flight; further calls wait for a free slot.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, slots: Optional[int] = None,
+                 slot_bytes: int = DEFAULT_SLOT_BYTES):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.slots = slots or 2 * self.max_workers
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * slot_bytes)
+        self._free: List[int] = list(range(self.slots))
+        self._available = asyncio.Semaphore(self.slots)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_worker, initargs=(self._shm.name, slot_bytes)
+        )
+
+    async def parse(self, content: bytes, encoding: str = "utf-8") -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        n = len(content)
+        if n > self.slot_bytes:
+            return await loop.run_in_executor(self._executor, _parse_bytes, content, encoding)
+        await self._available.acquire()
+        slot = self._free.pop()
+        try:
+            start = slot * self.slot_bytes
+            self._shm.buf[start:start + n] = content
+            cf = self._executor.submit(_parse_slot, slot, n, encoding)
+        except BaseException:
+            self._release(slot)
+            raise
+        # Recycle the slot only when the worker is done with it, even if the
+        # awaiting task is cancelled first.
+        cf.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, slot))
+        return await asyncio.wrap_future(cf)
+
+    def _release(self, slot: int) -> None:
+        self._free.append(slot)
+        self._available.release()
+
+    @property
+    def free_slots(self) -> int:
+        return len(self._free)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._shm.close()
+        self._shm.unlink()
+
+    async def __aenter__(self) -> "SharedMemoryParsePool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,230 @@
+"""
+Read side of the storage layout written by the CLI and pipelines.
+
+- raw pages: ``raw/<source>/<country>/dt=YYYY-MM-DD/manifest-*.jsonl`` run
+  manifests pointing at content-addressed blobs (core.blobs), or legacy
+  ``page-*.html.gz`` objects
+- curated Parquet: ``curated/<entity>/<country>/dt=YYYY-MM-DD/*.parquet``
+
+Works against whichever backend storage.get_backend() returns. Raw pages are
+fetched with a bounded thread pool (optionally only their first bytes via
+ranged GETs); curated data is scanned with pyarrow.dataset using column
+projection, partition pruning on ``dt`` and predicate pushdown.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .blobs import is_manifest, read_manifest
+from .encoding import Body, detect_charset
+from .storage import LocalBackend, S3Backend, S3Config, get_backend
+
+log = logging.getLogger("crawler.reader")
+
+DEFAULT_WORKERS = int(os.getenv("READER_WORKERS", "16"))
+
+
+@dataclass(frozen=True)
+class RawPage:
+    path: str
+    content: bytes  # decompressed (possibly truncated when read with max_bytes)
+    metadata: Dict[str, str] = field(default_factory=dict)
+    content_type: Optional[str] = None
+
+    @property
+    def url(self) -> Optional[str]:
+        u = self.metadata.get("url")
+        return unquote(u) if u else None
+
+    @property
+    def body(self) -> Body:
+        enc = self.metadata.get("charset") or detect_charset(self.content, self.content_type)
+        return Body(self.content, enc)
+
+
+def _root(layer: str, name: str, country: str) -> str:
+    return f"{S3Config().bucket}/{layer}/{name}/{country}/"
+
+
+def _dt(prefix_dir: str) -> Optional[str]:
+    last = prefix_dir.rstrip("/").rsplit("/", 1)[-1]
+    return last[3:] if last.startswith("dt=") else None
+
+
+def in_range(dt: str, dt_from: Optional[date], dt_to: Optional[date]) -> bool:
+    """Whether partition ``dt`` (YYYY-MM-DD) lies within the inclusive bounds."""
+    return (dt_from is None or dt >= f"{dt_from:%Y-%m-%d}") and (dt_to is None or dt <= f"{dt_to:%Y-%m-%d}")
+
+
+def list_partitions(layer: str, name: str, country: str) -> List[str]:
+    """Sorted ``dt`` values (YYYY-MM-DD) under ``<layer>/<name>/<country>/``.
+
+    ``layer`` is "raw" (name = source) or "curated" (name = entity).
+    """
+    return sorted(d for d in (_dt(p) for p in get_backend().list_dirs(_root(layer, name, country))) if d)
+
+
+def list_sources(layer: str = "raw") -> List[Tuple[str, str]]:
+    """All (name, country) pairs present under a layer."""
+    backend = get_backend()
+    out: List[Tuple[str, str]] = []
+    for name_dir in backend.list_dirs(f"{S3Config().bucket}/{layer}/"):
+        for country_dir in backend.list_dirs(name_dir):
+            out.append((name_dir.rstrip("/").rsplit("/", 1)[-1], country_dir.rstrip("/").rsplit("/", 1)[-1]))
+    return out
+
+
+def _read_raw(path: str, max_bytes: Optional[int], metadata: Optional[Dict[str, str]] = None,
+              content_type: Optional[str] = None) -> RawPage:
+    end = None if max_bytes is None else max_bytes - 1
+    data, meta = get_backend().get_object(path, 0 if end is not None else None, end)
+    if meta.get("content_encoding") == "gzip" or path.endswith(".gz"):
+        # Streaming decompressor also accepts a truncated (ranged) prefix
+        data = zlib.decompressobj(wbits=31).decompress(data)
+    if metadata is not None:
+        # Blob referenced by a manifest: per-URL fields come from the manifest entry
+        return RawPage(path, data, {**(meta.get("metadata") or {}), **metadata}, content_type or meta.get("content_type"))
+    return RawPage(path, data, meta.get("metadata") or {}, meta.get("content_type"))
+
+
+def _expand(paths: Iterable[str]) -> Iterator[Tuple[str, Optional[Dict[str, str]], Optional[str]]]:
+    for path in paths:
+        if is_manifest(path):
+            yield from read_manifest(path)
+        else:
+            yield path, None, None
+
+
+def iter_raw_pages(source: str, country: str, dt: Optional[str] = None, *, workers: int = DEFAULT_WORKERS,
+                   max_bytes: Optional[int] = None, paths: Optional[Iterable[str]] = None) -> Iterator[RawPage]:
+    """Stream raw pages of one partition (or all partitions when ``dt`` is None), in key order.
+
+    Manifests are expanded into one page per entry, in manifest order.
+
+    Up to ``workers`` GETs are in flight; only ``2 * workers`` pages are held
+    in memory. With ``max_bytes`` only that many compressed bytes are fetched
+    per object (ranged GET), which is enough to read <head> metadata.
+    """
+    if paths is None:
+        dts = [dt] if dt else list_partitions("raw", source, country)
+        paths = (p for d in dts for p in sorted(get_backend().list(f"{_root('raw', source, country)}dt={d}/")))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = []
+        for path, meta, ctype in _expand(paths):
+            pending.append(ex.submit(_read_raw, path, max_bytes, meta, ctype))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for fut in pending:
+            yield fut.result()
+
+
+def _arrow_dataset(files: List[str], base: str):
+    import pyarrow as pa  # type: ignore
+    import pyarrow.dataset as ds  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+
+    backend = get_backend()
+    part = ds.partitioning(pa.schema([("dt", pa.string())]), flavor="hive")
+    schema = None
+    if isinstance(backend, (S3Backend, LocalBackend)) and files:
+        # write_parquet infers each file's schema, so an all-null column is typed
+        # null in one partition and e.g. timestamp in another; read all footers
+        # (concurrently, like raw GETs) and unify when they differ, instead of
+        # letting the first file's schema win
+        def _schema(f: str) -> Any:
+            with backend.open_read(f) as fh:
+                return pq.read_schema(fh)
+
+        with ThreadPoolExecutor(max_workers=min(DEFAULT_WORKERS, len(files))) as ex:
+            schemas = list(ex.map(_schema, files))
+        if any(not sc.equals(schemas[0]) for sc in schemas[1:]):
+            schema = pa.unify_schemas(schemas + [part.schema], promote_options="permissive")
+    if isinstance(backend, S3Backend):
+        return ds.dataset(files, schema=schema, filesystem=backend._fs(), format="parquet",
+                          partitioning=part, partition_base_dir=base)
+    if isinstance(backend, LocalBackend):
+        root = str(backend.root.resolve())
+        return ds.dataset([f"{root}/{f}" for f in files], schema=schema, format="parquet",
+                          partitioning=part, partition_base_dir=f"{root}/{base}")
+    # Other backends (e.g. memory): materialize per-file tables
+    tables = []
+    for f in files:
+        with backend.open_read(f) as fh:
+            t = pq.read_table(fh)
+        tables.append(t.append_column("dt", pa.array([_dt(f.rsplit("/", 1)[0])] * t.num_rows, pa.string())))
+    return ds.dataset(pa.concat_tables(tables, promote_options="default")) if tables else None
+
+
+def scan_curated(entity: str, country: str, *, columns: Optional[List[str]] = None, filter: Any = None,
+                 dt_from: Optional[date] = None, dt_to: Optional[date] = None) -> Iterator[Any]:
+    """Yield pyarrow RecordBatches from curated Parquet partitions.
+
+    ``columns`` projects columns, ``filter`` is a pyarrow.compute expression
+    pushed down to row groups (e.g. ``pc.field("language") == "pt"``), and
+    ``dt_from``/``dt_to`` prune partitions before any file is opened.
+    """
+    base = _root("curated", entity, country)
+    files = [
+        f for d in list_partitions("curated", entity, country) if in_range(d, dt_from, dt_to)
+        for f in sorted(get_backend().list(f"{base}dt={d}/")) if f.endswith(".parquet")
+    ]
+    dataset = _arrow_dataset(files, base)
+    if dataset is None:
+        return
+    yield from dataset.to_batches(columns=columns, filter=filter)
+
+
+def read_curated(entity: str, country: str, **kwargs: Any) -> List[Dict[str, Any]]:
+    """scan_curated() materialized as row dicts."""
+    return [row for batch in scan_curated(entity, country, **kwargs) for row in batch.to_pylist()]
+
+
+def _parse_raw(item: Tuple[bytes, str]) -> Dict[str, Any]:
+    from .parse import parse_article
+
+    content, encoding = item
+    return parse_article(Body(content, encoding).text)
+
+
+def reprocess_pages(pages: Iterable[RawPage], *, country: str, source: str, language: Optional[str] = None,
+                    workers: Optional[int] = None) -> Iterator[Any]:
+    """Parse stored raw pages in a process pool and yield Articles, in input order.
+
+    Pages without a stored URL, or that fail to parse or validate, are logged
+    and skipped. At most ``2 * workers`` pages are in flight so arbitrarily
+    large partitions stream in bounded memory.
+    """
+    from ..pipelines.article import to_article
+
+    def _article(page: RawPage, fut: Any) -> Any:
+        try:
+            return to_article(page.url, None, country=country, language=language, source=source,
+                              parsed=fut.result())
+        except Exception:
+            log.warning("reprocess_failed", extra={"detail": page.path}, exc_info=True)
+            return None
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending: List[Tuple[RawPage, Any]] = []
+        for page in pages:
+            if not page.url:
+                log.warning("reprocess_skipped", extra={"detail": f"{page.path}: no url in metadata"})
+                continue
+            pending.append((page, ex.submit(_parse_raw, (page.content, page.body.encoding))))
+            if len(pending) >= 2 * workers:
+                art = _article(*pending.pop(0))
+                if art is not None:
+                    yield art
+        for page, fut in pending:
+            art = _article(page, fut)
+            if art is not None:
+                yield art
@@ -0,0 +1,283 @@
+"""
+Compact columnar store of per-URL crawl state for millions of URLs.
+
+Instead of one Python object per URL, every field is a slot in a typed
+``array`` column and strings live in shared storage:
+
+- hosts are interned (``host_id`` -> ``hosts`` table), content types too
+- the URL remainder (path + query) and the storage key are appended to one
+  ``bytearray`` arena, addressed by an offset and two lengths
+- ``content_hash`` is kept as its 32-byte sha256 digest
+- lookup by URL is an open-addressing table of 64-bit canonical-URL keys
+  (core.dedup.key64) in two arrays, not a dict of str
+
+Fixed-width bookkeeping is 29 bytes per URL plus the 32-byte digest, and
+the index adds 16-32 bytes (12 per slot, load factor 0.375-0.75), versus
+well over a kilobyte for a PageRaw model per URL. ``bytes_per_record()``
+reports the live figure including the arena. Export is in bulk: ``to_page_raw()``
+validates all rows in one TypeAdapter call and ``to_arrow()`` wraps the
+numeric columns as Arrow buffers without copying.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .dedup import canonical, key64
+
+HASH_BYTES = 32  # sha256 digest
+
+# flags
+_HTTPS = 1
+_HAS_HASH = 2
+
+_EMPTY = -1
+
+
+@lru_cache(maxsize=None)
+def _page_raw_adapter() -> Any:
+    from pydantic import TypeAdapter
+
+    from ..models.schemas import PageRaw
+
+    return TypeAdapter(List[PageRaw])
+
+
+class CrawlRecord:
+    """Read-only snapshot of one record, as returned by CrawlRecords.record()."""
+
+    __slots__ = ("url", "status", "content_hash", "fetched_at", "retries", "storage_key", "content_type")
+
+    def __init__(self, url: str, status: int, content_hash: Optional[str], fetched_at: Optional[datetime],
+                 retries: int, storage_key: str, content_type: Optional[str]):
+        self.url = url
+        self.status = status
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+        self.retries = retries
+        self.storage_key = storage_key
+        self.content_type = content_type
+
+    def __repr__(self) -> str:
+        return f"CrawlRecord({self.url!r}, status={self.status}, retries={self.retries})"
+
+
+class CrawlRecords:
+    """Append-only table of URLs with mutable fixed-width crawl state.
+
+    ``status`` 0 means "not fetched yet"; ``fetched_at`` is stored as whole
+    UTC epoch seconds. Two URLs with the same canonical form share a record.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.hosts: List[str] = []
+        self._host_ids: Dict[str, int] = {}
+        self.content_types: List[str] = [""]
+        self._ctype_ids: Dict[str, int] = {"": 0}
+        self.arena = bytearray()
+        self.host_id = array("I")
+        self.offset = array("Q")
+        self.path_len = array("I")  # 32-bit: a path+query or key may exceed 64 KiB
+        self.key_len = array("I")
+        self.status = array("H")
+        self.fetched_at = array("I")
+        self.retries = array("B")
+        self.flags = array("B")
+        self.ctype = array("B")
+        self.digests = bytearray()
+        size = 1
+        while 3 * size < capacity * 4:
+            size *= 2
+        self._slot_key = array("Q", [0]) * size
+        self._slot_idx = array("i", [_EMPTY]) * size
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    # -- index -------------------------------------------------------------
+    def _find(self, key: int) -> Tuple[int, int]:
+        mask = len(self._slot_idx) - 1
+        slot = key & mask
+        while True:
+            idx = self._slot_idx[slot]
+            if idx == _EMPTY or self._slot_key[slot] == key:
+                return slot, idx
+            slot = (slot + 1) & mask
+
+    def _grow(self) -> None:
+        keys, idxs = self._slot_key, self._slot_idx
+        self._slot_key = array("Q", [0]) * (2 * len(keys))
+        self._slot_idx = array("i", [_EMPTY]) * (2 * len(idxs))
+        for key, idx in zip(keys, idxs):
+            if idx != _EMPTY:
+                slot, _ = self._find(key)
+                self._slot_key[slot] = key
+                self._slot_idx[slot] = idx
+
+    @staticmethod
+    def _key(url: str) -> int:
+        return key64(canonical(url))
+
+    def index(self, url: str) -> Optional[int]:
+        idx = self._find(self._key(url))[1]
+        return None if idx == _EMPTY else idx
+
+    def __contains__(self, url: str) -> bool:
+        return self.index(url) is not None
+
+    # -- writes ------------------------------------------------------------
+    def _intern(self, table: List[str], ids: Dict[str, int], value: str) -> int:
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(table)
+            table.append(value)
+        return i
+
+    def add(self, url: str) -> int:
+        """Return the record index for ``url``, appending a new record if needed."""
+        key = self._key(url)
+        slot, idx = self._find(key)
+        if idx != _EMPTY:
+            return idx
+        parts = urlsplit(url)
+        rest = url[len(parts.scheme) + 3 + len(parts.netloc):].encode("utf-8")
+        idx = len(self.status)
+        self.host_id.append(self._intern(self.hosts, self._host_ids, parts.netloc))
+        self.offset.append(len(self.arena))
+        self.path_len.append(len(rest))
+        self.key_len.append(0)
+        self.arena += rest
+        self.status.append(0)
+        self.fetched_at.append(0)
+        self.retries.append(0)
+        self.flags.append(_HTTPS if parts.scheme == "https" else 0)
+        self.ctype.append(0)
+        self.digests += bytes(HASH_BYTES)
+        self._slot_key[slot] = key
+        self._slot_idx[slot] = idx
+        if 4 * len(self.status) > 3 * len(self._slot_idx):  # keep load factor <= 0.75
+            self._grow()
+        return idx
+
+    def extend(self, urls: Iterable[str]) -> List[int]:
+        return [self.add(u) for u in urls]
+
+    def update(self, idx: int, *, status: Optional[int] = None, content_hash: Optional[str] = None,
+               fetched_at: Optional[datetime] = None, storage_key: Optional[str] = None,
+               content_type: Optional[str] = None, retry: bool = False) -> None:
+        """Set fields of record ``idx``; ``retry`` increments its retry counter (saturating at 255)."""
+        if status is not None:
+            self.status[idx] = status
+        if content_hash is not None:
+            self.digests[idx * HASH_BYTES:(idx + 1) * HASH_BYTES] = bytes.fromhex(content_hash)
+            self.flags[idx] |= _HAS_HASH
+        if fetched_at is not None:
+            self.fetched_at[idx] = int(fetched_at.timestamp())
+        if content_type is not None:
+            # One byte per record: past 255 distinct types, new ones are stored as unknown
+            if content_type in self._ctype_ids or len(self.content_types) < 256:
+                self.ctype[idx] = self._intern(self.content_types, self._ctype_ids, content_type)
+            else:
+                self.ctype[idx] = 0
+        if storage_key is not None:
+            # Keys are appended after the URL only if the record is last in the arena;
+            # otherwise the URL and key are re-appended together (old bytes become garbage).
+            key = storage_key.encode("utf-8")
+            start, plen = self.offset[idx], self.path_len[idx]
+            end = start + plen + self.key_len[idx]
+            if end != len(self.arena):
+                self.arena += self.arena[start:start + plen]
+                start = self.offset[idx] = len(self.arena) - plen
+                end = len(self.arena)
+            del self.arena[start + plen:end]
+            self.arena += key
+            self.key_len[idx] = len(key)
+        if retry:
+            self.retries[idx] = min(self.retries[idx] + 1, 255)
+
+    # -- reads -------------------------------------------------------------
+    def url(self, idx: int) -> str:
+        start = self.offset[idx]
+        rest = self.arena[start:start + self.path_len[idx]].decode("utf-8")
+        scheme = "https" if self.flags[idx] & _HTTPS else "http"
+        return f"{scheme}://{self.hosts[self.host_id[idx]]}{rest}"
+
+    def storage_key(self, idx: int) -> str:
+        start = self.offset[idx] + self.path_len[idx]
+        return self.arena[start:start + self.key_len[idx]].decode("utf-8")
+
+    def content_hash(self, idx: int) -> Optional[str]:
+        if not self.flags[idx] & _HAS_HASH:
+            return None
+        return self.digests[idx * HASH_BYTES:(idx + 1) * HASH_BYTES].hex()
+
+    def record(self, idx: int) -> CrawlRecord:
+        ts = self.fetched_at[idx]
+        return CrawlRecord(
+            self.url(idx), self.status[idx], self.content_hash(idx),
+            datetime.fromtimestamp(ts, timezone.utc) if ts else None, self.retries[idx],
+            self.storage_key(idx), self.content_types[self.ctype[idx]] or None,
+        )
+
+    def bytes_per_record(self) -> float:
+        """Memory of all columns, the arena and the index, divided by the record count."""
+        cols = (self.host_id, self.offset, self.path_len, self.key_len, self.status, self.fetched_at,
+                self.retries, self.flags, self.ctype, self._slot_key, self._slot_idx)
+        total = sum(c.itemsize * len(c) for c in cols) + len(self.arena) + len(self.digests)
+        return total / max(len(self), 1)
+
+    def fetched(self) -> List[int]:
+        return [i for i, s in enumerate(self.status) if s]
+
+    # -- bulk export -------------------------------------------------------
+    def to_page_raw(self, indices: Optional[Sequence[int]] = None) -> List[Any]:
+        """PageRaw models for ``indices`` (default: every fetched record), validated in one call."""
+        rows = []
+        for i in self.fetched() if indices is None else indices:
+            ct = self.content_types[self.ctype[i]]
+            rows.append({
+                "url": self.url(i),
+                "fetched_at": datetime.fromtimestamp(self.fetched_at[i], timezone.utc),
+                "status": self.status[i],
+                "headers": {"content-type": ct} if ct else {},
+                "content_hash": self.content_hash(i) or "",
+                "storage_key": self.storage_key(i),
+            })
+        return _page_raw_adapter().validate_python(rows)
+
+    def to_arrow(self) -> Any:
+        """All records as a pyarrow Table; numeric columns share memory with the arrays."""
+        import pyarrow as pa  # type: ignore
+        import pyarrow.compute as pc  # type: ignore
+
+        n = len(self)
+
+        def col(arr: array, typ: Any) -> Any:
+            return pa.Array.from_buffers(typ, n, [None, pa.py_buffer(arr)])
+
+        has_hash = pa.array([bool(f & _HAS_HASH) for f in self.flags])
+        digests = pa.Array.from_buffers(pa.binary(HASH_BYTES), n, [None, pa.py_buffer(self.digests)])
+        return pa.table({
+            "url": pa.array([self.url(i) for i in range(n)], pa.string()),
+            "host": pa.DictionaryArray.from_arrays(col(self.host_id, pa.uint32()).cast(pa.int32()), pa.array(self.hosts, pa.string())),
+            "status": col(self.status, pa.uint16()),
+            "fetched_at": col(self.fetched_at, pa.uint32()).cast(pa.int64()).cast(pa.timestamp("s", tz="UTC")),
+            "retries": col(self.retries, pa.uint8()),
+            "content_hash": pc.if_else(has_hash, digests, pa.scalar(None, pa.binary(HASH_BYTES))),
+            "content_type": pa.DictionaryArray.from_arrays(
+                col(self.ctype, pa.uint8()).cast(pa.int32()), pa.array(self.content_types, pa.string())),
+            "storage_key": pa.array([self.storage_key(i) for i in range(n)], pa.string()),
+        })
+
+    def write_parquet(self, path: str) -> None:
+        """Write ``to_arrow()`` through the configured storage backend."""
+        import pyarrow.parquet as pq  # type: ignore
+
+        from .storage import get_backend
+
+        with get_backend().open_write(path) as f:
+            pq.write_table(self.to_arrow(), f, compression="zstd")
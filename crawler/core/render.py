@@ -1,11 +1,28 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 # We keep Playwright as an optional dependency. If it's not installed,
 # render() will raise a helpful error unless the caller requests a fallback.
 
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "2"))
+RENDER_TIMEOUT_MS = int(os.getenv("RENDER_TIMEOUT_MS", "30000"))
+RENDER_MIN_TEXT_CHARS = int(os.getenv("RENDER_MIN_TEXT_CHARS", "200"))
+# Subresources a headless page does not need to produce the article DOM
+SKIP_RESOURCES = {"image", "media", "font", "stylesheet"}
+
+# Empty client-side mount points (React/Vue/Next/Nuxt/Gatsby/Angular shells)
+_SHELL_RE = re.compile(
+    r"""<div[^>]*\bid=["'](?:root|app|__next|__nuxt|___gatsby)["'][^>]*>\s*</div>|<app-root[^>]*>\s*</app-root>""",
+    re.I,
+)
+# <noscript> blocks that tell the reader to turn JavaScript on
+_NOSCRIPT_RE = re.compile(r"<noscript[^>]*>(?:(?!</noscript>).){0,500}?javascript", re.I | re.S)
+
 
 class RenderNotAvailable(RuntimeError):
     pass
@@ -53,3 +70,139 @@ async def render_html(url: str, wait_until: str = "networkidle", timeout_ms: int
                 r.raise_for_status()
                 return r.text
         raise RenderNotAvailable("Rendering failed and fallback is disabled.")
+
+
+def needs_render(html: str, parsed: Dict[str, Any], min_chars: int = RENDER_MIN_TEXT_CHARS) -> Optional[str]:
+    """Why a statically fetched page needs a browser, or None when its HTML already has the article.
+
+    Cheap checks on the parse_article result: pages with plenty of text are
+    never rendered; short ones are, when they look like an SPA shell, carry a
+    "please enable JavaScript" <noscript>, or have (almost) no text at all.
+    """
+    n = len((parsed.get("text") or "").strip())
+    if n >= 3 * min_chars:
+        return None
+    if _SHELL_RE.search(html):
+        return "spa_shell"
+    if _NOSCRIPT_RE.search(html):
+        return "noscript"
+    if n < min_chars:
+        return "empty_text" if n == 0 else "short_text"
+    return None
+
+
+async def _skip_heavy(route: Any) -> None:
+    if route.request.resource_type in SKIP_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class RenderPool:
+    """Bounded browser worker pool fed by an async queue.
+
+    ``concurrency`` pages render at a time in one shared Chromium, launched on
+    first use; at most ``queue_size`` URLs wait, so producers calling
+    ``render()`` block instead of piling up work. ``render`` may be replaced
+    (e.g. in tests) by any ``async (url) -> html`` callable.
+    """
+
+    def __init__(self, concurrency: int = RENDER_CONCURRENCY, queue_size: Optional[int] = None, *,
+                 wait_until: str = "networkidle", timeout_ms: int = RENDER_TIMEOUT_MS,
+                 render: Optional[Callable[[str], Awaitable[str]]] = None):
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size or 2 * self.concurrency
+        self.wait_until = wait_until
+        self.timeout_ms = timeout_ms
+        self._render = render or self._browser_render
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pw: Any = None
+        self._browser: Any = None
+        self._unavailable: Optional[str] = None  # why the browser cannot be used, once known
+        self._launch: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "RenderPool":
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._launch = asyncio.Lock()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def render(self, url: str) -> str:
+        """Queue ``url`` and wait for its rendered HTML (RenderNotAvailable without Playwright)."""
+        from ..ops.metrics import render_queue_depth
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((url, fut))
+        render_queue_depth.set(self._queue.qsize())
+        return await fut
+
+    async def _worker(self) -> None:
+        from ..ops.metrics import render_queue_depth, render_seconds
+
+        while True:
+            url, fut = await self._queue.get()
+            render_queue_depth.set(self._queue.qsize())
+            started = time.perf_counter()
+            try:
+                await self._render_one(url, fut)
+            finally:
+                render_seconds.observe(time.perf_counter() - started)
+                self._queue.task_done()
+
+    async def _render_one(self, url: str, fut: asyncio.Future) -> None:
+        # Errors are caught here, not in _worker, so the traceback handed to the
+        # caller holds no frame of the long-lived worker coroutine
+        try:
+            html = await self._render(url)
+        except Exception as exc:
+            if not fut.done():
+                fut.set_exception(exc)
+        else:
+            if not fut.done():
+                fut.set_result(html)
+
+    async def _ensure_browser(self) -> Any:
+        async with self._launch:
+            if self._unavailable is not None:
+                raise RenderNotAvailable(self._unavailable)
+            if self._browser is None:
+                try:
+                    from playwright.async_api import async_playwright  # type: ignore
+                except Exception:
+                    self._unavailable = "Playwright is not installed. Install 'playwright' and browsers to enable rendering."
+                    raise RenderNotAvailable(self._unavailable)
+                try:
+                    self._pw = await async_playwright().start()
+                    self._browser = await self._pw.chromium.launch()
+                except Exception as exc:
+                    self._unavailable = f"Browser launch failed: {exc}"
+                    raise RenderNotAvailable(self._unavailable) from exc
+        return self._browser
+
+    async def _browser_render(self, url: str) -> str:
+        browser = await self._ensure_browser()
+        page = await browser.new_page()
+        try:
+            await page.route("**/*", _skip_heavy)
+            await page.goto(url, wait_until=self.wait_until, timeout=self.timeout_ms)
+            return await page.content()
+        finally:
+            await asyncio.gather(page.close(), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while self._queue is not None and not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            fut.cancel()
+        if self._browser is not None:
+            await asyncio.gather(self._browser.close(), return_exceptions=True)
+        if self._pw is not None:
+            await asyncio.gather(self._pw.stop(), return_exceptions=True)
+        self._browser = self._pw = None
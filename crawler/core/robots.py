@@ -8,9 +8,8 @@ AGENT = "*"
 
 
 @lru_cache(maxsize=1024)
-def robots_for(netloc: str) -> robotparser.RobotFileParser:
+def robots_for(netloc: str, scheme: str = "https") -> robotparser.RobotFileParser:
     rp = robotparser.RobotFileParser()
-    scheme = "https"
     rp.set_url(f"{scheme}://{netloc}/robots.txt")
     try:
         rp.read()
@@ -21,8 +20,8 @@ def robots_for(netloc: str) -> robotparser.RobotFileParser:
 
 
 def allowed(url: str, agent: str = AGENT) -> bool:
-    netloc = urlparse(url).netloc
-    rp = robots_for(netloc)
+    parts = urlparse(url)
+    rp = robots_for(parts.netloc, "http" if parts.scheme == "http" else "https")
     try:
         return rp.can_fetch(agent, url)
     except Exception:
@@ -1,24 +1,41 @@
 from __future__ import annotations
 
 import gzip
+import importlib
 import io
+import json
 import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List
-
-# Lazy import to avoid hard dependency during basic tests
-try:
-    import boto3  # type: ignore
-    import s3fs  # type: ignore
-    import pandas as pd  # type: ignore
-    import pyarrow as pa  # type: ignore
-    import pyarrow.parquet as pq  # type: ignore
-except Exception:  # pragma: no cover
-    boto3 = None
-    s3fs = None
-    pd = None
-    pa = None
-    pq = None
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Optional storage dependencies are imported on first use, not at module load,
+# so importing the CLI/pipelines stays cheap when no storage is written.
+# _UNSET means "not imported yet"; None means "not installed" (tests patch it).
+_UNSET: Any = object()
+boto3: Any = _UNSET
+s3fs: Any = _UNSET
+pa: Any = _UNSET
+pq: Any = _UNSET
+
+
+_MODULES = {"boto3": "boto3", "s3fs": "s3fs", "pa": "pyarrow", "pq": "pyarrow.parquet"}
+
+
+def _load(*names: str) -> None:
+    g = globals()
+    for name in names:
+        if g[name] is _UNSET:
+            try:
+                g[name] = importlib.import_module(_MODULES[name])
+            except Exception:  # pragma: no cover
+                g[name] = None
 
 
 @dataclass(frozen=True)
@@ -31,7 +48,12 @@ class S3Config:
     force_path_style: bool = os.getenv("S3_FORCE_PATH_STYLE", "true").lower() == "true"
 
 
+# Connections kept by one client; sync_to_s3 uses up to 16 upload threads
+S3_MAX_POOL_CONNECTIONS = 32
+
+
 def _client():  # type: ignore
+    _load("boto3")
     if boto3 is None:
         raise RuntimeError("boto3 not available. Install dependencies to use storage features.")
     from boto3.session import Config as BotoConfig  # type: ignore
@@ -42,35 +64,388 @@ def _client():  # type: ignore
         endpoint_url=cfg.endpoint_url,
         aws_access_key_id=cfg.access_key,
         aws_secret_access_key=cfg.secret_key,
-        config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path" if cfg.force_path_style else "auto"}),
+        config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path" if cfg.force_path_style else "auto"},
+                          max_pool_connections=S3_MAX_POOL_CONNECTIONS),
         region_name=cfg.region,
     )
 
 
+# ---------------------------------------------------------------------------
+# Backends. Paths are "<bucket>/<key>", the same form write_parquet always took.
+# ---------------------------------------------------------------------------
+
+IO_BUFFER_BYTES = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """Minimal object-store interface used by the writers in this module.
+
+    Abstract, so a backend missing a method fails when it is created rather
+    than partway through a write.
+    """
+
+    @abstractmethod
+    def put(self, path: str, data: bytes, *, content_type: str = "application/octet-stream",
+            content_encoding: Optional[str] = None, metadata: Optional[Dict[str, str]] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_object(self, path: str, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[bytes, Dict[str, Any]]:
+        """Return (data, meta), optionally only bytes ``start..end`` inclusive (a ranged GET).
+
+        ``meta`` has ``content_type``, ``content_encoding`` and ``metadata``.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list(self, prefix: str) -> Iterator[str]:
+        """Yield full paths starting with ``prefix``."""
+        raise NotImplementedError
+
+    def list_dirs(self, prefix: str) -> List[str]:
+        """Immediate child "directories" of ``prefix`` (which should end with "/")."""
+        return sorted({prefix + p[len(prefix):].split("/", 1)[0] + "/" for p in self.list(prefix) if "/" in p[len(prefix):]})
+
+    @abstractmethod
+    def open_write(self, path: str) -> Any:
+        """Context manager yielding a binary file; the object appears on successful exit."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_read(self, path: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, path: str) -> None:
+        """Remove an object; missing objects are ignored."""
+        raise NotImplementedError
+
+
+def _split(path: str) -> Tuple[str, str]:
+    bucket, _, key = path.partition("/")
+    return bucket, key
+
+
+class S3Backend(StorageBackend):
+    """Objects in S3/MinIO through one boto3 client per backend.
+
+    boto3 clients are thread-safe to use but not to create, and creating one
+    costs more than a small PUT, so the client is built once (under a lock)
+    and shared by all threads.
+    """
+
+    def __init__(self):
+        self._s3: Any = None
+        self._lock = threading.Lock()
+
+    def _client(self) -> Any:
+        if self._s3 is None:
+            with self._lock:
+                if self._s3 is None:
+                    self._s3 = _client()
+        return self._s3
+
+    def put(self, path, data, *, content_type="application/octet-stream", content_encoding=None, metadata=None):
+        bucket, key = _split(path)
+        extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+        self._client().put_object(Bucket=bucket, Key=key, Body=data, ContentType=content_type, Metadata=metadata or {}, **extra)
+
+    def get(self, path):
+        return self.get_object(path)[0]
+
+    def get_object(self, path, start=None, end=None):
+        bucket, key = _split(path)
+        extra = {"Range": f"bytes={start or 0}-{'' if end is None else end}"} if start is not None or end is not None else {}
+        r = self._client().get_object(Bucket=bucket, Key=key, **extra)
+        meta = {"content_type": r.get("ContentType"), "content_encoding": r.get("ContentEncoding"),
+                "metadata": r.get("Metadata") or {}}
+        return r["Body"].read(), meta
+
+    def list_dirs(self, prefix):
+        bucket, key = _split(prefix)
+        out: List[str] = []
+        for page in self._client().get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=key, Delimiter="/"):
+            out.extend(f"{bucket}/{p['Prefix']}" for p in page.get("CommonPrefixes", []))
+        return sorted(out)
+
+    def exists(self, path):
+        bucket, key = _split(path)
+        try:
+            self._client().head_object(Bucket=bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+    def list(self, prefix):
+        bucket, key = _split(prefix)
+        for page in self._client().get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=key):
+            for obj in page.get("Contents", []):
+                yield f"{bucket}/{obj['Key']}"
+
+    def _fs(self):
+        _load("s3fs")
+        if s3fs is None:
+            raise RuntimeError("s3fs not available. Install dependencies to use Parquet on S3.")
+        return _fs()
+
+    def open_write(self, path):
+        return self._fs().open(path, "wb")
+
+    def open_read(self, path):
+        return self._fs().open(path, "rb")
+
+    def delete(self, path):
+        bucket, key = _split(path)
+        self._client().delete_object(Bucket=bucket, Key=key)
+
+
+class LocalBackend(StorageBackend):
+    """Files under ``root``; writes go to a temp file and are renamed into place.
+
+    Object metadata (content type/encoding, user metadata) is kept in a
+    ``<file>.meta.json`` sidecar so a spool directory can be shipped to S3
+    later with sync_to_s3().
+    """
+
+    META_SUFFIX = ".meta.json"
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+
+    def _path(self, path: str) -> Path:
+        p = (self.root / path).resolve()
+        if self.root.resolve() not in p.parents:
+            raise ValueError(f"Path escapes storage root: {path!r}")
+        return p
+
+    @contextmanager
+    def _atomic(self, target: Path) -> Iterator[BinaryIO]:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb", buffering=IO_BUFFER_BYTES) as f:
+                yield f
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def put(self, path, data, *, content_type="application/octet-stream", content_encoding=None, metadata=None):
+        target = self._path(path)
+        meta = {"content_type": content_type, "content_encoding": content_encoding, "metadata": metadata or {}}
+        with self._atomic(target) as f:
+            f.write(data)
+        with self._atomic(target.with_name(target.name + self.META_SUFFIX)) as f:
+            f.write(json.dumps(meta).encode("utf-8"))
+
+    def put_file(self, path: str, src: str | os.PathLike) -> None:
+        """Copy an existing file in (shutil.copyfile uses sendfile/copy_file_range on Linux)."""
+        target = self._path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, path):
+        with open(self._path(path), "rb", buffering=IO_BUFFER_BYTES) as f:
+            return f.read()
+
+    def get_object(self, path, start=None, end=None):
+        with open(self._path(path), "rb", buffering=IO_BUFFER_BYTES) as f:
+            if start:
+                f.seek(start)
+            data = f.read() if end is None else f.read(end - (start or 0) + 1)
+        return data, self.metadata(path)
+
+    def metadata(self, path: str) -> Dict[str, Any]:
+        try:
+            return json.loads(self._path(path + self.META_SUFFIX).read_text())
+        except FileNotFoundError:
+            return {"content_type": "application/octet-stream", "content_encoding": None, "metadata": {}}
+
+    def exists(self, path):
+        return self._path(path).is_file()
+
+    def list(self, prefix):
+        base = self.root.resolve()
+        # Walk only the deepest directory named by the prefix, not the whole store
+        parent = prefix.rsplit("/", 1)[0] if "/" in prefix else ""
+        start = self._path(parent) if parent else base
+        if not start.is_dir():
+            return
+        for dirpath, _, files in os.walk(start):
+            for name in files:
+                if name.startswith(".tmp-") or name.endswith(self.META_SUFFIX):
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), base).replace(os.sep, "/")
+                if rel.startswith(prefix):
+                    yield rel
+
+    def list_dirs(self, prefix):
+        try:
+            entries = os.scandir(self._path(prefix))
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        with entries:
+            return sorted(prefix + e.name + "/" for e in entries if e.is_dir())
+
+    def open_write(self, path):
+        return self._atomic(self._path(path))
+
+    def open_read(self, path):
+        return open(self._path(path), "rb", buffering=IO_BUFFER_BYTES)
+
+    def delete(self, path: str) -> None:
+        for p in (self._path(path), self._path(path + self.META_SUFFIX)):
+            p.unlink(missing_ok=True)
+
+
+class MemoryBackend(StorageBackend):
+    """In-process dict store for tests and benchmarks."""
+
+    def __init__(self):
+        self.objects: Dict[str, Tuple[bytes, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, path, data, *, content_type="application/octet-stream", content_encoding=None, metadata=None):
+        meta = {"content_type": content_type, "content_encoding": content_encoding, "metadata": metadata or {}}
+        with self._lock:
+            self.objects[path] = (bytes(data), meta)
+
+    def get(self, path):
+        return self.get_object(path)[0]
+
+    def get_object(self, path, start=None, end=None):
+        try:
+            data, meta = self.objects[path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+        return data[start or 0:None if end is None else end + 1], meta
+
+    def exists(self, path):
+        return path in self.objects
+
+    def delete(self, path):
+        with self._lock:
+            self.objects.pop(path, None)
+
+    def list(self, prefix):
+        return iter(sorted(p for p in list(self.objects) if p.startswith(prefix)))
+
+    @contextmanager
+    def open_write(self, path):
+        buf = io.BytesIO()
+        yield buf
+        self.put(path, buf.getvalue())
+
+    def open_read(self, path):
+        return io.BytesIO(self.get(path))
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def get_backend() -> StorageBackend:
+    """Active backend, chosen by STORAGE_BACKEND (s3 | local | memory; default s3)."""
+    global _backend
+    if _backend is None:
+        kind = os.getenv("STORAGE_BACKEND", "s3").lower()
+        if kind == "local":
+            _backend = LocalBackend(os.getenv("STORAGE_LOCAL_ROOT", "spool"))
+        elif kind == "memory":
+            _backend = MemoryBackend()
+        else:
+            _backend = S3Backend()
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]) -> None:
+    """Override the active backend (None re-reads STORAGE_BACKEND on next use)."""
+    global _backend
+    _backend = backend
+
+
+def sync_to_s3(spool: LocalBackend, target: Optional[StorageBackend] = None, *, prefix: str = "",
+               workers: int = 16, delete: bool = True) -> Tuple[int, int]:
+    """Upload every object in a local spool to S3 in parallel.
+
+    Content type/encoding and metadata come from the sidecars. Files are
+    removed from the spool after a successful upload when ``delete`` is set.
+    Returns (objects, bytes) uploaded.
+    """
+    target = target or S3Backend()
+
+    def _upload(path: str) -> int:
+        data = spool.get(path)
+        meta = spool.metadata(path)
+        target.put(path, data, content_type=meta["content_type"], content_encoding=meta["content_encoding"],
+                   metadata=meta["metadata"])
+        if delete:
+            spool.delete(path)
+        return len(data)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        sizes = list(ex.map(_upload, list(spool.list(prefix))))
+    return len(sizes), sum(sizes)
+
+
+# ---------------------------------------------------------------------------
+# Writers/readers used by the pipeline. Keys are relative to S3Config().bucket
+# except for the Parquet helpers, which take "<bucket>/<key>" paths.
+# ---------------------------------------------------------------------------
+
+
 def put_gz(key: str, data: bytes, content_type: str = "text/html; charset=utf-8", metadata: Dict[str, str] | None = None) -> None:
-    s3 = _client()
     buf = io.BytesIO()
     with gzip.GzipFile(fileobj=buf, mode="wb") as f:
         f.write(data)
-    s3.put_object(
-        Bucket=S3Config().bucket,
-        Key=key,
-        Body=buf.getvalue(),
-        ContentEncoding="gzip",
-        ContentType=content_type,
-        Metadata=metadata or {},
-    )
+    get_backend().put(f"{S3Config().bucket}/{key}", buf.getvalue(), content_type=content_type,
+                      content_encoding="gzip", metadata=metadata)
 
 
-def write_parquet(path: str, records: List[Dict[str, Any]]) -> None:
-    if s3fs is None or pa is None:
-        raise RuntimeError("Parquet write dependencies not available (s3fs/pyarrow).")
-    fs = s3fs.S3FileSystem(
+def put_bytes(key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+    """Write an uncompressed object (e.g. a JSON manifest) under the bucket."""
+    get_backend().put(f"{S3Config().bucket}/{key}", data, content_type=content_type)
+
+
+def get_bytes(key: str) -> bytes:
+    return get_backend().get(f"{S3Config().bucket}/{key}")
+
+
+def _fs():  # type: ignore
+    return s3fs.S3FileSystem(
         client_kwargs={"endpoint_url": S3Config().endpoint_url},
         key=S3Config().access_key,
         secret=S3Config().secret_key,
     )
-    with fs.open(path, "wb") as f:
-        import pandas as pd  # type: ignore  # ensure lazy import works even if global pd is None
+
+
+def write_parquet(path: str, records: List[Dict[str, Any]]) -> None:
+    _load("pa", "pq")
+    if pa is None:
+        raise RuntimeError("Parquet write dependencies not available (s3fs/pyarrow).")
+    with get_backend().open_write(path) as f:
         table = pa.Table.from_pydict({k: [row.get(k) for row in records] for k in {k for r in records for k in r.keys()}})
         pq.write_table(table, f, compression="zstd")
+
+
+def read_parquet(path: str, columns: List[str] | None = None) -> List[Dict[str, Any]]:
+    """Read a Parquet file written by write_parquet back into row dicts."""
+    _load("pa", "pq")
+    if pq is None:
+        raise RuntimeError("Parquet read dependencies not available (pyarrow).")
+    with get_backend().open_read(path) as f:
+        return pq.read_table(f, columns=columns).to_pylist()
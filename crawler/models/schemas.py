@@ -35,3 +35,21 @@ class Article(BaseModel):
     language: Optional[str]
     source: str
     content_hash: str
+
+
+class SourceEntry(BaseModel):
+    """One entry of the sources.yaml catalog."""
+
+    name: str
+    country: str
+    base_urls: List[str] = []
+    language: Optional[str] = None
+    render: bool = False
+    allow: List[str] = []
+    deny: List[str] = []
+    schedule: Optional[str] = None  # 5-field cron string
+    max_pages: int = 50
+    sitemaps: List[str] = []
+    feeds: List[str] = []
+    discover: bool = False  # also read Sitemap: lines from robots.txt
+    recrawl_budget: int = 0  # >0: refetch at most this many known URLs per run, by change likelihood
@@ -0,0 +1,354 @@
+"""
+Rolling per-host fetch statistics and slow-host detection.
+
+core.fetch records every request here: latency, response bytes, status
+class (``2xx``/``3xx``/``4xx``/``5xx``, with ``429`` counted separately, and
+``error`` for transport failures) and backoff retries.
+
+- Latency goes into a log-bucketed histogram (8 buckets per doubling from
+  0.1 ms, so quantiles are within ~5%); histograms from several windows or
+  processes merge by adding counts.
+- Stats are rolling: each host keeps a ring of ``HOSTSTATS_SLOTS`` windows of
+  ``HOSTSTATS_SLOT_SECONDS`` (default 10 x 60 s).
+- Cardinality is bounded: at most ``HOSTSTATS_MAX_HOSTS`` hosts are tracked.
+  When a new host arrives, the host with the fewest requests is folded into
+  ``other`` (space-saving), and only the busiest ``HOSTSTATS_METRIC_HOSTS``
+  get their own Prometheus label values.
+
+Each process writes a snapshot to ``CRAWL_STATE_DIR/hoststats-<pid>.json``
+(periodically from a background thread, so the fetch path never waits on
+it, and at the end of a run); ``crawler.cli stats`` merges them.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+MAX_HOSTS = int(os.getenv("HOSTSTATS_MAX_HOSTS", "500"))
+METRIC_HOSTS = int(os.getenv("HOSTSTATS_METRIC_HOSTS", "20"))
+SLOT_SECONDS = float(os.getenv("HOSTSTATS_SLOT_SECONDS", "60"))
+SLOTS = int(os.getenv("HOSTSTATS_SLOTS", "10"))
+SAVE_INTERVAL = float(os.getenv("HOSTSTATS_SAVE_SECONDS", "30"))
+
+OTHER = "other"
+_BASE = 1e-4  # seconds
+_PER_DOUBLING = 8
+
+
+def bucket(seconds: float) -> int:
+    return max(0, int(math.log2(max(seconds, _BASE) / _BASE) * _PER_DOUBLING))
+
+
+def bucket_value(b: int) -> float:
+    """Geometric midpoint of bucket ``b`` in seconds."""
+    return _BASE * 2 ** ((b + 0.5) / _PER_DOUBLING)
+
+
+def status_class(status: Optional[int]) -> str:
+    if status is None:
+        return "error"
+    if status == 429:
+        return "429"
+    return f"{status // 100}xx"
+
+
+class Window:
+    """Counters and latency histogram for one host over one time slot."""
+
+    __slots__ = ("start", "requests", "retries", "bytes", "latency_sum", "status", "hist")
+
+    def __init__(self, start: float = 0.0):
+        self.start = start
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.status: Dict[str, int] = {}
+        self.hist: Dict[int, int] = {}
+
+    def merge(self, other: "Window") -> "Window":
+        self.requests += other.requests
+        self.retries += other.retries
+        self.bytes += other.bytes
+        self.latency_sum += other.latency_sum
+        for k, v in other.status.items():
+            self.status[k] = self.status.get(k, 0) + v
+        for k, v in other.hist.items():
+            self.hist[k] = self.hist.get(k, 0) + v
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = sum(self.hist.values())
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for b in sorted(self.hist):
+            seen += self.hist[b]
+            if seen >= rank:
+                return bucket_value(b)
+        return bucket_value(max(self.hist))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "retries": self.retries, "bytes": self.bytes,
+                "latency_sum": self.latency_sum, "status": self.status, "hist": {str(k): v for k, v in self.hist.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Window":
+        w = cls()
+        w.requests, w.retries, w.bytes, w.latency_sum = d["requests"], d["retries"], d["bytes"], d["latency_sum"]
+        w.status = dict(d["status"])
+        w.hist = {int(k): v for k, v in d["hist"].items()}
+        return w
+
+
+def summarize(w: Window, span: float) -> Dict[str, Any]:
+    """Derived figures for a (merged) window covering ``span`` seconds."""
+    n = w.requests
+    rps = n / span if span > 0 else 0.0
+    mean = w.latency_sum / n if n else None
+    return {
+        "requests": n,
+        "rps": round(rps, 3),
+        "bytes": w.bytes,
+        "retries": w.retries,
+        "status": dict(sorted(w.status.items())),
+        "error_rate": round((w.status.get("5xx", 0) + w.status.get("error", 0)) / n, 4) if n else 0.0,
+        "throttle_rate": round(w.status.get("429", 0) / n, 4) if n else 0.0,
+        "mean": mean,
+        "p50": w.quantile(0.5),
+        "p90": w.quantile(0.9),
+        "p99": w.quantile(0.99),
+        # Little's law: requests in flight needed to sustain the observed rate
+        "inflight": round(rps * mean, 2) if mean is not None else 0.0,
+    }
+
+
+class HostStatsRegistry:
+    """Rolling stats for up to ``max_hosts`` hosts plus an ``other`` bucket."""
+
+    def __init__(self, max_hosts: int = MAX_HOSTS, slot_seconds: float = SLOT_SECONDS, slots: int = SLOTS,
+                 clock=time.time):
+        self.max_hosts = max_hosts
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.clock = clock
+        self.hosts: Dict[str, Deque[Window]] = {}
+        self.totals: Dict[str, int] = {}  # requests per tracked host, for eviction
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one snapshot write at a time
+        self._saver: Optional[threading.Thread] = None
+        self._saved_at = clock()
+
+    def _key(self, host: str) -> str:
+        if host in self.hosts:
+            return host
+        if len(self.hosts) < self.max_hosts or host == OTHER:
+            return host
+        candidates = [h for h in self.hosts if h != OTHER]
+        if not candidates:
+            return OTHER
+        # Space-saving: fold the least-requested host into "other"; the newcomer
+        # inherits its count so it is not evicted again on the next new host
+        victim = min(candidates, key=self.totals.__getitem__)
+        ring = self.hosts.pop(victim)
+        floor = self.totals.pop(victim)
+        for w in ring:
+            self._slot(OTHER, w.start).merge(w)
+            self.totals[OTHER] += w.requests
+        self.totals[host] = floor
+        return host
+
+    def _slot(self, host: str, now: float) -> Window:
+        ring = self.hosts.setdefault(host, deque())
+        self.totals.setdefault(host, 0)
+        start = now - now % self.slot_seconds
+        for w in reversed(ring):
+            if w.start == start:
+                return w
+            if w.start < start:
+                break
+        w = Window(start)
+        ring.append(w)
+        if len(ring) > 1 and ring[-2].start > start:
+            # Out-of-order slot (merging old windows): keep the ring sorted
+            items = sorted(ring, key=lambda x: x.start)
+            ring.clear()
+            ring.extend(items)
+        while len(ring) > self.slots or (ring and ring[0].start <= start - self.slots * self.slot_seconds):
+            ring.popleft()
+        return w
+
+    def record(self, url_or_host: str, seconds: float, status: Optional[int], nbytes: int = 0) -> None:
+        host = urlsplit(url_or_host).netloc if "://" in url_or_host else url_or_host
+        now = self.clock()
+        with self._lock:
+            key = self._key(host)
+            w = self._slot(key, now)
+            w.requests += 1
+            w.bytes += nbytes
+            w.latency_sum += seconds
+            cls = status_class(status)
+            w.status[cls] = w.status.get(cls, 0) + 1
+            b = bucket(seconds)
+            w.hist[b] = w.hist.get(b, 0) + 1
+            self.totals[key] += 1
+            due = SAVE_INTERVAL > 0 and now - self._saved_at >= SAVE_INTERVAL
+            if due:
+                self._saved_at = now
+        if due:
+            self._flush_in_background()
+
+    def _flush_in_background(self) -> None:
+        # record() runs on the fetch path (often the event loop): rebuilding the
+        # gauges and writing the file there would stall every in-flight request
+        if self._saver is not None and self._saver.is_alive():
+            return
+        self._saver = threading.Thread(target=self.flush, name="hoststats-save", daemon=True)
+        self._saver.start()
+
+    def flush(self) -> None:
+        """Export gauges and write the snapshot file (errors are ignored: stats are best effort)."""
+        self._saved_at = self.clock()
+        if not self.hosts:
+            return
+        with self._save_lock:
+            self.export_metrics()
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def retry(self, url_or_host: str) -> None:
+        host = urlsplit(url_or_host).netloc if "://" in url_or_host else url_or_host
+        with self._lock:
+            self._slot(self._key(host), self.clock()).retries += 1
+
+    def windows(self) -> Tuple[Dict[str, Window], float]:
+        """Merged live window per host and the time span it covers."""
+        now = self.clock()
+        horizon = now - now % self.slot_seconds - (self.slots - 1) * self.slot_seconds
+        out: Dict[str, Window] = {}
+        oldest = now
+        with self._lock:
+            for host, ring in self.hosts.items():
+                merged = Window()
+                for w in ring:
+                    if w.start >= horizon:
+                        merged.merge(w)
+                        oldest = min(oldest, w.start)
+                if merged.requests or merged.retries:
+                    out[host] = merged
+        return out, max(now - oldest, 1e-9)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        windows, span = self.windows()
+        return {host: summarize(w, span) for host, w in windows.items()}
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Atomically write this process's merged windows as JSON."""
+        windows, span = self.windows()
+        path = Path(path or STATE_DIR / f"hoststats-{os.getpid()}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"updated_at": self.clock(), "span": span,
+                                   "hosts": {h: w.to_dict() for h, w in windows.items()}}))
+        os.replace(tmp, path)
+        return path
+
+    def export_metrics(self, top: int = METRIC_HOSTS) -> None:
+        """Set Prometheus gauges for the ``top`` busiest hosts; the rest are summed under ``other``."""
+        from .metrics import host_bytes, host_latency_seconds, host_requests, host_retries
+
+        windows, span = self.windows()
+        ranked = sorted(windows, key=lambda h: windows[h].requests, reverse=True)
+        shown: Dict[str, Window] = {h: windows[h] for h in ranked[:top] if h != OTHER}
+        rest = Window()
+        for h in ranked:
+            if h not in shown:
+                rest.merge(windows[h])
+        if rest.requests:
+            shown[OTHER] = rest
+        for g in (host_requests, host_latency_seconds, host_bytes, host_retries):
+            g.clear()
+        for host, w in shown.items():
+            for cls, n in w.status.items():
+                host_requests.labels(host=host, status=cls).set(n)
+            for q in (0.5, 0.9, 0.99):
+                value = w.quantile(q)
+                if value is not None:
+                    host_latency_seconds.labels(host=host, quantile=str(q)).set(value)
+            host_bytes.labels(host=host).set(w.bytes)
+            host_retries.labels(host=host).set(w.retries)
+
+
+def load_snapshots(state_dir: Optional[Path] = None, max_age: float = 86400.0,
+                   now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """Merge every process's saved snapshot (younger than ``max_age`` seconds) into host summaries."""
+    now = time.time() if now is None else now
+    merged: Dict[str, Window] = {}
+    span = 0.0
+    for path in sorted(Path(state_dir or STATE_DIR).glob("hoststats-*.json")):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if now - data.get("updated_at", 0) > max_age:
+            continue
+        span = max(span, data.get("span", 0.0))
+        for host, d in data["hosts"].items():
+            merged.setdefault(host, Window()).merge(Window.from_dict(d))
+    return {host: summarize(w, span) for host, w in merged.items()}
+
+
+def slow_hosts(summaries: Dict[str, Dict[str, Any]], *, p90: float = 2.0, error_rate: float = 0.05,
+               throttle_rate: float = 0.01, min_requests: int = 20) -> List[Tuple[str, List[str]]]:
+    """Hosts that are slow, erroring or throttling us, with the reasons, worst first."""
+    out = []
+    for host, s in summaries.items():
+        if s["requests"] < min_requests:
+            continue
+        reasons = []
+        if s["p90"] is not None and s["p90"] > p90:
+            reasons.append(f"p90={s['p90']:.2f}s")
+        if s["error_rate"] > error_rate:
+            reasons.append(f"errors={s['error_rate']:.1%}")
+        if s["throttle_rate"] > throttle_rate:
+            reasons.append(f"429s={s['throttle_rate']:.1%}")
+        if reasons:
+            out.append((host, reasons))
+    return sorted(out, key=lambda item: (-len(item[1]), -(summaries[item[0]]["p90"] or 0)))
+
+
+_registry: Dict[str, HostStatsRegistry] = {}
+
+
+def get_registry() -> HostStatsRegistry:
+    """Process-wide registry used by core.fetch."""
+    reg = _registry.get("r")
+    if reg is None:
+        reg = _registry["r"] = HostStatsRegistry()
+    return reg
+
+
+def format_table(summaries: Dict[str, Dict[str, Any]], sort: str = "requests", top: int = 20) -> str:
+    def ms(v: Optional[float]) -> str:
+        return "-" if v is None else f"{v * 1000:.0f}"
+
+    rows = sorted(summaries.items(), key=lambda kv: kv[1].get(sort) or 0, reverse=True)[:top]
+    lines = [f"{'host':<40} {'req':>7} {'rps':>7} {'p50ms':>7} {'p90ms':>7} {'p99ms':>7} {'err%':>6} {'429%':>6} {'retry':>6} {'MiB':>8} {'inflight':>8}"]
+    for host, s in rows:
+        lines.append(
+            f"{host[:40]:<40} {s['requests']:>7} {s['rps']:>7.2f} {ms(s['p50']):>7} {ms(s['p90']):>7} {ms(s['p99']):>7} "
+            f"{s['error_rate'] * 100:>6.1f} {s['throttle_rate'] * 100:>6.1f} {s['retries']:>6} {s['bytes'] / 2**20:>8.2f} {s['inflight']:>8.2f}"
+        )
+    return "\n".join(lines)
@@ -1,12 +1,32 @@
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import logging.handlers
 import os
-from typing import Any, Dict
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Optional fast JSON encoder; falls back to the stdlib json module.
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def _json_dumps(obj: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str)
 
 
 class JsonFormatter(logging.Formatter):
+    def __init__(self, dumps: Optional[Callable[[Dict[str, Any]], str]] = None):
+        super().__init__()
+        self._dumps = dumps or _json_dumps
+
     def format(self, record: logging.LogRecord) -> str:  # type: ignore[override]
         log: Dict[str, Any] = {
             "level": record.levelname,
@@ -14,17 +34,146 @@ class JsonFormatter(logging.Formatter):
             "logger": record.name,
         }
         # Attach context if present
-        for key in ("job_id", "source", "country"):
+        for key in ("job_id", "source", "country", "detail"):
             if hasattr(record, key):
                 log[key] = getattr(record, key)
         if record.exc_info:
             log["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(log, ensure_ascii=False)
+        return self._dumps(log)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every N records for high-volume events.
+
+    ``rates`` maps an event name (the log message, e.g. ``"fetched_parsed"``)
+    to N. Records at WARNING or above are never sampled out.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = {k: v for k, v in rates.items() if v > 1}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        n = self.rates.get(record.msg) if isinstance(record.msg, str) else None
+        if n is None or record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            c = self._counts.get(record.msg, 0)
+            self._counts[record.msg] = c + 1
+        return c % n == 0
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Non-blocking QueueHandler over a bounded queue.
+
+    Records are enqueued unformatted so JSON encoding happens on the listener
+    thread. When the queue is full the record is dropped and counted instead of
+    blocking the caller (typically the event loop).
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: no pickling, so keep exc_info for the listener.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
+def parse_sample_rates(spec: str) -> Dict[str, int]:
+    """Parse ``"fetched_parsed=10,raw_written=5"`` into a rates dict."""
+    rates: Dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, n = part.strip().partition("=")
+        if name and n.strip().isdigit():
+            rates[name] = int(n)
+    return rates
 
-def configure_logging(level: str | int = None) -> None:
+
+_state: Dict[str, Any] = {"key": None, "listener": None, "handler": None}
+
+
+def _stop_listener() -> None:
+    listener = _state.get("listener")
+    if listener is not None:
+        listener.stop()  # drains remaining records
+        _state["listener"] = None
+
+
+atexit.register(_stop_listener)
+
+
+def queue_size() -> int:
+    """Records waiting in the logging queue (0 when logging is synchronous)."""
+    listener = _state.get("listener")
+    return listener.queue.qsize() if listener is not None else 0
+
+
+def flush_queue() -> int:
+    """Hand queued records to the handler on the calling thread; returns how many.
+
+    Lets memory pressure empty the queue without waiting for the listener
+    thread. No-op when logging is synchronous.
+    """
+    listener = _state.get("listener")
+    if listener is None:
+        return 0
+    q = listener.queue
+    n = 0
+    while True:
+        try:
+            record = q.get_nowait()
+        except queue.Empty:
+            break
+        if record is listener._sentinel:  # stop() in progress: leave it for the listener
+            q.put_nowait(record)
+            break
+        listener.handle(record)
+        q.task_done()
+        n += 1
+    return n
+
+
+def configure_logging(level: str | int = None, *, use_queue: bool | None = None, queue_size: int | None = None,
+                      sample: Dict[str, int] | None = None, force: bool = False) -> None:
+    """Install the JSON handler on the root logger.
+
+    Idempotent: repeated calls with the same settings are no-ops while our
+    handler is still installed. ``use_queue`` (env ``LOG_QUEUE``) routes records
+    through a bounded queue (``LOG_QUEUE_SIZE``) to a listener thread; ``sample``
+    (env ``LOG_SAMPLE``, e.g. ``fetched_parsed=10``) thins high-volume events.
+    """
     lvl = level or os.getenv("LOG_LEVEL", "INFO")
+    if use_queue is None:
+        use_queue = os.getenv("LOG_QUEUE", "false").lower() in ("1", "true", "yes")
+    qsize = queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    rates = sample if sample is not None else parse_sample_rates(os.getenv("LOG_SAMPLE", ""))
+
+    key = (lvl, use_queue, qsize, tuple(sorted(rates.items())))
+    if not force and _state["key"] == key and _state["handler"] in logging.root.handlers:
+        return
+
+    _stop_listener()
     logging.root.handlers.clear()
-    handler = logging.StreamHandler()
+    handler: logging.Handler = logging.StreamHandler()
     handler.setFormatter(JsonFormatter())
+    if use_queue:
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=qsize)
+        listener = logging.handlers.QueueListener(q, handler, respect_handler_level=True)
+        listener.start()
+        _state["listener"] = listener
+        handler = DroppingQueueHandler(q)
+    if rates:
+        # Sample before enqueueing so dropped records cost nothing downstream.
+        handler.addFilter(SamplingFilter(rates))
     logging.basicConfig(level=lvl, handlers=[handler])
+    _state["key"] = key
+    _state["handler"] = handler
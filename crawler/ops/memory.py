@@ -0,0 +1,178 @@
+"""
+Memory budget: RSS watchdog, tracked caches/queues, and backpressure hooks.
+
+Enabled by ``MEMORY_BUDGET_MB`` (0 = off). The process is under *soft*
+pressure above ``MEMORY_SOFT_RATIO`` of the budget (default 0.8) and *hard*
+pressure above ``MEMORY_HARD_RATIO`` (default 0.95):
+
+- soft: registered caches are shrunk (e.g. the robots.txt parser LRU) and
+  the garbage collector runs; frontier consumers claim smaller batches
+- hard: additionally, registered writers flush what they buffer (the log
+  queue is drained, reprocessing writes out its pending rows), and
+  ``relieve()`` pauses the caller until RSS drops below the hard mark (or
+  ``MEMORY_PAUSE_MAX_SECONDS`` passes), so fetching stops feeding the heap
+
+RSS, the budget, the pressure level and every tracked size are exported as
+Prometheus gauges.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import os
+import resource
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .metrics import memory_budget_bytes, memory_pressure, memory_rss_bytes, memory_shrinks_total, memory_tracked_items
+
+log = logging.getLogger("crawler.memory")
+
+OK, SOFT, HARD = 0, 1, 2
+_LEVELS = {OK: "ok", SOFT: "soft", HARD: "hard"}
+
+BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "0"))
+SOFT_RATIO = float(os.getenv("MEMORY_SOFT_RATIO", "0.8"))
+HARD_RATIO = float(os.getenv("MEMORY_HARD_RATIO", "0.95"))
+PAUSE_MAX_SECONDS = float(os.getenv("MEMORY_PAUSE_MAX_SECONDS", "30"))
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux ``/proc``; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryBudget:
+    """Tracks RSS against a byte budget and runs shrink/flush hooks under pressure."""
+
+    def __init__(self, limit_bytes: int, *, soft_ratio: float = SOFT_RATIO, hard_ratio: float = HARD_RATIO,
+                 rss: Callable[[], int] = rss_bytes):
+        self.limit = limit_bytes
+        self.soft = int(limit_bytes * soft_ratio)
+        self.hard = int(limit_bytes * hard_ratio)
+        self._rss = rss
+        self._sizes: Dict[str, Callable[[], int]] = {}
+        self._shrinkers: Dict[str, Callable[[], None]] = {}
+        self._flushers: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.level = OK
+        memory_budget_bytes.set(limit_bytes)
+
+    def track(self, name: str, size: Callable[[], int], shrink: Optional[Callable[[], None]] = None) -> None:
+        """Export ``size()`` as ``memory_tracked_items{name}``; ``shrink()`` runs under soft pressure."""
+        self._sizes[name] = size
+        if shrink is not None:
+            self._shrinkers[name] = shrink
+
+    def on_flush(self, name: str, flush: Callable[[], None]) -> None:
+        """Register a writer flush to run under hard pressure."""
+        self._flushers[name] = flush
+
+    def remove(self, name: str) -> None:
+        for d in (self._sizes, self._shrinkers, self._flushers):
+            d.pop(name, None)
+
+    def sizes(self) -> Dict[str, int]:
+        out = {}
+        for name, fn in list(self._sizes.items()):
+            try:
+                out[name] = int(fn())
+            except Exception:
+                continue
+            memory_tracked_items.labels(name=name).set(out[name])
+        return out
+
+    def check(self) -> int:
+        """Sample RSS, update gauges, run hooks for the current level, and return it."""
+        rss = self._rss()
+        level = HARD if rss >= self.hard else SOFT if rss >= self.soft else OK
+        memory_rss_bytes.set(rss)
+        memory_pressure.set(level)
+        self.sizes()
+        if level > OK:
+            with self._lock:
+                self._relieve(level, rss)
+        self.level = level
+        return level
+
+    def _relieve(self, level: int, rss: int) -> None:
+        hooks: List[Callable[[], None]] = list(self._shrinkers.values())
+        if level == HARD:
+            hooks += list(self._flushers.values())
+        for hook in hooks:
+            try:
+                hook()
+            except Exception:
+                log.warning("memory_hook_failed", exc_info=True)
+        gc.collect()
+        memory_shrinks_total.labels(level=_LEVELS[level]).inc()
+        log.warning("memory_pressure", extra={"detail": f"level={_LEVELS[level]} rss={rss} budget={self.limit}"})
+
+    async def relieve(self, max_wait: float = PAUSE_MAX_SECONDS, poll: float = 0.5) -> int:
+        """Backpressure point for async loops: under hard pressure wait for RSS to drop."""
+        level = self.check()
+        deadline = time.monotonic() + max_wait
+        while level == HARD and time.monotonic() < deadline:
+            await asyncio.sleep(poll)
+            level = self.check()
+        return level
+
+    def start_watchdog(self, interval: float = 5.0) -> None:
+        """Check from a daemon thread every ``interval`` seconds (for sync workers)."""
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=loop, name="memory-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop_watchdog(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        self._stop.clear()
+
+
+_budget: Dict[str, Optional[MemoryBudget]] = {}
+
+
+def get_budget() -> Optional[MemoryBudget]:
+    """Process-wide budget from MEMORY_BUDGET_MB, or None when disabled.
+
+    Registers the caches that grow with crawl size: the robots.txt parser LRU
+    and, when logging goes through a queue, the log queue (drained under hard
+    pressure).
+    """
+    if "b" in _budget:
+        return _budget["b"]
+    budget = None
+    if BUDGET_MB > 0:
+        from ..core.robots import robots_for
+        from . import logging as crawler_logging
+
+        budget = MemoryBudget(BUDGET_MB * 2**20)
+        budget.track("robots_cache", lambda: robots_for.cache_info().currsize, robots_for.cache_clear)
+        budget.track("log_queue", crawler_logging.queue_size)
+        budget.on_flush("log_queue", crawler_logging.flush_queue)
+    _budget["b"] = budget
+    return budget
+
+
+def set_budget(budget: Optional[MemoryBudget]) -> Optional[MemoryBudget]:
+    """Install a process-wide budget (or None); returns the previous one."""
+    prev = _budget.get("b")
+    _budget["b"] = budget
+    return prev
@@ -1,25 +1,98 @@
 from __future__ import annotations
 
-# Optional Prometheus counters. Provide no-op fallbacks when the dependency is missing
-try:
-    from prometheus_client import Counter, start_http_server  # type: ignore
-except Exception:  # pragma: no cover
-    class _NoopCounter:
-        def labels(self, *args, **kwargs):
-            return self
+from typing import Any, List, Optional
 
-        def inc(self, *args, **kwargs):
-            return None
+# Optional Prometheus counters. prometheus_client is imported on first use so
+# that importing the CLI does not pay for it; no-op fallbacks are used when the
+# dependency is missing.
 
-        def observe(self, *args, **kwargs):
-            return None
 
-    def Counter(*args, **kwargs):  # type: ignore
-        return _NoopCounter()
+class _NoopCounter:
+    def labels(self, *args, **kwargs):
+        return self
 
-    def start_http_server(port: int):  # type: ignore
+    def inc(self, *args, **kwargs):
+        return None
+
+    def dec(self, *args, **kwargs):
+        return None
+
+    def set(self, *args, **kwargs):
+        return None
+
+    def observe(self, *args, **kwargs):
+        return None
+
+    def clear(self):
+        return None
+
+
+_prom: Any = None
+
+
+def _prometheus():
+    global _prom
+    if _prom is None:
+        try:
+            import prometheus_client  # type: ignore
+            _prom = prometheus_client
+        except Exception:  # pragma: no cover
+            _prom = False
+    return _prom
+
+
+def start_http_server(port: int):  # type: ignore
+    prom = _prometheus()
+    if not prom:
         # No-op if prometheus_client is not installed
         return None
+    return prom.start_http_server(port)
+
+
+class _LazyMetric:
+    """Metric proxy that creates the real Prometheus metric on first use."""
+
+    def __init__(self, kind: str, name: str, documentation: str, labelnames: List[str], **kwargs: Any):
+        self._kind = kind
+        self._args = (name, documentation, labelnames)
+        self._kwargs = kwargs
+        self._metric: Optional[Any] = None
+
+    def _get(self):
+        if self._metric is None:
+            prom = _prometheus()
+            self._metric = getattr(prom, self._kind)(*self._args, **self._kwargs) if prom else _NoopCounter()
+        return self._metric
+
+    def labels(self, *args, **kwargs):
+        return self._get().labels(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Unlabelled metrics: inc/dec/set/observe go straight to the real metric
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
+
+_registered: List[_LazyMetric] = []
+
+
+def _lazy(kind: str, name: str, documentation: str, labelnames: List[str], **kwargs: Any) -> _LazyMetric:
+    metric = _LazyMetric(kind, name, documentation, labelnames, **kwargs)
+    _registered.append(metric)
+    return metric
+
+
+def Counter(name: str, documentation: str, labelnames: List[str] = ()) -> _LazyMetric:  # type: ignore
+    return _lazy("Counter", name, documentation, list(labelnames))
+
+
+def Gauge(name: str, documentation: str, labelnames: List[str] = ()) -> _LazyMetric:  # type: ignore
+    return _lazy("Gauge", name, documentation, list(labelnames))
+
+
+def Histogram(name: str, documentation: str, labelnames: List[str] = (), **kwargs: Any) -> _LazyMetric:  # type: ignore
+    return _lazy("Histogram", name, documentation, list(labelnames), **kwargs)
 
 
 def start_metrics_server(port: int = 8000) -> None:
@@ -28,6 +101,9 @@ def start_metrics_server(port: int = 8000) -> None:
     If prometheus_client is not installed, this function is a no-op.
     """
     try:
+        # Materialize metrics so they are exported before their first increment
+        for m in _registered:
+            m._get()
         start_http_server(port)  # type: ignore
     except Exception:
         # Silently ignore to avoid breaking runtime in minimal environments
@@ -35,5 +111,27 @@ def start_metrics_server(port: int = 8000) -> None:
 
 
 crawled_pages_total = Counter("crawled_pages_total", "Total pages successfully crawled", ["source", "country"])
-fetch_errors_total = Counter("fetch_errors_total", "Total fetch errors", ["source", "country"]) 
-bytes_written_total = Counter("bytes_written_total", "Total bytes written to storage", ["layer", "source", "country"]) 
+fetch_errors_total = Counter("fetch_errors_total", "Total fetch errors", ["source", "country"])
+bytes_written_total = Counter("bytes_written_total", "Total bytes written to storage", ["layer", "source", "country"])
+
+scheduler_running_jobs = Gauge("scheduler_running_jobs", "Scheduled source runs currently executing")
+scheduler_queue_lag_seconds = Histogram(
+    "scheduler_queue_lag_seconds", "Delay between a scheduled run becoming due and starting",
+    buckets=(0.1, 1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
+scheduler_skipped_runs_total = Counter("scheduler_skipped_runs_total", "Scheduled runs skipped because the previous run was still active", ["source", "country"])
+raw_blobs_reused_total = Counter("raw_blobs_reused_total", "Raw pages whose body was already stored (no upload)", ["source", "country"])
+recrawl_unchanged_total = Counter("recrawl_unchanged_total", "Refetches whose content had not changed", ["source", "country"])
+memory_rss_bytes = Gauge("memory_rss_bytes", "Resident set size of the process")
+memory_budget_bytes = Gauge("memory_budget_bytes", "Configured memory budget (MEMORY_BUDGET_MB)")
+memory_pressure = Gauge("memory_pressure", "Memory pressure level: 0 ok, 1 soft, 2 hard")
+memory_tracked_items = Gauge("memory_tracked_items", "Entries in tracked caches and queues", ["name"])
+memory_shrinks_total = Counter("memory_shrinks_total", "Cache shrink/flush rounds triggered by memory pressure", ["level"])
+host_requests = Gauge("host_requests", "Requests per host and status class in the rolling window (top hosts plus 'other')", ["host", "status"])
+host_latency_seconds = Gauge("host_latency_seconds", "Per-host fetch latency quantiles in the rolling window", ["host", "quantile"])
+host_bytes = Gauge("host_bytes", "Response bytes per host in the rolling window", ["host"])
+host_retries = Gauge("host_retries", "Backoff retries per host in the rolling window", ["host"])
+render_decisions_total = Counter("render_decisions_total", "Static-first render decisions: 'static' or the reason a page was rendered", ["source", "country", "decision"])
+render_queue_depth = Gauge("render_queue_depth", "URLs waiting for a browser page")
+render_seconds = Histogram("render_seconds", "Time to render one page in the browser pool",
+                           buckets=(0.5, 1, 2, 5, 10, 20, 30, 60))
@@ -0,0 +1,127 @@
+"""
+Per-URL recrawl policy driven by observed change rates.
+
+Each fetch of a URL is compared with the previous ``content_hash``. Changes
+are modelled as a Poisson process, so the rate estimate is
+
+    rate = (changes + 0.5) / (observed_seconds + 0.5 / PRIOR_RATE)
+
+(a weak prior of half a change per ``1 / PRIOR_RATE`` seconds keeps new
+URLs from getting 0 or infinite rates). The probability that a URL has
+changed ``t`` seconds after its last fetch is ``1 - exp(-rate * t)``.
+
+A source's fetch budget goes to the URLs with the highest probability that
+are past their next-visit time, selected with a heap. URLs not fetched for
+``max_interval`` are always eligible. State lives in SQLite under
+CRAWL_STATE_DIR next to the delta and discovery state.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ..core.dedup import canonical
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+PRIOR_RATE = 1 / 86400  # one change per day until observed otherwise
+MIN_INTERVAL = int(os.getenv("RECRAWL_MIN_INTERVAL", "300"))
+MAX_INTERVAL = int(os.getenv("RECRAWL_MAX_INTERVAL", str(7 * 86400)))
+TARGET_PROBABILITY = float(os.getenv("RECRAWL_TARGET_PROBABILITY", "0.5"))
+
+
+def _ts(when: Optional[datetime]) -> float:
+    return (when or datetime.now(timezone.utc)).timestamp()
+
+
+def change_rate(changes: int, observed_seconds: float, prior_rate: float = PRIOR_RATE) -> float:
+    """Estimated changes per second."""
+    return (changes + 0.5) / (observed_seconds + 0.5 / prior_rate)
+
+
+def change_probability(rate: float, elapsed: float) -> float:
+    return 1.0 - math.exp(-rate * max(elapsed, 0.0))
+
+
+class RecrawlPolicy:
+    """Change history and next-visit schedule for the URLs of one (source, country)."""
+
+    def __init__(self, source: str, country: str, state_dir: Path | None = None, *,
+                 min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 target: float = TARGET_PROBABILITY):
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target = target
+        self.db = sqlite3.connect(state_dir / f"recrawl-{source}-{country}.sqlite")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url_key TEXT PRIMARY KEY, url TEXT NOT NULL, content_hash TEXT,
+                last_fetch REAL, visits INTEGER, changes INTEGER, observed REAL, next_due REAL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS urls_next_due ON urls (next_due);
+            """
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _interval(self, rate: float) -> float:
+        # Time until the change probability reaches the target
+        return min(max(-math.log(1.0 - self.target) / rate, self.min_interval), self.max_interval)
+
+    def known(self, url: str) -> bool:
+        return self.db.execute("SELECT 1 FROM urls WHERE url_key = ?", (canonical(url),)).fetchone() is not None
+
+    def rate(self, url: str) -> Optional[float]:
+        row = self.db.execute("SELECT changes, observed FROM urls WHERE url_key = ?", (canonical(url),)).fetchone()
+        return change_rate(*row) if row else None
+
+    def observe(self, url: str, content_hash: str, fetched_at: Optional[datetime] = None) -> bool:
+        """Record a fetch; returns whether the content changed since the previous one."""
+        now = _ts(fetched_at)
+        key = canonical(url)
+        row = self.db.execute(
+            "SELECT content_hash, last_fetch, visits, changes, observed FROM urls WHERE url_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            changed, visits, changes, observed = False, 1, 0, 0.0
+        else:
+            prev_hash, last_fetch, visits, changes, observed = row
+            changed = prev_hash != content_hash
+            visits, changes, observed = visits + 1, changes + changed, observed + max(now - last_fetch, 0.0)
+        next_due = now + self._interval(change_rate(changes, observed))
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, content_hash, now, visits, changes, observed, next_due),
+            )
+        return changed
+
+    def due(self, budget: int, now: Optional[datetime] = None, exclude: Iterable[str] = ()) -> List[str]:
+        """Up to ``budget`` URLs past their next visit, most likely changed first."""
+        if budget <= 0:
+            return []
+        t = _ts(now)
+        skip = {canonical(u) for u in exclude}
+
+        def _scored() -> Iterator[Tuple[float, str]]:
+            for key, url, last_fetch, changes, observed in self.db.execute(
+                "SELECT url_key, url, last_fetch, changes, observed FROM urls WHERE next_due <= ?", (t,)
+            ):
+                if key in skip:
+                    continue
+                elapsed = t - last_fetch
+                stale = elapsed >= self.max_interval
+                yield (1.0 if stale else change_probability(change_rate(changes, observed), elapsed)), url
+
+        # Bounded heap: memory is O(budget) however many URLs are due
+        return [url for _, url in heapq.nlargest(budget, _scored())]
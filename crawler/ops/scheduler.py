@@ -5,9 +5,18 @@ Optional APScheduler helper to schedule sources from the YAML catalog.
 If APScheduler is not installed, functions become safe no-ops with logging.
 """
 
+import asyncio
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Awaitable, Callable, Set
+
+from ..core.dedup import key64
+from .metrics import scheduler_queue_lag_seconds, scheduler_running_jobs, scheduler_skipped_runs_total
+
+MAX_CONCURRENT_RUNS = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "4"))
+SPREAD_SECONDS = int(os.getenv("SCHEDULER_SPREAD_SECONDS", "0"))
 
 
 try:
@@ -16,52 +25,120 @@ except Exception:  # pragma: no cover
     AsyncIOScheduler = None  # type: ignore
 
 
-def _load_catalog(catalog_path: Path) -> Dict[str, Any]:
-    try:
-        import yaml  # type: ignore
-    except Exception as e:  # pragma: no cover
-        raise RuntimeError("PyYAML is required to load the catalog.") from e
-    return (yaml.safe_load(catalog_path.read_text()) or {})
+def _load_catalog(catalog_path: Path):
+    # Shared, mtime-cached catalog (also used by cli.run_source)
+    from ..core.catalog import load_catalog
+
+    return load_catalog(catalog_path)
+
+
+def spread_offset(job_id: str, spread_seconds: int) -> int:
+    """Deterministic start offset in [0, spread_seconds) for a job id.
+
+    Uses a fixed hash so the same job lands on the same offset on every host
+    and restart, spreading jobs that share a cron string across the window.
+    """
+    if spread_seconds <= 0:
+        return 0
+    return key64(job_id, "blake2b64") % spread_seconds
+
+
+class RunLimiter:
+    """Global cap on concurrent scheduled runs, with per-job overlap skipping."""
 
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_RUNS):
+        self.max_concurrent = max(1, max_concurrent)
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+        self._active: Set[str] = set()
 
-def start_scheduler(catalog_path: Path, run_source_coro):
+    @property
+    def active(self) -> Set[str]:
+        return set(self._active)
+
+    async def run(self, job_id: str, due: float, fn: Callable[[], Awaitable[None]]) -> bool:
+        """Run ``fn`` once a slot is free; ``due`` is the monotonic time it became due.
+
+        Returns False (and runs nothing) if the same job is still queued or
+        running from a previous trigger.
+        """
+        if job_id in self._active:
+            source, _, country = job_id.partition(":")
+            scheduler_skipped_runs_total.labels(source=source, country=country).inc()
+            logging.getLogger("crawler.scheduler").warning(
+                "scheduled_run_skipped", extra={"detail": f"{job_id} still active; skipping overlapping run"}
+            )
+            return False
+        self._active.add(job_id)
+        try:
+            async with self._sem:
+                lag = time.monotonic() - due
+                scheduler_queue_lag_seconds.observe(lag)
+                scheduler_running_jobs.inc()
+                try:
+                    await fn()
+                finally:
+                    scheduler_running_jobs.dec()
+        finally:
+            self._active.discard(job_id)
+        return True
+
+
+def start_scheduler(catalog_path: Path, run_source_coro, *, max_concurrent: int | None = None,
+                    spread_seconds: int | None = None):
     """Start a minimal cron scheduler using APScheduler.
 
     Parameters:
       - catalog_path: path to sources.yaml
       - run_source_coro: coroutine function with signature
           run_source(source: str, country: str, max_pages: int, **kwargs)
+      - max_concurrent: global cap on runs executing at once
+          (default SCHEDULER_MAX_CONCURRENCY, 4); extra runs wait for a slot
+      - spread_seconds: spread job starts over this window using a
+          deterministic per-job offset (default SCHEDULER_SPREAD_SECONDS, 0 = off)
+
+    A run whose previous trigger is still queued or running is skipped.
+    Queue lag (due -> start) is exported as scheduler_queue_lag_seconds.
 
     If APScheduler is not installed, this logs a message and returns None.
     """
     log = logging.getLogger("crawler.scheduler")
     if AsyncIOScheduler is None:  # pragma: no cover
-        log.error("apscheduler_missing", extra={"message": "Install apscheduler to use scheduler."})
+        log.error("apscheduler_missing", extra={"detail": "Install apscheduler to use scheduler."})
         return None
 
-    data = _load_catalog(catalog_path)
-    sources = data.get("sources", [])
+    catalog = _load_catalog(catalog_path)
     scheduler = AsyncIOScheduler()
+    limiter = RunLimiter(MAX_CONCURRENT_RUNS if max_concurrent is None else max_concurrent)
+    spread = SPREAD_SECONDS if spread_seconds is None else spread_seconds
+    scheduler.limiter = limiter
 
-    for entry in sources:
-        source = entry.get("name")
-        country = entry.get("country")
-        schedule = entry.get("schedule")  # cron string like "0 * * * *"
-        max_pages = entry.get("max_pages", 50)
+    for entry in catalog.entries:
+        source = entry.name
+        country = entry.country
+        schedule = entry.schedule  # cron string like "0 * * * *"
+        max_pages = entry.max_pages
         if not (source and country and schedule):
             continue
         # Convert standard 5-field cron into APScheduler args
         try:
             minute, hour, day, month, day_of_week = schedule.split()
         except Exception:
-            log.warning("invalid_cron", extra={"message": f"Skipping invalid cron for {source}:{country}: {schedule!r}"})
+            log.warning("invalid_cron", extra={"detail": f"Skipping invalid cron for {source}:{country}: {schedule!r}"})
             continue
 
-        async def job(_source=source, _country=country, _max=max_pages):
-            try:
-                await run_source_coro(_source, _country, _max)
-            except Exception:
-                log.error("scheduled_run_error", exc_info=True)
+        job_id = f"{source}:{country}"
+        offset = spread_offset(job_id, spread)
+
+        async def job(_source=source, _country=country, _max=max_pages, _id=job_id, _offset=offset):
+            async def _run():
+                try:
+                    await run_source_coro(_source, _country, _max)
+                except Exception:
+                    log.error("scheduled_run_error", exc_info=True)
+
+            if _offset:
+                await asyncio.sleep(_offset)
+            await limiter.run(_id, time.monotonic(), _run)
 
         scheduler.add_job(
             job,
@@ -71,11 +148,14 @@ def start_scheduler(catalog_path: Path, run_source_coro):
             day=day,
             month=month,
             day_of_week=day_of_week,
-            id=f"{source}:{country}",
+            id=job_id,
             replace_existing=True,
+            coalesce=True,
+            # Let a second trigger reach the limiter so overlaps are skipped and counted there
+            max_instances=2,
         )
-        log.info("scheduled", extra={"message": f"{source}:{country} -> {schedule}"})
+        log.info("scheduled", extra={"detail": f"{job_id} -> {schedule} (+{offset}s)"})
 
     scheduler.start()
-    log.info("scheduler_started", extra={"message": f"Loaded {len(sources)} entries"})
+    log.info("scheduler_started", extra={"detail": f"Loaded {len(catalog)} entries"})
     return scheduler
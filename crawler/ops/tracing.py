@@ -1,23 +1,31 @@
 from __future__ import annotations
 
 # Minimal tracing shim. If OpenTelemetry is available, expose basic helpers.
+# OpenTelemetry is imported on first use to keep module import cheap.
 
 from contextlib import contextmanager
-from typing import Optional
+from typing import Any
 
 
-try:
-    from opentelemetry import trace  # type: ignore
-    from opentelemetry.trace import Tracer  # type: ignore
-except Exception:  # pragma: no cover
-    trace = None  # type: ignore
-    Tracer = None  # type: ignore
+trace: Any = None
+
+
+def _otel_trace():
+    global trace
+    if trace is None:
+        try:
+            from opentelemetry import trace as _trace  # type: ignore
+            trace = _trace
+        except Exception:  # pragma: no cover
+            trace = False
+    return trace
 
 
 def get_tracer(name: str = "crawler"):
-    if trace is None:  # pragma: no cover
+    otel = _otel_trace()
+    if not otel:  # pragma: no cover
         return _NoopTracer()
-    return trace.get_tracer(name)
+    return otel.get_tracer(name)
 
 
 class _NoopSpan:
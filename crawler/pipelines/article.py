@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from pydantic import TypeAdapter
 
 from ..core.parse import parse_article
 from ..core.dedup import content_hash
@@ -9,29 +12,85 @@ from ..models.schemas import Article
 from ..core.storage import S3Config, write_parquet
 
 
-def to_article(url: str, html: str, *, country: str, language: Optional[str], source: str) -> Article:
-    parsed = parse_article(html)
+@lru_cache(maxsize=None)
+def articles_adapter() -> TypeAdapter:
+    """Compiled validator/serializer for ``List[Article]``.
+
+    Built once per process and cached; created before a fork it is shared by
+    worker processes copy-on-write.
+    """
+    return TypeAdapter(List[Article])
+
+
+def _article_fields(url: str, html: Optional[str], *, country: str, language: Optional[str], source: str,
+                    parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if parsed is None:
+        parsed = parse_article(html or "")
     h = content_hash((parsed.get("title") or "") + "\n" + (parsed.get("text") or ""))
-    return Article(
-        url=url,  # type: ignore[arg-type]
-        title=parsed.get("title"),
-        text=parsed.get("text"),
-        authors=[],
-        published_at=None,
-        country=country,
-        language=language,
-        source=source,
-        content_hash=h,
-    )
-
-
-def write_curated_articles(records: list[Article], *, country: str, dt: datetime, entity: str = "articles") -> None:
+    return {
+        "url": url,
+        "title": parsed.get("title"),
+        "text": parsed.get("text"),
+        "authors": parsed.get("authors") or [],
+        "published_at": parsed.get("published_at"),
+        "country": country,
+        # Language declared by the page wins; the catalog value is the fallback
+        "language": parsed.get("language") or language,
+        "source": source,
+        "content_hash": h,
+    }
+
+
+def to_article(url: str, html: Optional[str], *, country: str, language: Optional[str], source: str,
+               parsed: Optional[Dict[str, Any]] = None) -> Article:
+    """Build an Article from HTML, or from an already-parsed result (e.g. from a parse pool)."""
+    return Article(**_article_fields(url, html, country=country, language=language, source=source, parsed=parsed))
+
+
+def to_articles(pages: Iterable[Tuple[str, str]], *, country: str, language: Optional[str], source: str,
+                identify_language: bool = False) -> List[Article]:
+    """Batch variant of to_article over ``(url, html)`` pairs.
+
+    Parses every page, then validates all records in a single TypeAdapter
+    call. Raises pydantic.ValidationError if any record is invalid. With
+    ``identify_language`` the batch also goes through the language-ID stage.
+    """
+    rows = [_article_fields(url, html, country=country, language=language, source=source) for url, html in pages]
+    records = articles_adapter().validate_python(rows)
+    if identify_language:
+        from .langid import identify_languages
+
+        identify_languages(records)
+    return records
+
+
+def articles_from_rows(rows: Iterable[Mapping[str, Any]]) -> List[Article]:
+    """Validate dict rows (e.g. read back from curated Parquet) in one batch."""
+    # Batch validation is faster than Article.model_construct in pydantic v2,
+    # so there is no separate unvalidated "trusted" path.
+    return articles_adapter().validate_python(list(rows))
+
+
+def articles_to_rows(records: List[Article]) -> List[Dict[str, object]]:
+    """Serialize Articles to plain dicts in one pass (URLs as strings for Parquet)."""
+    rows: List[Dict[str, object]] = articles_adapter().dump_python(records)
+    for row in rows:
+        row["url"] = str(row["url"])
+    return rows
+
+
+def write_curated_articles(records: list[Article], *, country: str, dt: datetime, entity: str = "articles",
+                           part: Optional[int] = None, run: Optional[str] = None) -> None:
     """Optionally write curated records to MinIO as Parquet.
 
     This function depends on optional pyarrow/s3fs; if not installed, it will
     raise a RuntimeError from storage layer. Callers should handle it.
+    With ``part`` the records go to ``part-<n>.parquet`` (``part-<run>-<n>.parquet``
+    with ``run``) instead of ``data.parquet``, so a large partition can be
+    written in several flushes.
     """
     # Convert to serializable dictionaries
-    rows: list[Dict[str, object]] = [r.model_dump() for r in records]
-    path = f"{S3Config().bucket}/curated/{entity}/{country}/dt={dt:%Y-%m-%d}/data.parquet"
+    rows = articles_to_rows(records)
+    name = "data.parquet" if part is None else f"part-{run + '-' if run else ''}{part:05d}.parquet"
+    path = f"{S3Config().bucket}/curated/{entity}/{country}/dt={dt:%Y-%m-%d}/{name}"
     write_parquet(path, rows)
@@ -0,0 +1,178 @@
+"""
+Change-tracked curated export: deltas, manifest and snapshot compaction.
+
+Instead of rewriting a full ``data.parquet`` per partition, each write emits
+only Articles that are new or whose ``content_hash`` changed, keyed by
+``canonical(url)``. Layout under ``{bucket}/curated/{entity}/{country}/``:
+
+- ``delta/dt=YYYY-MM-DD/part-<seq>.parquet``: new/changed rows of one write
+- ``snapshot/seq=<seq>/data.parquet``: latest row per URL as of delta <seq>
+- ``_manifest.json``: current snapshot plus the deltas written after it
+
+Readers load the snapshot and apply the listed deltas in order. Per-URL state
+and the file log live in a local SQLite database (CRAWL_STATE_DIR), so
+detecting changes needs no reads from object storage.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..core.dedup import canonical
+from ..core.storage import S3Config, put_bytes, read_parquet, write_parquet
+from ..models.schemas import Article
+from .article import articles_to_rows
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+COMPACT_EVERY = int(os.getenv("DELTA_COMPACT_EVERY", "24"))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ChangeTracker:
+    """Per (entity, country) URL state: canonical URL -> last content_hash."""
+
+    def __init__(self, entity: str, country: str, state_dir: Path | None = None):
+        self.entity = entity
+        self.country = country
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(state_dir / f"{entity}-{country}.sqlite")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS state (url_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, updated_at TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, path TEXT, dt TEXT, rows INTEGER, created_at TEXT
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    def diff(self, records: List[Article]) -> List[Dict[str, Any]]:
+        """Return rows for new/changed records, tagged with ``url_key`` and ``change``.
+
+        Duplicate URLs within the batch keep the last record.
+        """
+        latest: Dict[str, Article] = {}
+        for r in records:
+            latest[canonical(str(r.url))] = r
+        known: Dict[str, str] = {}
+        keys = list(latest)
+        for i in range(0, len(keys), 500):  # stay under SQLite's variable limit
+            chunk = keys[i:i + 500]
+            q = f"SELECT url_key, content_hash FROM state WHERE url_key IN ({','.join('?' * len(chunk))})"
+            known.update(self.db.execute(q, chunk).fetchall())
+        changed = [(k, r) for k, r in latest.items() if known.get(k) != r.content_hash]
+        rows = articles_to_rows([r for _, r in changed])
+        for (k, _), row in zip(changed, rows):
+            row["url_key"] = k
+            row["change"] = "changed" if k in known else "new"
+        return rows
+
+    def commit(self, rows: List[Dict[str, Any]], *, kind: str, path: str, dt: str) -> int:
+        """Record a written file and, for deltas, the new URL hashes. Returns its seq."""
+        now = _now()
+        with self.db:
+            if kind == "delta":
+                self.db.executemany(
+                    "INSERT INTO state (url_key, content_hash, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url_key) DO UPDATE SET content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+                    [(r["url_key"], r["content_hash"], now) for r in rows],
+                )
+            cur = self.db.execute(
+                "INSERT INTO files (kind, path, dt, rows, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, path, dt, len(rows), now),
+            )
+        return int(cur.lastrowid)
+
+    def next_seq(self) -> int:
+        return int(self.db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM files").fetchone()[0])
+
+    def manifest(self) -> Dict[str, Any]:
+        snap = self.db.execute(
+            "SELECT seq, path, rows, created_at FROM files WHERE kind = 'snapshot' ORDER BY seq DESC LIMIT 1"
+        ).fetchone()
+        since = snap[0] if snap else 0
+        deltas = self.db.execute(
+            "SELECT seq, path, dt, rows, created_at FROM files WHERE kind = 'delta' AND seq > ? ORDER BY seq", (since,)
+        ).fetchall()
+        return {
+            "entity": self.entity,
+            "country": self.country,
+            "snapshot": {"seq": snap[0], "path": snap[1], "rows": snap[2], "created_at": snap[3]} if snap else None,
+            "deltas": [{"seq": d[0], "path": d[1], "dt": d[2], "rows": d[3], "created_at": d[4]} for d in deltas],
+            "updated_at": _now(),
+        }
+
+
+def _prefix(entity: str, country: str) -> str:
+    return f"curated/{entity}/{country}"
+
+
+def _publish_manifest(tracker: ChangeTracker) -> Dict[str, Any]:
+    manifest = tracker.manifest()
+    put_bytes(f"{_prefix(tracker.entity, tracker.country)}/_manifest.json",
+              json.dumps(manifest, indent=1).encode("utf-8"), content_type="application/json")
+    return manifest
+
+
+def write_delta(records: List[Article], *, country: str, dt: datetime, entity: str = "articles",
+                tracker: Optional[ChangeTracker] = None, compact_every: Optional[int] = None) -> Optional[str]:
+    """Write only new/changed records as a delta file and update the manifest.
+
+    Returns the delta path, or None if nothing changed. URL state is committed
+    only after the file is written, so a failed write is retried in full next
+    time. When ``compact_every`` (default DELTA_COMPACT_EVERY) deltas have
+    accumulated since the last snapshot, they are compacted.
+    """
+    own = tracker is None
+    tracker = tracker or ChangeTracker(entity, country)
+    try:
+        rows = tracker.diff(records)
+        if not rows:
+            return None
+        seq = tracker.next_seq()
+        path = f"{S3Config().bucket}/{_prefix(entity, country)}/delta/dt={dt:%Y-%m-%d}/part-{seq:08d}.parquet"
+        write_parquet(path, rows)
+        tracker.commit(rows, kind="delta", path=path, dt=f"{dt:%Y-%m-%d}")
+        manifest = _publish_manifest(tracker)
+        limit = COMPACT_EVERY if compact_every is None else compact_every
+        if limit and len(manifest["deltas"]) >= limit:
+            compact(tracker)
+        return path
+    finally:
+        if own:
+            tracker.close()
+
+
+def compact(tracker: ChangeTracker) -> Optional[str]:
+    """Fold the current snapshot and its deltas into a new snapshot.
+
+    Keeps the latest row per ``url_key``. Old files are left in place; the
+    manifest stops listing them.
+    """
+    manifest = tracker.manifest()
+    if not manifest["deltas"]:
+        return None
+    latest: Dict[str, Dict[str, Any]] = {}
+    sources = ([manifest["snapshot"]] if manifest["snapshot"] else []) + manifest["deltas"]
+    for f in sources:
+        for row in read_parquet(f["path"]):
+            latest[row["url_key"]] = row
+    seq = manifest["deltas"][-1]["seq"]
+    path = f"{S3Config().bucket}/{_prefix(tracker.entity, tracker.country)}/snapshot/seq={seq:08d}/data.parquet"
+    rows = list(latest.values())
+    write_parquet(path, rows)
+    tracker.commit(rows, kind="snapshot", path=path, dt=manifest["deltas"][-1]["dt"])
+    _publish_manifest(tracker)
+    return path
@@ -0,0 +1,153 @@
+"""
+Backfill curated Articles from stored raw HTML without refetching.
+
+Streams ``raw/<source>/<country>/dt=.../`` partitions through
+core.reader (threaded GETs feeding a process pool of parsers) and rewrites
+each partition's curated Parquet via write_curated_articles, as
+``part-<source>--<run>-<n>.parquet`` files flushed every FLUSH_ROWS articles
+or earlier under memory pressure (ops.memory); the source's previous parts go
+only once all new parts are written, and other sources' parts are kept. A
+JSON checkpoint in CRAWL_STATE_DIR records finished partitions, so an
+interrupted run resumes at the first unfinished one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..core import reader
+from ..core.storage import S3Config, get_backend
+from ..ops.memory import OK, get_budget
+from .article import write_curated_articles
+
+log = logging.getLogger("crawler.reprocess")
+
+STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", ".crawl-state"))
+FLUSH_ROWS = int(os.getenv("REPROCESS_FLUSH_ROWS", "50000"))
+CHECK_EVERY = 256  # articles between memory budget checks
+
+
+class Checkpoint:
+    """Finished partitions of one (source, country) backfill, persisted atomically."""
+
+    def __init__(self, source: str, country: str, state_dir: Path | None = None):
+        state_dir = Path(state_dir or STATE_DIR)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.path = state_dir / f"reprocess-{source}-{country}.json"
+        try:
+            self.done: Dict[str, Dict[str, Any]] = json.loads(self.path.read_text())["done"]
+        except FileNotFoundError:
+            self.done = {}
+
+    def __contains__(self, dt: str) -> bool:
+        return dt in self.done
+
+    def mark(self, dt: str, **stats: Any) -> None:
+        self.done[dt] = {**stats, "at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"done": self.done}, indent=1, sort_keys=True))
+        os.replace(tmp, self.path)
+
+    def reset(self) -> None:
+        self.done = {}
+        self.path.unlink(missing_ok=True)
+
+
+def _part_name(source: str) -> "re.Pattern[str]":
+    # part-<source>--<run>-<n>.parquet, as written by _write_partition for ``source``
+    return re.compile(rf"part-{re.escape(source)}--\d{{8}}T\d{{6}}-[0-9a-f]{{8}}-\d{{5}}\.parquet")
+
+
+def _write_partition(articles: Iterable[Any], *, source: str, country: str, dt: datetime, flush_rows: int,
+                     entity: str = "articles") -> int:
+    """Replace ``source``'s share of a curated partition with ``articles``; returns the count.
+
+    Partitions are per country, shared by all its sources, so parts are named
+    after the source and run and only this source's earlier parts are
+    replaced. They are deleted once every new part is written, so a failure
+    midway leaves the old data in place (next to partial new parts, which the
+    rerun of the unfinished partition removes). With no articles at all
+    nothing is deleted.
+    """
+    backend = get_backend()
+    prefix = f"{S3Config().bucket}/curated/{entity}/{country}/dt={dt:%Y-%m-%d}/"
+    mine = _part_name(source)
+    previous = [p for p in backend.list(prefix) if mine.fullmatch(p.rsplit("/", 1)[-1])]
+    run = f"{source}--{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    budget = get_budget()
+    # Hard pressure seen by the watchdog thread asks the loop to write out early.
+    flush_now = threading.Event()
+    if budget is not None:
+        budget.on_flush("reprocess_buffer", flush_now.set)
+    buf: List[Any] = []
+    part = total = 0
+    try:
+        for art in articles:
+            buf.append(art)
+            total += 1
+            pressure = budget is not None and total % CHECK_EVERY == 0 and budget.check() > OK
+            if len(buf) >= flush_rows or pressure or flush_now.is_set():
+                write_curated_articles(buf, country=country, dt=dt, entity=entity, part=part, run=run)
+                part += 1
+                buf = []
+                flush_now.clear()
+    finally:
+        if budget is not None:
+            budget.remove("reprocess_buffer")
+    if buf:
+        write_curated_articles(buf, country=country, dt=dt, entity=entity, part=part, run=run)
+    if total:  # nothing produced (e.g. every parse failed): keep what was there
+        for path in previous:
+            backend.delete(path)
+    return total
+
+
+def reprocess_source(source: str, country: str, *, language: Optional[str] = None,
+                     dt_from: Optional[date] = None, dt_to: Optional[date] = None,
+                     workers: Optional[int] = None, io_workers: int = reader.DEFAULT_WORKERS,
+                     state_dir: Path | None = None, restart: bool = False,
+                     flush_rows: int = FLUSH_ROWS) -> Dict[str, int]:
+    """Re-parse every stored raw partition of a source and rewrite its curated output.
+
+    ``workers`` parse processes (default: CPU count) do the work; partitions
+    already in the checkpoint are skipped unless ``restart`` is set. Returns
+    counts of partitions, pages read and articles written in this run.
+    """
+    ckpt = Checkpoint(source, country, state_dir)
+    if restart:
+        ckpt.reset()
+    totals = {"partitions": 0, "pages": 0, "articles": 0}
+    for dt in reader.list_partitions("raw", source, country):
+        if not reader.in_range(dt, dt_from, dt_to) or dt in ckpt:
+            continue
+        pages = 0
+
+        def _counted():
+            nonlocal pages
+            for page in reader.iter_raw_pages(source, country, dt, workers=io_workers):
+                pages += 1
+                yield page
+
+        day = datetime.strptime(dt, "%Y-%m-%d")
+        articles = _write_partition(
+            reader.reprocess_pages(_counted(), country=country, source=source, language=language, workers=workers),
+            source=source, country=country, dt=day, flush_rows=flush_rows,
+        )
+        if pages and not articles:
+            # Every page failed (or the parse pool broke): keep the old output and retry next run
+            log.error("partition_reprocess_failed", extra={"detail": f"{source}/{country} dt={dt} pages={pages} articles=0"})
+            continue
+        ckpt.mark(dt, pages=pages, articles=articles)
+        log.info("partition_reprocessed", extra={"detail": f"{source}/{country} dt={dt} pages={pages} articles={articles}"})
+        totals["partitions"] += 1
+        totals["pages"] += pages
+        totals["articles"] += articles
+    return totals
@@ -0,0 +1,68 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from crawler.core import blobs, storage
+from crawler.core.dedup import content_hash
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(storage.set_backend, storage.set_backend(storage.MemoryBackend()))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bucket = storage.S3Config().bucket
+
+    def test_identical_bodies_are_uploaded_once(self):
+        store = blobs.BlobStore(self.tmp.name)
+        key, uploaded = store.put(b"<html>a</html>", charset="utf-8")
+        self.assertTrue(uploaded)
+        self.assertEqual(key, blobs.blob_key(content_hash(b"<html>a</html>")))
+        self.assertEqual(store.put(b"<html>a</html>"), (key, False))
+        self.assertTrue(store.put(b"<html>b</html>")[1])
+        self.assertEqual(store.stats, {"uploaded": 2, "reused": 1, "bytes": 28})
+        _, meta = storage.get_backend().get_object(f"{self.bucket}/{key}")
+        self.assertEqual(meta["metadata"]["charset"], "utf-8")
+        store.close()
+
+    def test_local_cache_avoids_existence_checks(self):
+        store = blobs.BlobStore(self.tmp.name)
+        store.put(b"body")
+        store.close()
+        store = blobs.BlobStore(self.tmp.name)  # cache survives restarts
+        with patch.object(storage.MemoryBackend, "exists") as exists, \
+             patch.object(storage, "put_gz") as put_gz:
+            self.assertFalse(store.put(b"body")[1])
+        exists.assert_not_called()
+        put_gz.assert_not_called()
+        store.close()
+
+    def test_cache_miss_checks_the_backend_before_uploading(self):
+        blobs.BlobStore(self.tmp.name).put(b"body")
+        with tempfile.TemporaryDirectory() as other:  # another machine, empty cache
+            store = blobs.BlobStore(other)
+            with patch.object(storage, "put_gz") as put_gz:
+                self.assertFalse(store.put(b"body")[1])
+            put_gz.assert_not_called()
+            self.assertTrue(store.known(content_hash(b"body")))
+            store.close()
+
+    def test_manifest_round_trip(self):
+        manifest = blobs.RunManifest("src", "MZ", date(2025, 8, 15), run_id="r1")
+        self.assertIsNone(manifest.write())
+        manifest.add("https://example.org/olá", "ab" * 32, status=200, charset="utf-8", content_type="text/html")
+        key = manifest.write()
+        self.assertEqual(key, "raw/src/MZ/dt=2025-08-15/manifest-r1.jsonl")
+        self.assertTrue(blobs.is_manifest(key))
+        entry = json.loads(storage.get_bytes(key))
+        self.assertEqual(entry["url"], "https://example.org/olá")
+        (path, meta, ctype), = blobs.read_manifest(f"{self.bucket}/{key}")
+        self.assertEqual(path, f"{self.bucket}/{blobs.blob_key('ab' * 32)}")
+        self.assertEqual(meta["url"], "https://example.org/ol%C3%A1")
+        self.assertEqual(ctype, "text/html")
+
+
+if __name__ == "__main__":
+    unittest.main()
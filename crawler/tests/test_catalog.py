@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+try:
+    import pydantic  # type: ignore
+    import yaml  # type: ignore
+    _HAS_DEPS = True
+except Exception:
+    _HAS_DEPS = False
+
+if _HAS_DEPS:
+    from crawler.core import catalog as catalog_mod
+else:
+    catalog_mod = None  # type: ignore
+
+YAML = """
+sources:
+  - name: a
+    country: MZ
+    base_urls: ["https://a.example/1", "https://a.example/2"]
+    language: pt
+  - name: a
+    country: AO
+  - country: MZ
+"""
+
+
+@unittest.skipIf(not _HAS_DEPS, "pydantic/pyyaml not installed")
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        catalog_mod.clear_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "sources.yaml"
+        self.path.write_text(YAML)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index_and_validation(self):
+        cat = catalog_mod.load_catalog(self.path)
+        self.assertEqual(len(cat), 2)  # entry without name is skipped
+        e = cat.get("a", "MZ")
+        self.assertEqual(e.base_urls, ["https://a.example/1", "https://a.example/2"])
+        self.assertEqual(e.max_pages, 50)
+        self.assertEqual(cat.get("a", "AO").base_urls, [])
+        self.assertIsNone(cat.get("a", "US"))
+
+    def test_cached_until_mtime_changes(self):
+        with patch.object(catalog_mod, "_yaml_load", wraps=catalog_mod._yaml_load) as load:
+            first = catalog_mod.load_catalog(self.path)
+            self.assertIs(catalog_mod.load_catalog(self.path), first)
+            self.assertEqual(load.call_count, 1)
+            self.path.write_text(YAML.replace("language: pt", "language: en"))
+            st = self.path.stat()
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            second = catalog_mod.load_catalog(self.path)
+            self.assertEqual(load.call_count, 2)
+        self.assertEqual(second.get("a", "MZ").language, "en")
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            catalog_mod.load_catalog(Path(self.tmp.name) / "nope.yaml")
+
+    def test_bundled_catalog_loads(self):
+        self.assertIsNotNone(catalog_mod.load_catalog().get("example-news", "MZ"))
+
+
+if __name__ == "__main__":
+    unittest.main()
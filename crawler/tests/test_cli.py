@@ -1,4 +1,5 @@
 import asyncio
+import json
 import unittest
 from unittest.mock import AsyncMock, patch
 
@@ -34,15 +35,29 @@ except Exception:
 
 if _HAS_PYD:
     from crawler import cli as cli_mod
+    from crawler.core import blobs
 else:
     cli_mod = None  # type: ignore
 
 
 @unittest.skipIf(not _HAS_PYD, "pydantic not installed")
 class TestCLI(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        import tempfile
+        from crawler.core import journal, storage
+        from crawler.ops import hoststats
+        self.addCleanup(storage.set_backend, storage.set_backend(storage.MemoryBackend()))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_dir = hoststats.Path(tmp.name)
+        for mod in (hoststats, journal, blobs):
+            p = patch.object(mod, "STATE_DIR", self.state_dir)
+            p.start()
+            self.addCleanup(p.stop)
+
     async def test_crawl_once_happy_path(self):
         # Mock allowed to True and provide client
-        dummy_resp = type("R", (), {"status_code": 200, "text": "<html><title>X</title></html>", "raise_for_status": lambda self: None})()
+        dummy_resp = type("R", (), {"status_code": 200, "text": "<html><title>X</title></html>", "content": b"<html><title>X</title></html>", "headers": {"content-type": "text/html; charset=utf-8"}, "raise_for_status": lambda self: None})()
         client = AsyncMock()
         client.get = AsyncMock(return_value=dummy_resp)
         ctx = AsyncMock()
@@ -54,17 +69,282 @@ class TestCLI(unittest.IsolatedAsyncioTestCase):
         client.get.assert_awaited()
 
     async def test_run_source_reads_yaml_and_fetches(self):
-        # Stub YAML loader via safe_load; force config path to exist and return an entry
+        # Stub the catalog loader to return an entry
+        from crawler.core.catalog import Catalog
         data = {"sources": [{"name": "example-news", "country": "MZ", "language": "pt", "base_urls": ["https://ex.com"], "render": False}]}
-        dummy_resp = type("R", (), {"status_code": 200, "text": "<html><title>X</title></html>", "raise_for_status": lambda self: None})()
+        dummy_resp = type("R", (), {"status_code": 200, "text": "<html><title>X</title></html>", "content": b"<html><title>X</title></html>", "headers": {"content-type": "text/html; charset=utf-8"}, "raise_for_status": lambda self: None})()
         client = AsyncMock(); client.get = AsyncMock(return_value=dummy_resp)
         ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
         with patch.object(cli_mod, "http_client", return_value=ctx), \
              patch.object(cli_mod, "allowed", return_value=True), \
-             patch("crawler.cli.Path.exists", return_value=True), \
-             patch("crawler.cli.yaml.safe_load", return_value=data):
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)):
             await cli_mod.run_source("example-news", "MZ", 10)
-        client.get.assert_awaited()
+        client.get.assert_awaited_with("https://ex.com")
+
+    async def test_run_source_writes_raw_bytes_without_reencoding(self):
+        from crawler.core.catalog import Catalog
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": ["https://ex.com"]}]}
+        raw = "<html><title>Olá</title></html>".encode("cp1252")
+        resp = type("R", (), {"status_code": 200, "content": raw, "headers": {"content-type": "text/html; charset=windows-1252"},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.core.storage.put_gz") as put_gz:
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+        args, kwargs = put_gz.call_args
+        self.assertIs(args[1], raw)
+        self.assertEqual(kwargs["content_type"], "text/html; charset=cp1252")
+        self.assertEqual(kwargs["metadata"]["charset"], "cp1252")
+
+    async def test_run_source_skips_upload_of_unchanged_raw_pages(self):
+        from crawler.core import reader
+        from crawler.core.catalog import Catalog
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": ["https://ex.com/a", "https://ex.com/b"]}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>Same</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.core.fetch.asyncio.sleep", new=AsyncMock()), \
+             patch.object(cli_mod.bytes_written_total, "labels") as written:
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+        # Both URLs in both runs share one body: a single blob upload
+        self.assertEqual(written.return_value.inc.call_count, 1)
+        pages = list(reader.iter_raw_pages("s", "MZ", workers=1))
+        self.assertEqual(sorted(p.url for p in pages), ["https://ex.com/a", "https://ex.com/a", "https://ex.com/b", "https://ex.com/b"])
+        self.assertEqual({p.content for p in pages}, {b"<title>Same</title>"})
+
+    async def test_run_source_unknown_source_does_not_fetch(self):
+        from crawler.core.catalog import Catalog
+        client = AsyncMock()
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict({"sources": []})):
+            await cli_mod.run_source("missing", "MZ", 10)
+        client.get.assert_not_called()
+
+    async def test_run_source_with_parse_workers(self):
+        from crawler.core.catalog import Catalog
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": ["https://ex.com"]}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>Pooled</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.pipelines.article.Article") as Art, \
+             patch.object(cli_mod.fetch_errors_total, "labels") as errors:
+            await cli_mod.run_source("s", "MZ", 10, parse_workers=1)
+        self.assertEqual(Art.call_args.kwargs["title"], "Pooled")
+        errors.assert_not_called()
+
+    async def test_run_source_overlaps_pool_parses_and_keeps_order(self):
+        from crawler.core.catalog import Catalog
+        urls = [f"https://ex.com/{i}" for i in range(6)]
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": urls}]}
+
+        async def respond(url):
+            return type("R", (), {"status_code": 200, "content": f"<title>{url}</title>".encode(), "headers": {},
+                                  "raise_for_status": lambda self: None})()
+
+        class FakePool:
+            active = peak = 0
+            sleep = asyncio.sleep  # the real one; the fetch patch below replaces asyncio.sleep
+
+            def __init__(self, max_workers):
+                self.slots = 2 * max_workers
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def parse(self, content, encoding="utf-8"):
+                FakePool.active += 1
+                FakePool.peak = max(FakePool.peak, FakePool.active)
+                await FakePool.sleep(0.01 * (6 - int(content[-9:-8])))  # later pages finish first
+                FakePool.active -= 1
+                return {"title": content.decode()[7:-8], "text": "t"}
+
+        client = AsyncMock(); client.get = AsyncMock(side_effect=respond)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.core.fetch.asyncio.sleep", new=AsyncMock()), \
+             patch("crawler.core.parse_pool.SharedMemoryParsePool", FakePool), \
+             patch("crawler.pipelines.article.Article") as Art:
+            await cli_mod.run_source("s", "MZ", 10, parse_workers=2)
+        self.assertGreater(FakePool.peak, 1)
+        self.assertLessEqual(FakePool.peak, 4)
+        self.assertEqual([c.kwargs["title"] for c in Art.call_args_list], urls)
+
+    async def test_run_source_crawls_discovered_urls_and_records_them(self):
+        import tempfile
+        from crawler.core import discovery
+        from crawler.core.catalog import Catalog
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": ["https://ex.com/section"],
+                             "feeds": ["https://ex.com/feed"]}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>New</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(discovery, "STATE_DIR", discovery.Path(tmp)), \
+             patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch.object(discovery, "discover", AsyncMock(return_value=["https://ex.com/a", "https://ex.com/b"])):
+            await cli_mod.run_source("s", "MZ", 10)
+            state = discovery.DiscoveryState("s", "MZ")
+            self.assertFalse(state.is_new("https://ex.com/a"))
+            self.assertIsNotNone(state.last_run)
+            state.close()
+        self.assertEqual([c.args[0] for c in client.get.await_args_list], ["https://ex.com/a", "https://ex.com/b"])
+
+    async def test_run_source_recrawl_budget_skips_pages_not_due(self):
+        import tempfile
+        from crawler.core.catalog import Catalog
+        from crawler.ops import recrawl
+        data = {"sources": [{"name": "s", "country": "MZ", "recrawl_budget": 5,
+                             "base_urls": ["https://ex.com/old", "https://ex.com/new"]}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>T</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(recrawl, "STATE_DIR", recrawl.Path(tmp)), \
+             patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)):
+            policy = recrawl.RecrawlPolicy("s", "MZ")
+            policy.observe("https://ex.com/old", "h")  # just fetched: not due yet
+            policy.close()
+            await cli_mod.run_source("s", "MZ", 10)
+        self.assertEqual([c.args[0] for c in client.get.await_args_list], ["https://ex.com/new"])
+
+    async def test_run_source_recrawls_fit_within_max_pages(self):
+        import tempfile
+        from datetime import datetime, timedelta, timezone
+        from crawler.core.catalog import Catalog
+        from crawler.ops import recrawl
+        known = [f"https://ex.com/old{i}" for i in range(4)]
+        data = {"sources": [{"name": "s", "country": "MZ", "recrawl_budget": 5,
+                             "base_urls": ["https://ex.com/new1", "https://ex.com/new2"] + known}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>T</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(recrawl, "STATE_DIR", recrawl.Path(tmp)), \
+             patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)):
+            policy = recrawl.RecrawlPolicy("s", "MZ")
+            for url in known:  # fetched long ago: all due
+                policy.observe(url, "h", fetched_at=datetime.now(timezone.utc) - timedelta(days=30))
+            policy.close()
+            await cli_mod.run_source("s", "MZ", 3)
+        fetched = [c.args[0] for c in client.get.await_args_list]
+        # max_pages=3 caps new + recrawled URLs together: both new ones, then one due recrawl
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(fetched[:2], ["https://ex.com/new1", "https://ex.com/new2"])
+        self.assertIn(fetched[2], known)
+
+    async def test_run_source_saves_host_stats_for_stats_command(self):
+        from crawler.core.catalog import Catalog
+        from crawler.ops import hoststats
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": ["https://slow.example/a"]}]}
+        resp = type("R", (), {"status_code": 200, "content": b"<title>T</title>", "headers": {},
+                              "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(return_value=resp)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.fetch.asyncio.sleep", new=AsyncMock()), \
+             patch.object(hoststats, "_registry", {}), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)):
+            await cli_mod.run_source("s", "MZ", 10)
+        self.assertEqual(len(list(self.state_dir.glob("hoststats-*.json"))), 1)
+        out = json.loads(cli_mod.stats(as_json=True))
+        self.assertEqual(out["hosts"]["slow.example"]["requests"], 1)
+        self.assertEqual(out["hosts"]["slow.example"]["status"], {"2xx": 1})
+        self.assertIn("slow.example", cli_mod.stats())
+
+    async def test_interrupted_run_resumes_with_remaining_urls(self):
+        from crawler.core import reader, storage
+        from crawler.core.catalog import Catalog
+
+        class Crash(BaseException):
+            pass
+
+        urls = [f"https://ex.com/{i}" for i in range(4)]
+        data = {"sources": [{"name": "s", "country": "MZ", "base_urls": urls}]}
+
+        def respond(url):
+            if url == urls[2] and not respond.recovered:
+                raise Crash()  # process dies mid-run
+            return type("R", (), {"status_code": 200, "content": f"<title>{url}</title>".encode(), "headers": {},
+                                  "raise_for_status": lambda self: None})()
+        respond.recovered = False
+        client = AsyncMock(); client.get = AsyncMock(side_effect=respond)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.core.fetch.asyncio.sleep", new=AsyncMock()):
+            with self.assertRaises(Crash):
+                await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+            self.assertEqual(reader.list_partitions("raw", "s", "MZ"), [])  # no manifest yet
+            respond.recovered = True
+            client.get.reset_mock()
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+            self.assertEqual([c.args[0] for c in client.get.await_args_list], urls[2:])
+            client.get.reset_mock()
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)  # finished: a fresh run fetches everything
+            self.assertEqual(len(client.get.await_args_list), 4)
+        manifests = list(storage.get_backend().list(f"{storage.S3Config().bucket}/raw/s/MZ/"))
+        self.assertEqual(len(manifests), 2)
+        for path in manifests:  # the resumed run's manifest covers pages from before and after the crash
+            pages = list(reader.iter_raw_pages("s", "MZ", workers=1, paths=[path]))
+            self.assertEqual(sorted(p.url for p in pages), urls)
+
+    async def test_render_source_renders_only_js_dependent_pages(self):
+        from crawler.core import reader
+        from crawler.core.catalog import Catalog
+        from crawler.core.render import RenderPool
+
+        story = "<html><body><article>" + "<p>Texto do artigo com conteúdo suficiente.</p>" * 40 + "</article></body></html>"
+        shell = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+        pages = {"https://ex.com/story": story, "https://ex.com/app": shell}
+        data = {"sources": [{"name": "s", "country": "MZ", "render": True, "base_urls": list(pages)}]}
+
+        async def respond(url):
+            return type("R", (), {"status_code": 200, "content": pages[url].encode(), "headers": {},
+                                  "raise_for_status": lambda self: None})()
+        client = AsyncMock(); client.get = AsyncMock(side_effect=respond)
+        ctx = AsyncMock(); ctx.__aenter__.return_value = client; ctx.__aexit__.return_value = False
+        browser = AsyncMock(return_value=story.replace("artigo", "app"))
+        with patch.object(cli_mod, "http_client", return_value=ctx), \
+             patch.object(cli_mod, "allowed", return_value=True), \
+             patch("crawler.core.catalog.load_catalog", return_value=Catalog.from_dict(data)), \
+             patch("crawler.core.fetch.asyncio.sleep", new=AsyncMock()), \
+             patch.object(RenderPool, "_browser_render", browser), \
+             patch.object(cli_mod.render_decisions_total, "labels") as decisions:
+            await cli_mod.run_source("s", "MZ", 10, write_raw=True)
+        browser.assert_awaited_once_with("https://ex.com/app")
+        self.assertEqual(sorted(c.kwargs["decision"] for c in decisions.call_args_list), ["spa_shell", "static"])
+        stored = {p.url: p.content for p in reader.iter_raw_pages("s", "MZ", workers=1)}
+        self.assertEqual(stored["https://ex.com/story"], story.encode())
+        self.assertIn(b"Texto do app", stored["https://ex.com/app"])  # the rendered DOM is what gets stored
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 import unittest
 
-from crawler.core.dedup import canonical, content_hash
+from crawler.core.dedup import FAST64, canonical, content_hash, fingerprint, key64
 
 
 class TestDedup(unittest.TestCase):
@@ -17,6 +17,23 @@ class TestDedup(unittest.TestCase):
         int(h, 16)  # should not raise
         self.assertEqual(len(h), 64)  # sha256 fallback length
 
+    def test_content_hash_bytes_matches_text(self):
+        self.assertEqual(content_hash("olá".encode("utf-8")), content_hash("olá"))
+
+    def test_fingerprint_algorithms(self):
+        self.assertEqual(fingerprint(b"x"), content_hash("x"))
+        self.assertEqual(len(fingerprint(b"x", "blake2b64")), 16)
+        self.assertEqual(len(fingerprint(b"x", "blake2b128")), 32)
+        with self.assertRaises(ValueError):
+            fingerprint(b"x", "nope")
+
+    def test_key64_is_stable_unsigned_int(self):
+        k = key64("hello")
+        self.assertEqual(k, key64(b"hello"))
+        self.assertEqual(k, int(fingerprint(b"hello", FAST64), 16))
+        self.assertTrue(0 <= k < 2**64)
+        self.assertEqual(key64(b"hello", "blake2b64"), int(fingerprint(b"hello", "blake2b64"), 16))
+
 
 if __name__ == "__main__":
     unittest.main()
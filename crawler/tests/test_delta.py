@@ -0,0 +1,93 @@
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+try:
+    import pydantic  # type: ignore
+    _HAS_PYD = True
+except Exception:
+    _HAS_PYD = False
+
+if _HAS_PYD:
+    from crawler.pipelines import delta
+    from crawler.pipelines.article import to_article
+else:
+    delta = None  # type: ignore
+
+
+def _art(url, body):
+    return to_article(url, f"<title>T</title><p>{body}</p>", country="MZ", language="pt", source="s")
+
+
+@unittest.skipIf(not _HAS_PYD, "pydantic not installed")
+class TestDelta(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tracker = delta.ChangeTracker("articles", "MZ", state_dir=self.tmp.name)
+        self.files = {}
+        self.objects = {}
+        patches = [
+            patch.object(delta, "write_parquet", side_effect=lambda p, rows: self.files.__setitem__(p, list(rows))),
+            patch.object(delta, "read_parquet", side_effect=lambda p: self.files[p]),
+            patch.object(delta, "put_bytes", side_effect=lambda k, b, **kw: self.objects.__setitem__(k, b)),
+            patch.object(delta, "S3Config"),
+        ]
+        for p in patches:
+            m = p.start()
+            self.addCleanup(p.stop)
+        m.return_value.bucket = "bucket"
+
+    def tearDown(self):
+        self.tracker.close()
+        self.tmp.cleanup()
+
+    def manifest(self):
+        return json.loads(self.objects["curated/articles/MZ/_manifest.json"])
+
+    def test_only_new_or_changed_articles_are_written(self):
+        dt = datetime(2025, 8, 16)
+        p1 = delta.write_delta([_art("https://ex.com/a", "1"), _art("https://ex.com/b", "1")], country="MZ", dt=dt,
+                               tracker=self.tracker, compact_every=0)
+        self.assertEqual(p1, "bucket/curated/articles/MZ/delta/dt=2025-08-16/part-00000001.parquet")
+        self.assertEqual({r["change"] for r in self.files[p1]}, {"new"})
+
+        # Same content (tracking params and trailing slash canonicalize away): nothing written
+        again = [_art("https://ex.com/a/?utm_source=x", "1"), _art("https://ex.com/b", "1")]
+        self.assertIsNone(delta.write_delta(again, country="MZ", dt=dt, tracker=self.tracker, compact_every=0))
+
+        p2 = delta.write_delta([_art("https://ex.com/a", "2"), _art("https://ex.com/c", "1")], country="MZ", dt=dt,
+                               tracker=self.tracker, compact_every=0)
+        changes = {r["url_key"]: r["change"] for r in self.files[p2]}
+        self.assertEqual(changes, {"https://ex.com/a": "changed", "https://ex.com/c": "new"})
+        m = self.manifest()
+        self.assertIsNone(m["snapshot"])
+        self.assertEqual([d["path"] for d in m["deltas"]], [p1, p2])
+
+    def test_compaction_keeps_latest_row_per_url(self):
+        dt = datetime(2025, 8, 16)
+        delta.write_delta([_art("https://ex.com/a", "1"), _art("https://ex.com/b", "1")], country="MZ", dt=dt,
+                          tracker=self.tracker, compact_every=2)
+        delta.write_delta([_art("https://ex.com/a", "2")], country="MZ", dt=dt, tracker=self.tracker, compact_every=2)
+        m = self.manifest()
+        self.assertEqual(m["deltas"], [])
+        snap = self.files[m["snapshot"]["path"]]
+        self.assertEqual(len(snap), 2)
+        a = next(r for r in snap if r["url_key"] == "https://ex.com/a")
+        self.assertIn("2", a["text"])
+
+        p3 = delta.write_delta([_art("https://ex.com/d", "1")], country="MZ", dt=dt, tracker=self.tracker, compact_every=2)
+        self.assertEqual([d["path"] for d in self.manifest()["deltas"]], [p3])
+
+    def test_state_not_committed_when_write_fails(self):
+        dt = datetime(2025, 8, 16)
+        with patch.object(delta, "write_parquet", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                delta.write_delta([_art("https://ex.com/a", "1")], country="MZ", dt=dt, tracker=self.tracker)
+        self.assertIsNotNone(delta.write_delta([_art("https://ex.com/a", "1")], country="MZ", dt=dt,
+                                               tracker=self.tracker, compact_every=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
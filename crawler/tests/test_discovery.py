@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from crawler.core import discovery
+from crawler.core.discovery import DiscoveryState, FeedParser, parse_feed
+from crawler.models.schemas import SourceEntry
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url><loc>https://ex.com/news/a</loc><lastmod>2025-08-10</lastmod></url>
+  <url><loc>https://ex.com/news/b</loc><lastmod>2025-08-16T10:00:00+02:00</lastmod></url>
+  <url><loc>https://ex.com/news/c</loc>
+    <news:news><news:publication_date>2025-08-17T09:00:00Z</news:publication_date></news:news></url>
+  <url><loc>https://ex.com/login</loc></url>
+</urlset>"""
+
+INDEX = b"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://ex.com/old.xml</loc><lastmod>2025-01-01</lastmod></sitemap>
+  <sitemap><loc>https://ex.com/news.xml.gz</loc><lastmod>2025-08-17</lastmod></sitemap>
+</sitemapindex>"""
+
+RSS = b"""<rss version="2.0"><channel><title>Ex</title>
+  <image><url>https://ex.com/logo.png</url></image>
+  <item><title>X</title><link>https://ex.com/news/x</link><pubDate>Sun, 17 Aug 2025 08:00:00 GMT</pubDate></item>
+  <item><guid>https://ex.com/news/y</guid></item>
+</channel></rss>"""
+
+ATOM = b"""<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><link rel="self" href="https://ex.com/api/z"/><link href="https://ex.com/news/z"/>
+    <updated>2025-08-17T07:00:00Z</updated></entry>
+</feed>"""
+
+
+def _chunks(data, n=7):
+    return [data[i:i + n] for i in range(0, len(data), n)]
+
+
+class TestFeedParser(unittest.TestCase):
+    def test_sitemap_streamed_in_small_chunks(self):
+        recs = list(parse_feed(_chunks(SITEMAP)))
+        self.assertEqual([r.url for r in recs], [f"https://ex.com/news/{c}" for c in "abc"] + ["https://ex.com/login"])
+        self.assertEqual(recs[1].lastmod, datetime(2025, 8, 16, 8, tzinfo=timezone.utc))
+        self.assertEqual(recs[2].lastmod, datetime(2025, 8, 17, 9, tzinfo=timezone.utc))
+        self.assertIsNone(recs[3].lastmod)
+
+    def test_gzip_sitemap_index(self):
+        recs = list(parse_feed(_chunks(gzip.compress(INDEX), 1)))
+        self.assertEqual([(r.url, r.kind) for r in recs],
+                         [("https://ex.com/old.xml", "sitemap"), ("https://ex.com/news.xml.gz", "sitemap")])
+
+    def test_rss_and_atom(self):
+        self.assertEqual([r.url for r in parse_feed([RSS])], ["https://ex.com/news/x", "https://ex.com/news/y"])
+        (entry,) = parse_feed([ATOM])
+        self.assertEqual(entry.url, "https://ex.com/news/z")
+        self.assertEqual(entry.lastmod, datetime(2025, 8, 17, 7, tzinfo=timezone.utc))
+
+    def test_tree_is_emptied_behind_the_cursor(self):
+        parser = FeedParser()
+        parser.feed(SITEMAP[:-10])
+        self.assertEqual(len(parser._stack[0]), 0)
+
+    def test_max_bytes(self):
+        with self.assertRaises(ValueError):
+            list(parse_feed([SITEMAP], max_bytes=100))
+
+
+class TestDiscover(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.docs = {
+            "https://ex.com/index.xml": INDEX,
+            "https://ex.com/news.xml.gz": gzip.compress(SITEMAP),
+            "https://ex.com/feed": RSS,
+        }
+        self.requested = []
+        p = patch.object(discovery, "allowed", return_value=True)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def client(self):
+        test = self
+
+        class Response:
+            def __init__(self, url):
+                self.url = url
+
+            def raise_for_status(self):
+                if self.url not in test.docs:
+                    raise RuntimeError("404")
+
+            async def aiter_bytes(self):
+                for chunk in _chunks(test.docs[self.url], 64):
+                    yield chunk
+
+        class Stream:
+            def __init__(self, url):
+                test.requested.append(url)
+                self.url = url
+
+            async def __aenter__(self):
+                return Response(self.url)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return type("Client", (), {"stream": lambda self, method, url: Stream(url)})()
+
+    def run_discover(self, **kw):
+        entry = SourceEntry(name="s", country="MZ", base_urls=["https://ex.com/"], sitemaps=["https://ex.com/index.xml"],
+                            feeds=["https://ex.com/feed", "https://ex.com/missing"], deny=["/login"])
+
+        return asyncio.run(discovery.discover(entry, self.client(), **kw))
+
+    def test_follows_index_filters_by_lastmod_and_rules(self):
+        since = datetime(2025, 8, 15, tzinfo=timezone.utc)
+        urls = self.run_discover(since=since)
+        self.assertNotIn("https://ex.com/old.xml", self.requested)
+        # newest first; undated entries last; a/login filtered
+        self.assertEqual(urls, ["https://ex.com/news/c", "https://ex.com/news/x", "https://ex.com/news/b",
+                                "https://ex.com/news/y"])
+
+    def test_state_filters_seen_urls_and_tracks_watermark(self):
+        state = DiscoveryState("s", "MZ", state_dir=self.tmp.name)
+        self.addCleanup(state.close)
+        self.assertIsNone(state.last_run)
+        state.mark_seen(["https://ex.com/news/c/", "https://ex.com/news/x"])
+        urls = self.run_discover(state=state)
+        self.assertNotIn("https://ex.com/news/c", urls)
+        self.assertNotIn("https://ex.com/news/x", urls)
+        started = datetime(2025, 8, 18, tzinfo=timezone.utc)
+        state.finish(started)
+        self.assertEqual(state.last_run, started)
+
+    def test_robots_sitemaps(self):
+        class RP:
+            def site_maps(self):
+                return ["https://ex.com/index.xml"]
+
+        with patch.object(discovery, "robots_for", return_value=RP()) as rf:
+            self.assertEqual(discovery.robots_sitemaps(["https://ex.com/a", "https://ex.com/b"]),
+                             ["https://ex.com/index.xml"])
+        rf.assert_called_once_with("ex.com", "https")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import codecs
+import unittest
+from types import SimpleNamespace
+
+from crawler.core.encoding import Body, decode_response, detect_charset
+
+
+class TestEncoding(unittest.TestCase):
+    def test_header_charset_wins(self):
+        self.assertEqual(detect_charset(b'<meta charset="utf-8">', "text/html; charset=ISO-8859-15"), "iso8859-15")
+
+    def test_latin1_label_is_windows_1252(self):
+        self.assertEqual(detect_charset(b"x", "text/html; charset=iso-8859-1"), "cp1252")
+
+    def test_bom_and_meta(self):
+        self.assertEqual(detect_charset(codecs.BOM_UTF8 + b"abc"), "utf-8")
+        self.assertEqual(detect_charset(codecs.BOM_UTF16_LE + "a".encode("utf-16-le")), "utf-16")
+        self.assertEqual(detect_charset(b'<head><meta http-equiv="Content-Type" content="text/html; charset=windows-1251">'), "cp1251")
+
+    def test_bom_wins_over_header_charset(self):
+        self.assertEqual(detect_charset(codecs.BOM_UTF8 + "olá".encode("utf-8"), "text/html; charset=iso-8859-1"), "utf-8")
+        body = Body.from_bytes(codecs.BOM_UTF16_LE + "olá".encode("utf-16-le"), "text/html; charset=utf-8")
+        self.assertEqual(body.text, "olá")
+
+    def test_undeclared_utf8_and_invalid_labels(self):
+        self.assertEqual(detect_charset("olá".encode("utf-8"), "text/html; charset=bogus"), "utf-8")
+
+    def test_body_decodes_once_and_strips_bom(self):
+        b = Body.from_bytes(codecs.BOM_UTF8 + "olá".encode("utf-8"))
+        self.assertEqual(b.text, "olá")
+        self.assertIs(b.text, b.text)
+        self.assertEqual(b.size, 7)  # raw bytes, BOM included
+
+    def test_decode_response_uses_bytes_and_headers(self):
+        r = SimpleNamespace(content="ação".encode("cp1252"), headers={"content-type": "text/html; charset=windows-1252"})
+        body = decode_response(r)
+        self.assertEqual(body.text, "ação")
+        self.assertEqual(body.content_type, "text/html; charset=cp1252")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+try:
+    import fakeredis  # type: ignore
+    _HAS_FAKEREDIS = True
+except Exception:
+    _HAS_FAKEREDIS = False
+
+from crawler.core.frontier import Frontier, fingerprint_url
+
+
+@unittest.skipIf(not _HAS_FAKEREDIS, "fakeredis not installed")
+class TestFrontier(unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeRedis(decode_responses=True)
+        self.a = self.worker("a")
+        self.b = self.worker("b")
+
+    def worker(self, name, **kw):
+        return Frontier(self.r, "s", "MZ", worker_id=name, lease_seconds=30, **kw)
+
+    def test_add_dedups_across_workers_and_batches(self):
+        urls = [f"https://ex.com/{i}" for i in range(10)]
+        self.assertEqual(self.a.add(urls, not_before=0, batch_size=3), 10)
+        self.assertEqual(self.b.add(urls + ["https://ex.com/0/", "https://ex.com/new"], not_before=0), 1)
+        self.assertTrue(self.b.seen("https://EX.com/3"))
+        self.assertEqual(self.a.stats(), {"seen": 11, "queued": 11, "leased": 0, "dead": 0})
+        self.assertEqual(len(fingerprint_url("https://ex.com/")), 16)
+
+    def test_add_marks_seen_and_queues_in_one_script_call(self):
+        from unittest.mock import patch
+
+        with patch.object(self.r, "pipeline", side_effect=AssertionError("non-atomic round trip")), \
+             patch.object(self.r, "zadd", side_effect=AssertionError("separate enqueue")):
+            self.assertEqual(self.a.add(["https://ex.com/1", "https://ex.com/1#top", "https://ex.com/2"], not_before=0), 2)
+        self.assertEqual(self.r.zcard(self.a.keys["queue"]), self.r.scard(self.a.keys["seen"]))
+
+    def test_claims_are_disjoint(self):
+        self.a.add([f"https://ex.com/{i}" for i in range(5)], not_before=0)
+        got_a = self.a.claim(3, now=100)
+        got_b = self.b.claim(3, now=100)
+        self.assertEqual(len(got_a), 3)
+        self.assertEqual(len(got_b), 2)
+        self.assertFalse(set(got_a) & set(got_b))
+        self.assertEqual(self.a.claim(3, now=100), [])
+
+    def test_not_before_is_respected(self):
+        self.a.add(["https://ex.com/later"], not_before=500)
+        self.assertEqual(self.a.claim(1, now=100), [])
+        self.assertEqual(self.a.claim(1, now=500), ["https://ex.com/later"])
+
+    def test_only_owner_can_complete_or_release(self):
+        self.a.add(["https://ex.com/x"], not_before=0)
+        (url,) = self.a.claim(1, now=100)
+        self.assertFalse(self.b.complete(url))
+        self.assertFalse(self.b.release(url, now=100))
+        self.assertTrue(self.a.complete(url))
+        self.assertEqual(self.a.stats()["leased"], 0)
+        self.assertEqual(self.b.claim(1, now=1000), [])
+
+    def test_expired_lease_is_reclaimed_by_another_worker(self):
+        self.a.add(["https://ex.com/x"], not_before=0)
+        (url,) = self.a.claim(1, now=100)
+        self.assertEqual(self.b.claim(1, now=120), [])  # lease still valid
+        self.assertTrue(self.a.renew(url, now=120))
+        self.assertEqual(self.b.claim(1, now=140), [])  # renewed until 150
+        self.assertEqual(self.b.claim(1, now=151), [url])
+        self.assertFalse(self.a.complete(url))  # crashed worker came back too late
+        self.assertTrue(self.b.complete(url))
+
+    def test_release_requeues_then_dead_letters(self):
+        w = self.worker("c", max_attempts=2)
+        w.add(["https://ex.com/bad"], not_before=0)
+        (url,) = w.claim(1, now=100)
+        self.assertTrue(w.release(url, delay=60, now=100))
+        self.assertEqual(w.claim(1, now=120), [])
+        self.assertEqual(w.claim(1, now=160), [url])
+        self.assertTrue(w.release(url, now=160))
+        self.assertEqual(w.claim(1, now=1000), [])
+        self.assertEqual(self.r.smembers(w.keys["dead"]), {url})
+
+    def test_crashed_leases_dead_letter_after_max_attempts(self):
+        w = self.worker("c", max_attempts=1)
+        w.add(["https://ex.com/crashy"], not_before=0)
+        w.claim(1, now=100)
+        self.assertEqual(w.claim(1, now=200), [])
+        self.assertEqual(w.stats()["dead"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
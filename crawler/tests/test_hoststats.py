@@ -0,0 +1,162 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from crawler.ops import hoststats
+from crawler.ops.hoststats import OTHER, HostStatsRegistry, Window, bucket, bucket_value, load_snapshots, slow_hosts
+
+
+def setUpModule():
+    # Tests drive the clock forward; keep the periodic snapshot out of the working directory
+    global _no_save
+    from unittest.mock import patch
+
+    _no_save = patch.object(hoststats, "SAVE_INTERVAL", 0)
+    _no_save.start()
+
+
+def tearDownModule():
+    _no_save.stop()
+
+
+class Clock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class TestHistogram(unittest.TestCase):
+    def test_bucket_value_within_five_percent(self):
+        for seconds in (0.0003, 0.012, 0.25, 1.7, 42.0):
+            self.assertAlmostEqual(bucket_value(bucket(seconds)) / seconds, 1.0, delta=0.05)
+
+    def test_quantiles_and_merge(self):
+        a, b = Window(), Window()
+        for i in range(1, 91):
+            a.hist[bucket(0.01 * i)] = a.hist.get(bucket(0.01 * i), 0) + 1
+        for i in range(91, 101):
+            b.hist[bucket(0.01 * i)] = b.hist.get(bucket(0.01 * i), 0) + 1
+        merged = Window().merge(a).merge(b)
+        self.assertAlmostEqual(merged.quantile(0.5), 0.5, delta=0.03)
+        self.assertAlmostEqual(merged.quantile(0.99), 0.99, delta=0.05)
+        self.assertIsNone(Window().quantile(0.5))
+
+
+class TestRegistry(unittest.TestCase):
+    def test_record_summarizes_status_mix_bytes_and_retries(self):
+        clock = Clock()
+        reg = HostStatsRegistry(clock=clock)
+        for _ in range(8):
+            reg.record("https://a.example/x", 0.1, 200, 1000)
+        reg.record("https://a.example/y", 0.1, 429)
+        reg.record("https://a.example/z", 2.0, None)
+        reg.retry("https://a.example/z")
+        clock.t += 10
+        s = reg.snapshot()["a.example"]
+        self.assertEqual(s["requests"], 10)
+        self.assertEqual(s["status"], {"2xx": 8, "429": 1, "error": 1})
+        self.assertEqual(s["bytes"], 8000)
+        self.assertEqual(s["retries"], 1)
+        self.assertEqual(s["error_rate"], 0.1)
+        self.assertEqual(s["throttle_rate"], 0.1)
+        self.assertAlmostEqual(s["p50"], 0.1, delta=0.005)
+
+    def test_old_slots_roll_out_of_the_window(self):
+        clock = Clock()
+        reg = HostStatsRegistry(slot_seconds=60, slots=2, clock=clock)
+        reg.record("a.example", 0.1, 200)
+        clock.t += 60
+        reg.record("a.example", 0.1, 200)
+        self.assertEqual(reg.snapshot()["a.example"]["requests"], 2)
+        clock.t += 60
+        reg.record("a.example", 0.1, 200)
+        self.assertEqual(reg.snapshot()["a.example"]["requests"], 2)
+
+    def test_cardinality_is_bounded_by_folding_into_other(self):
+        reg = HostStatsRegistry(max_hosts=3, clock=Clock())
+        for _ in range(5):
+            reg.record("busy.example", 0.1, 200)
+        for i in range(10):
+            reg.record(f"h{i}.example", 0.1, 200)
+        snap = reg.snapshot()
+        self.assertLessEqual(len(snap), 4)
+        self.assertIn("busy.example", snap)
+        self.assertEqual(sum(s["requests"] for s in snap.values()), 15)
+        self.assertGreater(snap[OTHER]["requests"], 0)
+
+    def test_save_and_load_merge_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(2):
+                reg = HostStatsRegistry(clock=Clock())
+                reg.record("a.example", 0.2, 200, 10)
+                reg.save(Path(tmp) / f"hoststats-{i}.json")
+            merged = load_snapshots(Path(tmp), now=1000.0)
+            self.assertEqual(merged["a.example"]["requests"], 2)
+            self.assertEqual(merged["a.example"]["bytes"], 20)
+            self.assertEqual(load_snapshots(Path(tmp), max_age=60, now=5000.0), {})
+            data = json.loads((Path(tmp) / "hoststats-0.json").read_text())
+            self.assertIn("a.example", data["hosts"])
+
+    def test_export_metrics_groups_the_tail_under_other(self):
+        from unittest.mock import MagicMock, patch
+
+        from crawler.ops import metrics
+
+        reg = HostStatsRegistry(clock=Clock())
+        for i, n in enumerate((5, 3, 1)):
+            for _ in range(n):
+                reg.record(f"h{i}.example", 0.1, 200)
+        gauge = MagicMock()
+        with patch.object(metrics, "host_bytes", gauge):
+            reg.export_metrics(top=2)
+        hosts = [c.kwargs["host"] for c in gauge.labels.call_args_list]
+        self.assertEqual(hosts, ["h0.example", "h1.example", OTHER])
+        gauge.clear.assert_called_once()
+
+    def test_periodic_save_runs_off_the_recording_thread(self):
+        import threading
+        from unittest.mock import patch
+
+        clock = Clock()
+        reg = HostStatsRegistry(clock=clock)
+        release, threads = threading.Event(), []
+
+        def slow_save(path=None):
+            threads.append(threading.current_thread().name)
+            release.wait(5)
+
+        with patch.object(hoststats, "SAVE_INTERVAL", 30), patch.object(reg, "save", side_effect=slow_save), \
+                patch.object(reg, "export_metrics"):
+            reg.record("a.example", 0.1, 200)
+            clock.t += 31
+            reg.record("a.example", 0.1, 200)  # due: must not wait for the blocked save
+            clock.t += 31
+            reg.record("a.example", 0.1, 200)  # a save is still running: no second writer
+            release.set()
+            reg._saver.join(5)
+        self.assertEqual(threads, ["hoststats-save"])
+        self.assertEqual(reg.snapshot()["a.example"]["requests"], 3)
+
+
+class TestSlowHosts(unittest.TestCase):
+    def test_flags_slow_erroring_and_throttling_hosts(self):
+        clock = Clock()
+        reg = HostStatsRegistry(clock=clock)
+        for _ in range(30):
+            reg.record("fast.example", 0.05, 200)
+            reg.record("slow.example", 3.0, 200)
+            reg.record("throttled.example", 0.05, 429)
+        reg.record("rare.example", 9.0, 500)
+        clock.t += 30
+        slow = dict(slow_hosts(reg.snapshot()))
+        self.assertEqual(set(slow), {"slow.example", "throttled.example"})
+        self.assertTrue(slow["slow.example"][0].startswith("p90="))
+        self.assertTrue(slow["throttled.example"][0].startswith("429s="))
+        self.assertEqual(hoststats.summarize(Window(), 1.0)["requests"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
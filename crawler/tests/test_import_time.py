@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Optional heavy dependencies that must only be imported on first use.
+DEFERRED = ("boto3", "s3fs", "pandas", "pyarrow", "prometheus_client", "opentelemetry", "pydantic")
+
+# Cumulative import budget for crawler.cli in milliseconds (override on slow CI).
+BUDGET_MS = float(os.getenv("CRAWLER_IMPORT_BUDGET_MS", "250"))
+
+
+def _importtime(module: str) -> dict:
+    """Return {module: cumulative_us} from ``python -X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            out[name.strip()] = int(cumulative)
+    return out
+
+
+class TestImportTime(unittest.TestCase):
+    def test_cli_import_defers_optional_dependencies(self):
+        loaded = _importtime("crawler.cli")
+        heavy = sorted(m for m in loaded if m.split(".")[0] in DEFERRED)
+        self.assertEqual(heavy, [], f"imported at startup: {heavy[:10]}")
+
+    def test_cli_import_within_budget(self):
+        # Best of three runs to smooth out scheduler noise.
+        best_ms = min(_importtime("crawler.cli")["crawler.cli"] for _ in range(3)) / 1000
+        self.assertLess(best_ms, BUDGET_MS, f"crawler.cli import took {best_ms:.0f}ms (budget {BUDGET_MS:.0f}ms)")
+
+
+if __name__ == "__main__":
+    unittest.main()
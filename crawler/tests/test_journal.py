@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from crawler.core.journal import RunJournal
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def journal(self):
+        j = RunJournal("s", "MZ", self.tmp.name)
+        self.addCleanup(j.close)
+        return j
+
+    def test_unfinished_run_is_resumed_with_its_partition(self):
+        j = self.journal()
+        self.assertEqual(j.begin(date(2025, 8, 15)), [])
+        self.assertFalse(j.resumed)
+        j.record("https://ex.com/a?utm_source=x", digest="h1", status=200)
+        j.record("https://ex.com/b", status=200)  # fetched, nothing stored
+        run_id = j.run_id
+
+        again = self.journal()
+        self.assertEqual(again.begin(date(2025, 8, 16)), [])
+        self.assertTrue(again.resumed)
+        self.assertEqual((again.run_id, again.dt), (run_id, date(2025, 8, 15)))
+        self.assertTrue(again.is_done("https://ex.com/a"))
+        self.assertFalse(again.is_done("https://ex.com/c"))
+        self.assertEqual([e[:3] for e in again.entries()], [("https://ex.com/a?utm_source=x", "h1", 200)])
+
+    def test_finished_run_starts_fresh(self):
+        j = self.journal()
+        j.begin(date(2025, 8, 15))
+        j.record("https://ex.com/a", digest="h1", status=200)
+        j.finish()
+        self.assertEqual(list(j.entries()), [])
+        again = self.journal()
+        again.begin(date(2025, 8, 16))
+        self.assertFalse(again.resumed)
+        self.assertNotEqual(again.run_id, j.run_id)
+        self.assertEqual(again.dt, date(2025, 8, 16))
+
+    def test_restart_and_stale_runs_are_returned_for_closing(self):
+        j = self.journal()
+        j.begin(date(2025, 8, 15))
+        old = j.run_id
+        restarted = self.journal()
+        self.assertEqual(restarted.begin(date(2025, 8, 16), restart=True), [(old, date(2025, 8, 15))])
+        self.assertFalse(restarted.resumed)
+        later = datetime.now(timezone.utc) + timedelta(days=3)
+        stale = self.journal()
+        self.assertEqual(len(stale.begin(date(2025, 8, 18), now=later)), 2)
+        self.assertFalse(stale.resumed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+
+try:
+    import pydantic  # type: ignore
+    _HAS_PYD = True
+except Exception:
+    _HAS_PYD = False
+
+if _HAS_PYD:
+    from crawler.pipelines import langid
+    from crawler.pipelines.article import to_articles
+else:
+    langid = None  # type: ignore
+
+PT = "O governo anunciou hoje que vai investir mais em educação e saúde nas províncias do norte do país."
+EN = "The government announced today that it will invest more in education and health in the northern provinces."
+ES = "El gobierno anunció hoy que va a invertir más en educación y salud en las provincias del norte del país."
+
+
+@unittest.skipIf(not _HAS_PYD, "pydantic not installed")
+class TestLangId(unittest.TestCase):
+    def test_builtin_model_predicts_batch(self):
+        preds = langid.StopwordIdentifier().predict([PT, EN, ES, "ok", None])
+        self.assertEqual(preds, ["pt", "en", "es", None, None])
+
+    def test_shared_function_words_count_for_pt_and_es(self):
+        # "de"/"que" also count for French; they must not tip short pt/es sentences to fr
+        pt = "O presidente da República de Moçambique disse que de facto é necessário rever a lei de terras."
+        es = "El presidente de la República de Mozambique dijo que de hecho es necesario revisar la ley de tierras."
+        fr = "Le président de la République du Mozambique a dit que la loi sur les terres doit être revue."
+        self.assertEqual(langid.StopwordIdentifier().predict([pt, es, fr]), ["pt", "es", "fr"])
+
+    def test_identify_languages_overrides_only_when_confident(self):
+        pages = [("https://ex.com/1", f"<p>{EN}</p>"), ("https://ex.com/2", "<p>Olá</p>")]
+        with patch.object(langid, "get_identifier", return_value=langid.StopwordIdentifier()):
+            arts = to_articles(pages, country="MZ", language="pt", source="s", identify_language=True)
+        self.assertEqual([a.language for a in arts], ["en", "pt"])
+
+    def test_fasttext_backend_uses_one_batch_call(self):
+        class FakeModel:
+            calls = 0
+            def predict(self, texts, k=1):
+                FakeModel.calls += 1
+                assert all("\n" not in t for t in texts)
+                return [["__label__pt"], ["__label__en"]], [[0.9], [0.3]]
+
+        ident = langid.FastTextIdentifier.__new__(langid.FastTextIdentifier)
+        ident.model, ident.min_prob = FakeModel(), 0.5
+        self.assertEqual(ident.predict(["a\nb", None, "c"]), ["pt", None, None])
+        self.assertEqual(FakeModel.calls, 1)
+
+    def test_identifier_is_cached_and_falls_back(self):
+        langid.get_identifier.cache_clear()
+        try:
+            with patch.object(langid, "MODEL_PATH", "/nonexistent/lid.176.ftz"):
+                ident = langid.get_identifier()
+                self.assertIsInstance(ident, langid.StopwordIdentifier)
+                self.assertIs(langid.get_identifier(), ident)
+        finally:
+            langid.get_identifier.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,19 @@
 import io
 import json
 import logging
+import queue
 import unittest
 from unittest.mock import patch
 
-from crawler.ops.logging import JsonFormatter, configure_logging
+from crawler.ops.logging import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    configure_logging,
+    flush_queue,
+    parse_sample_rates,
+    queue_size,
+)
 
 
 class TestLogging(unittest.TestCase):
@@ -29,7 +38,7 @@ class TestLogging(unittest.TestCase):
         stream = io.StringIO()
         handler = logging.StreamHandler(stream)
         with patch("crawler.ops.logging.logging.StreamHandler", return_value=handler):
-            configure_logging("INFO")
+            configure_logging("INFO", force=True)
             logging.getLogger("x").info("msg")
             # ensure some JSON output happened
             out = stream.getvalue().strip()
@@ -37,6 +46,61 @@ class TestLogging(unittest.TestCase):
             data = json.loads(out)
             self.assertEqual(data["message"], "msg")
 
+    def test_configure_logging_is_idempotent(self):
+        configure_logging("INFO", force=True)
+        handler = logging.root.handlers[0]
+        configure_logging("INFO")
+        self.assertEqual(logging.root.handlers, [handler])
+        configure_logging("DEBUG")
+        self.assertIsNot(logging.root.handlers[0], handler)
+
+    def test_queue_mode_writes_from_listener_thread(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        with patch("crawler.ops.logging.logging.StreamHandler", return_value=handler):
+            configure_logging("INFO", use_queue=True, force=True)
+            self.assertIsInstance(logging.root.handlers[0], DroppingQueueHandler)
+            logging.getLogger("x").info("queued", extra={"detail": "d"})
+            configure_logging("INFO", force=True)  # stops and drains the listener
+        data = json.loads(stream.getvalue().strip())
+        self.assertEqual(data["message"], "queued")
+        self.assertEqual(data["detail"], "d")
+
+    def test_flush_queue_drains_on_the_calling_thread(self):
+        self.assertEqual(flush_queue(), 0)  # synchronous logging: nothing to do
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        with patch("crawler.ops.logging.logging.StreamHandler", return_value=handler), \
+                patch("crawler.ops.logging.logging.handlers.QueueListener.start"), \
+                patch("crawler.ops.logging.logging.handlers.QueueListener.stop"):  # no listener thread
+            configure_logging("INFO", use_queue=True, force=True)
+            for i in range(3):
+                logging.getLogger("x").info("queued", extra={"detail": str(i)})
+            self.assertEqual(queue_size(), 3)
+            self.assertEqual(flush_queue(), 3)
+            self.assertEqual(queue_size(), 0)
+            configure_logging("INFO", force=True)
+        details = [json.loads(line)["detail"] for line in stream.getvalue().splitlines()]
+        self.assertEqual(details, ["0", "1", "2"])
+
+    def test_dropping_queue_handler_counts_when_full(self):
+        h = DroppingQueueHandler(queue.Queue(maxsize=1))
+        rec = logging.LogRecord("x", logging.INFO, __file__, 1, "m", (), None)
+        h.handle(rec)
+        h.handle(rec)
+        self.assertEqual(h.dropped, 1)
+
+    def test_sampling_filter_keeps_one_in_n_and_all_warnings(self):
+        f = SamplingFilter({"fetched_parsed": 3})
+        mk = lambda lvl, msg: logging.LogRecord("x", lvl, __file__, 1, msg, (), None)
+        kept = [f.filter(mk(logging.INFO, "fetched_parsed")) for _ in range(6)]
+        self.assertEqual(kept, [True, False, False, True, False, False])
+        self.assertTrue(f.filter(mk(logging.INFO, "other")))
+        self.assertTrue(all(f.filter(mk(logging.ERROR, "fetched_parsed")) for _ in range(3)))
+
+    def test_parse_sample_rates(self):
+        self.assertEqual(parse_sample_rates("fetched_parsed=10, raw_written=5,bad"), {"fetched_parsed": 10, "raw_written": 5})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from crawler.ops import logging as crawler_logging
+from crawler.ops import memory
+from crawler.ops.memory import HARD, OK, SOFT, MemoryBudget
+
+
+class FakeRSS:
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def setUp(self):
+        self.rss = FakeRSS(0)
+        self.budget = MemoryBudget(1000, soft_ratio=0.8, hard_ratio=0.95, rss=self.rss)
+        self.shrink = MagicMock()
+        self.flush = MagicMock()
+        self.budget.track("cache", lambda: 42, self.shrink)
+        self.budget.on_flush("writer", self.flush)
+
+    def test_levels_and_hooks(self):
+        self.assertEqual(self.budget.check(), OK)
+        self.shrink.assert_not_called()
+        self.rss.value = 850
+        self.assertEqual(self.budget.check(), SOFT)
+        self.shrink.assert_called_once()
+        self.flush.assert_not_called()
+        self.rss.value = 990
+        self.assertEqual(self.budget.check(), HARD)
+        self.assertEqual(self.shrink.call_count, 2)
+        self.flush.assert_called_once()
+        self.assertEqual(self.budget.sizes(), {"cache": 42})
+
+    def test_failing_hook_does_not_break_check(self):
+        self.budget.track("bad", lambda: 1 / 0, MagicMock(side_effect=RuntimeError))
+        self.rss.value = 999
+        self.assertEqual(self.budget.check(), HARD)
+        self.flush.assert_called_once()
+        self.assertNotIn("bad", self.budget.sizes())
+
+    def test_relieve_waits_for_rss_to_drop(self):
+        self.rss.value = 990
+
+        async def go():
+            async def drop():
+                await asyncio.sleep(0.05)
+                self.rss.value = 100
+
+            asyncio.ensure_future(drop())
+            return await self.budget.relieve(max_wait=5, poll=0.01)
+
+        self.assertEqual(asyncio.run(go()), OK)
+        self.rss.value = 990
+        self.assertEqual(asyncio.run(self.budget.relieve(max_wait=0.02, poll=0.01)), HARD)
+
+    def test_watchdog(self):
+        self.rss.value = 900
+        self.budget.start_watchdog(interval=0.01)
+        try:
+            deadline = time.time() + 2
+            while not self.shrink.called and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            self.budget.stop_watchdog()
+        self.shrink.assert_called()
+
+    def test_get_budget(self):
+        prev = memory.set_budget(None)
+        try:
+            memory._budget.clear()
+            with patch.object(memory, "BUDGET_MB", 0):
+                self.assertIsNone(memory.get_budget())
+            memory._budget.clear()
+            with patch.object(memory, "BUDGET_MB", 64):
+                budget = memory.get_budget()
+            self.assertEqual(budget.limit, 64 * 2**20)
+            self.assertIn("robots_cache", budget.sizes())
+            self.assertIs(budget._flushers["log_queue"], crawler_logging.flush_queue)
+        finally:
+            memory._budget.clear()
+            memory.set_budget(prev)
+
+    def test_rss_bytes(self):
+        self.assertGreater(memory.rss_bytes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+from datetime import datetime, timezone
 
-from crawler.core.parse import parse_article
+from crawler.core.parse import normalize_date, normalize_language, parse_article, parse_article_basic, parse_article_stream, \
+    parse_metadata
 
 
 class TestParse(unittest.TestCase):
@@ -14,6 +16,120 @@ class TestParse(unittest.TestCase):
         self.assertIn("Hello", result["text"])  # basic text concat
         self.assertIn("World", result["text"])  # basic text concat
 
+    def test_json_ld_metadata_wins(self):
+        html = """
+        <html lang="en"><head><title>T</title>
+        <meta name="author" content="Meta Author">
+        <meta property="article:published_time" content="2020-01-01T00:00:00Z">
+        <script type="application/ld+json">
+        {"@context": "https://schema.org", "@graph": [
+          {"@type": "WebSite", "name": "Site"},
+          {"@type": ["NewsArticle"], "author": [{"@type": "Person", "name": "Ana Silva"}, "João"],
+           "datePublished": "2025-08-16T10:30:00+02:00", "inLanguage": "pt-MZ"}
+        ]}
+        </script></head><body><p>Corpo</p></body></html>
+        """
+        r = parse_article(html)
+        self.assertEqual(r["authors"], ["Ana Silva", "João"])
+        self.assertEqual(r["published_at"], datetime(2025, 8, 16, 8, 30, tzinfo=timezone.utc))
+        self.assertEqual(r["language"], "pt")
+        self.assertEqual(r["text"], "Corpo")  # JSON-LD is not visible text
+
+    def test_meta_and_html_lang_fallbacks(self):
+        html = """
+        <html lang="pt-BR"><head><title>T</title>
+        <meta name="author" content="Maria">
+        <meta name="author" content="https://facebook.com/maria">
+        <meta property="article:published_time" content="Sat, 16 Aug 2025 10:00:00 GMT">
+        <script type="application/ld+json">{broken</script>
+        </head><body>x</body></html>
+        """
+        r = parse_article(html)
+        self.assertEqual(r["authors"], ["Maria"])
+        self.assertEqual(r["published_at"], datetime(2025, 8, 16, 10, tzinfo=timezone.utc))
+        self.assertEqual(r["language"], "pt")
+
+    def test_non_string_json_ld_dates(self):
+        ld = '<script type="application/ld+json">{"@type": "NewsArticle", "datePublished": %s}</script><p>x</p>'
+        r = parse_article(ld % '[1704067200, "2024-01-01"]')
+        self.assertEqual(r["published_at"], datetime(2024, 1, 1, tzinfo=timezone.utc))
+        self.assertIsNone(parse_article(ld % "1704067200")["published_at"])
+        self.assertIsNone(normalize_date(1704067200))
+
+    def test_missing_metadata(self):
+        r = parse_article("<title>T</title><p>x</p>")
+        self.assertEqual((r["authors"], r["published_at"], r["language"]), ([], None, None))
+
+    def test_boilerplate_is_skipped(self):
+        html = """
+        <html><head><title>T</title><style>.a{color:red}</style><script>var x = "<p>no</p>";</script></head>
+        <body><header><a href="/">Home</a> Site banner</header>
+        <nav><ul><li><a href="/a">Menu A</a></li></ul></nav>
+        <article><header><h1>Headline</h1></header><p>Real <a href="#">linked</a> paragraph text.</p>
+        <ul><li><a href="/1">Related one</a></li><li><a href="/2">Related two</a></li></ul></article>
+        <aside>Ad</aside><noscript>Enable JS</noscript><footer>Copyright</footer></body></html>
+        """
+        text = parse_article_basic(html)["text"]
+        self.assertEqual(text, "Headline Real linked paragraph text.")
+
+    def test_unclosed_skip_element_does_not_swallow_following_documents(self):
+        r = parse_article_basic("<body><nav>menu</body><p>after</p>")
+        self.assertEqual(r["text"], "after")
+
+    def test_webforms_body_wrapper_keeps_article_text(self):
+        html = ('<html><body><form id="form1" action="x"><div><h1>Titulo</h1><p>Texto do artigo muito importante.</p>'
+                '<select><option>Maputo<option>Beira</select><input type="submit"><textarea>Comente</textarea></div>'
+                '</form></body></html>')
+        self.assertEqual(parse_article_basic(html)["text"], "Titulo Texto do artigo muito importante.")
+
+    def test_iframe_fallback_is_ignored_without_swallowing_the_page(self):
+        self.assertEqual(parse_article_basic("<p>before<iframe src=x></p><p>after</p>")["text"], "before after")
+        self.assertEqual(parse_article_basic("<p>a<iframe src=x>No iframes here</iframe>b</p>")["text"], "a b")
+
+    def test_output_is_capped(self):
+        from crawler.core.parse import _TitleTextParser
+        p = _TitleTextParser(max_chars=50)
+        p.feed("<div>" + "word " * 1000 + "</div><p>" + "more " * 100 + "</p>")
+        p.close()
+        self.assertLessEqual(len(p.result()["text"]), 50)
+
+    def test_stream_matches_whole_document(self):
+        html = "<html lang='pt'><title>Título</title><body><p>Olá, ação!</p><nav>x</nav><p>Fim</p></body></html>"
+        data = html.encode("utf-8")
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]  # splits tags and multibyte chars
+        self.assertEqual(parse_article_stream(chunks), parse_article_basic(html))
+
+    def test_metadata_only_pass_matches_full_parse(self):
+        html = "<html lang='pt'><head><meta name='author' content='Ana'></head><body><p>Texto</p></body></html>"
+        r = parse_article_basic(html)
+        self.assertEqual(parse_metadata(html), {k: r[k] for k in ("authors", "published_at", "language")})
+
+    def test_readability_path_reads_metadata_without_a_second_text_pass(self):
+        import sys
+        import types
+        from unittest.mock import MagicMock, patch
+
+        doc = MagicMock()
+        doc.return_value.summary.return_value = "<p>Corpo</p>"
+        doc.return_value.short_title.return_value = "T"
+        soup = MagicMock()
+        soup.return_value.get_text.return_value = "Corpo"
+        fakes = {"readability": types.SimpleNamespace(Document=doc), "bs4": types.SimpleNamespace(BeautifulSoup=soup)}
+        html = '<html lang="pt"><head><meta name="author" content="Maria"></head><body><p>Corpo</p></body></html>'
+        with patch.dict(sys.modules, fakes), \
+             patch("crawler.core.parse.parse_article_basic", side_effect=AssertionError("full basic parse")):
+            r = parse_article(html)
+        self.assertEqual((r["title"], r["text"], r["authors"], r["language"]), ("T", "Corpo", ["Maria"], "pt"))
+
+    def test_normalizers(self):
+        self.assertEqual(normalize_date("2025-08-16"), datetime(2025, 8, 16, tzinfo=timezone.utc))
+        self.assertEqual(normalize_date("2025-08-16T10:30:00"), datetime(2025, 8, 16, 10, 30, tzinfo=timezone.utc))
+        # RFC 2822 with "-0000" (no zone information) also comes back aware
+        self.assertEqual(normalize_date("Sat, 16 Aug 2025 10:00:00 -0000"), datetime(2025, 8, 16, 10, tzinfo=timezone.utc))
+        self.assertIsNone(normalize_date("yesterday"))
+        self.assertEqual(normalize_language("en_US"), "en")
+        self.assertIsNone(normalize_language("x-default"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,25 @@
+import asyncio
+import unittest
+
+from crawler.core.parse_pool import SharedMemoryParsePool
+
+
+class TestSharedMemoryParsePool(unittest.IsolatedAsyncioTestCase):
+    async def test_parses_via_shared_memory_and_recycles_slots(self):
+        pages = [f"<html><title>T{i}</title><body><p>ação {i}</p></body></html>".encode("utf-8") for i in range(8)]
+        async with SharedMemoryParsePool(max_workers=2, slots=2, slot_bytes=1024) as pool:
+            results = await asyncio.gather(*(pool.parse(p) for p in pages))
+            self.assertEqual(pool.free_slots, 2)
+        self.assertEqual([r["title"] for r in results], [f"T{i}" for i in range(8)])
+        self.assertIn("ação 3", results[3]["text"])
+
+    async def test_oversized_body_falls_back_to_pickling(self):
+        html = ("<title>Big</title>" + "<p>x</p>" * 200).encode("cp1252")
+        async with SharedMemoryParsePool(max_workers=1, slots=1, slot_bytes=64) as pool:
+            result = await pool.parse(html, "cp1252")
+            self.assertEqual(pool.free_slots, 1)
+        self.assertEqual(result["title"], "Big")
+
+
+if __name__ == "__main__":
+    unittest.main()
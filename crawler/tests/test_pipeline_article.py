@@ -10,7 +10,14 @@ except Exception:
     _HAS_PYD = False
 
 if _HAS_PYD:
-    from crawler.pipelines.article import to_article, write_curated_articles
+    from pydantic import ValidationError
+    from crawler.pipelines.article import (
+        articles_from_rows,
+        articles_to_rows,
+        to_article,
+        to_articles,
+        write_curated_articles,
+    )
 else:
     to_article = write_curated_articles = None  # type: ignore
 
@@ -25,6 +32,15 @@ class TestArticlePipeline(unittest.TestCase):
         self.assertEqual(art.country, "MZ")
         self.assertEqual(art.source, "src")
         self.assertTrue(art.content_hash)
+        self.assertEqual(art.language, "pt")  # catalog fallback
+
+    def test_to_article_uses_page_metadata(self):
+        html = """<html lang="en"><head><title>A</title><meta name="author" content="Ana">
+        <meta property="article:published_time" content="2025-08-16T10:00:00Z"></head><body>B</body></html>"""
+        art = to_article("https://example.com/x", html, country="MZ", language="pt", source="src")
+        self.assertEqual(art.authors, ["Ana"])
+        self.assertEqual(art.published_at.year, 2025)
+        self.assertEqual(art.language, "en")
 
     def test_write_curated_calls_storage_with_expected_path(self):
         records = [
@@ -38,6 +54,22 @@ class TestArticlePipeline(unittest.TestCase):
             wp.assert_called_once()
             path_arg = wp.call_args[0][0]
             self.assertEqual(path_arg, "bucket/curated/articles/MZ/dt=2025-08-16/data.parquet")
+            rows = wp.call_args[0][1]
+            self.assertEqual(rows[0]["url"], "https://ex.com/1")  # plain str, Parquet-friendly
+
+    def test_to_articles_matches_per_object_path(self):
+        pages = [("https://ex.com/1", "<title>T1</title><p>a</p>"), ("https://ex.com/2", "<title>T2</title>")]
+        batch = to_articles(pages, country="MZ", language="pt", source="s")
+        single = [to_article(u, h, country="MZ", language="pt", source="s") for u, h in pages]
+        self.assertEqual(batch, single)
+
+    def test_rows_round_trip_and_validation(self):
+        arts = to_articles([("https://ex.com/1", "<title>T</title>")], country="MZ", language=None, source="s")
+        rows = articles_to_rows(arts)
+        self.assertEqual(rows, [a.model_dump() | {"url": str(a.url)} for a in arts])
+        self.assertEqual(articles_from_rows(rows), arts)
+        with self.assertRaises(ValidationError):
+            articles_from_rows([dict(rows[0], url="not_a_url")])
 
 
 if __name__ == "__main__":
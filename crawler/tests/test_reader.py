@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from datetime import date
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    _HAS_PA = True
+except Exception:
+    _HAS_PA = False
+
+from crawler.core import reader, storage
+
+
+def _html(i):
+    return f"<html><head><title>Page {i}</title></head><body><p>Corpo número {i}</p></body></html>".encode("utf-8")
+
+
+class _BackendCase(unittest.TestCase):
+    def make_backend(self):
+        return storage.MemoryBackend()
+
+    def setUp(self):
+        self.prev = storage.set_backend(self.make_backend())
+        self.addCleanup(storage.set_backend, self.prev)
+        self.bucket = storage.S3Config().bucket
+        for dt in ("2025-08-15", "2025-08-16"):
+            for i in range(3):
+                storage.put_gz(
+                    f"raw/src/MZ/dt={dt}/page-{i:06d}.html.gz", _html(i),
+                    metadata={"url": f"https://example.org/{dt}/n%C3%BAmero-{i}", "charset": "utf-8"},
+                )
+
+
+class TestRawPages(_BackendCase):
+    def test_partitions_and_sources(self):
+        self.assertEqual(reader.list_partitions("raw", "src", "MZ"), ["2025-08-15", "2025-08-16"])
+        self.assertEqual(reader.list_sources("raw"), [("src", "MZ")])
+        self.assertEqual(reader.list_partitions("raw", "missing", "MZ"), [])
+
+    def test_iter_raw_pages_in_key_order(self):
+        pages = list(reader.iter_raw_pages("src", "MZ", "2025-08-16", workers=2))
+        self.assertEqual([p.path.rsplit("/", 1)[-1] for p in pages],
+                         [f"page-{i:06d}.html.gz" for i in range(3)])
+        self.assertEqual(pages[0].content, _html(0))
+        self.assertEqual(pages[0].url, "https://example.org/2025-08-16/número-0")
+        self.assertIn("número 0", pages[0].body.text)
+        self.assertEqual(len(list(reader.iter_raw_pages("src", "MZ"))), 6)
+
+    def test_ranged_read_returns_decompressed_prefix(self):
+        page = next(reader.iter_raw_pages("src", "MZ", "2025-08-15", max_bytes=40))
+        self.assertTrue(_html(0).startswith(page.content))
+        self.assertLess(len(page.content), len(_html(0)))
+
+    def test_manifest_entries_expand_to_blob_pages(self):
+        from crawler.core import blobs
+        from crawler.core.dedup import content_hash
+
+        with tempfile.TemporaryDirectory() as state:
+            store = blobs.BlobStore(state)
+            manifest = blobs.RunManifest("src", "MZ", date(2025, 8, 17), run_id="r1")
+            for i in (0, 1, 0):
+                store.put(_html(i), charset="utf-8")
+                manifest.add(f"https://example.org/número-{i}", content_hash(_html(i)), status=200,
+                             charset="utf-8", content_type="text/html")
+            store.close()
+        manifest.write()
+        pages = list(reader.iter_raw_pages("src", "MZ", "2025-08-17", workers=2))
+        self.assertEqual([p.url for p in pages], [f"https://example.org/número-{i}" for i in (0, 1, 0)])
+        self.assertEqual([p.content for p in pages], [_html(0), _html(1), _html(0)])
+        self.assertEqual(pages[0].content_type, "text/html")
+        self.assertEqual(pages[0].metadata["status"], "200")
+
+
+class TestRawPagesLocal(TestRawPages):
+    def make_backend(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        return storage.LocalBackend(self.tmp.name)
+
+
+@unittest.skipIf(not _HAS_PA, "pyarrow not installed")
+class TestScanCurated(_BackendCase):
+    def setUp(self):
+        super().setUp()
+        for dt, lang in (("2025-08-15", "pt"), ("2025-08-16", "en"), ("2025-08-17", "pt")):
+            storage.write_parquet(
+                f"{self.bucket}/curated/articles/MZ/dt={dt}/part-0000.parquet",
+                [{"url": f"https://example.org/{dt}/{i}", "language": lang, "title": f"t{i}"} for i in range(2)],
+            )
+
+    def test_projection_pruning_and_filter(self):
+        rows = reader.read_curated("articles", "MZ", columns=["url", "dt"], filter=pc.field("language") == "pt",
+                                   dt_from=date(2025, 8, 16))
+        self.assertEqual(rows, [{"url": f"https://example.org/2025-08-17/{i}", "dt": "2025-08-17"} for i in range(2)])
+
+    def test_empty(self):
+        self.assertEqual(reader.read_curated("articles", "ZA"), [])
+
+    def test_partitions_with_differing_inferred_types(self):
+        from datetime import datetime, timezone
+
+        published = datetime(2025, 8, 16, 8, 30, tzinfo=timezone.utc)
+        for dt, value in (("2025-08-15", None), ("2025-08-16", published)):
+            storage.write_parquet(f"{self.bucket}/curated/articles/ZA/dt={dt}/part-0000.parquet",
+                                  [{"url": f"https://example.org/{dt}", "published_at": value}])
+        rows = reader.read_curated("articles", "ZA")
+        self.assertEqual([(r["dt"], r["published_at"]) for r in rows], [("2025-08-15", None), ("2025-08-16", published)])
+
+
+@unittest.skipIf(not _HAS_PA, "pyarrow not installed")
+class TestScanCuratedLocal(TestScanCurated):
+    def make_backend(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        return storage.LocalBackend(self.tmp.name)
+
+
+class TestReprocess(_BackendCase):
+    def test_reprocess_pages_builds_articles(self):
+        pages = reader.iter_raw_pages("src", "MZ", "2025-08-15")
+        arts = list(reader.reprocess_pages(pages, country="MZ", source="src", language="pt", workers=2))
+        self.assertEqual([a.title for a in arts], ["Page 0", "Page 1", "Page 2"])
+        self.assertEqual(str(arts[1].url), "https://example.org/2025-08-15/n%C3%BAmero-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timezone
+
+try:
+    import pydantic  # type: ignore
+    _HAS_PYD = True
+except Exception:
+    _HAS_PYD = False
+
+try:
+    import pyarrow  # type: ignore
+    _HAS_PA = True
+except Exception:
+    _HAS_PA = False
+
+from crawler.core import storage
+from crawler.core.records import CrawlRecords
+
+H = "ab" * 32
+T = datetime(2025, 8, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class TestCrawlRecords(unittest.TestCase):
+    def setUp(self):
+        self.r = CrawlRecords(capacity=2)
+        self.urls = [f"https://h{i % 3}.ex.com/news/{i}?p=1" for i in range(500)] + ["http://plain.ex.com/"]
+        self.idx = self.r.extend(self.urls)
+
+    def test_add_is_idempotent_by_canonical_url_and_survives_growth(self):
+        self.assertEqual(self.idx, list(range(501)))
+        self.assertEqual(self.r.add("https://H1.ex.com/news/1/?p=1"), 1)
+        self.assertEqual(len(self.r), 501)
+        self.assertEqual([self.r.url(i) for i in self.idx], self.urls)
+        self.assertEqual(self.r.index("https://h2.ex.com/news/499?p=1"), None)
+        self.assertIn("http://plain.ex.com", self.r)
+        self.assertEqual(self.r.hosts, ["h0.ex.com", "h1.ex.com", "h2.ex.com", "plain.ex.com"])
+
+    def test_update_and_record(self):
+        self.r.update(7, status=200, content_hash=H, fetched_at=T, storage_key="raw/a.html.gz", content_type="text/html")
+        self.r.update(3, storage_key="raw/other.html.gz")
+        self.r.update(7, storage_key="raw/a-longer-key.html.gz", retry=True)
+        rec = self.r.record(7)
+        self.assertEqual((rec.url, rec.status, rec.content_hash, rec.fetched_at, rec.retries, rec.storage_key, rec.content_type),
+                         (self.urls[7], 200, H, T, 1, "raw/a-longer-key.html.gz", "text/html"))
+        self.assertEqual(self.r.storage_key(3), "raw/other.html.gz")
+        self.assertEqual(self.r.url(3), self.urls[3])
+        empty = self.r.record(8)
+        self.assertEqual((empty.status, empty.content_hash, empty.fetched_at, empty.storage_key), (0, None, None, ""))
+        for _ in range(300):
+            self.r.update(8, retry=True)
+        self.assertEqual(self.r.retries[8], 255)
+
+    def test_paths_and_keys_longer_than_64k(self):
+        url = "https://h0.ex.com/q?" + "x" * 70000
+        idx = self.r.add(url)
+        self.r.update(idx, storage_key="raw/" + "k" * 70000)
+        self.r.update(0, storage_key="raw/short")
+        self.assertEqual(self.r.url(idx), url)
+        self.assertEqual(self.r.storage_key(idx), "raw/" + "k" * 70000)
+        self.assertEqual(self.r.record(0).storage_key, "raw/short")
+
+    def test_compact(self):
+        # fixed columns + digest + index, excluding the URL arena
+        arena = len(self.r.arena) / len(self.r)
+        self.assertLess(self.r.bytes_per_record() - arena, 100)
+
+    @unittest.skipIf(not _HAS_PYD, "pydantic not installed")
+    def test_to_page_raw_exports_fetched_records(self):
+        self.r.update(2, status=200, content_hash=H, fetched_at=T, storage_key="k", content_type="text/html")
+        (page,) = self.r.to_page_raw()
+        self.assertEqual(str(page.url), self.urls[2])
+        self.assertEqual((page.status, page.content_hash, page.fetched_at, page.headers), (200, H, T, {"content-type": "text/html"}))
+
+    @unittest.skipIf(not _HAS_PA, "pyarrow not installed")
+    def test_arrow_and_parquet(self):
+        self.r.update(2, status=404, fetched_at=T)
+        self.r.update(4, status=200, content_hash=H, fetched_at=T, content_type="text/html")
+        table = self.r.to_arrow()
+        self.assertEqual(table.num_rows, 501)
+        rows = table.slice(2, 3).to_pylist()
+        self.assertEqual([r["status"] for r in rows], [404, 0, 200])
+        self.assertIsNone(rows[0]["content_hash"])
+        self.assertEqual(rows[2]["content_hash"], bytes.fromhex(H))
+        self.assertEqual(rows[2]["host"], "h1.ex.com")
+        self.assertEqual(rows[2]["fetched_at"], T)
+        prev = storage.set_backend(storage.MemoryBackend())
+        try:
+            self.r.write_parquet("bucket/state/records.parquet")
+            import pyarrow.parquet as pq
+            back = pq.read_table(storage.get_backend().open_read("bucket/state/records.parquet"))
+            self.assertEqual(back.column("url").to_pylist(), self.urls)
+        finally:
+            storage.set_backend(prev)
+
+
+if __name__ == "__main__":
+    unittest.main()
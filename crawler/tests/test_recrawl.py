@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from crawler.ops.recrawl import RecrawlPolicy, change_probability, change_rate
+
+T0 = datetime(2025, 8, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+class TestRecrawlPolicy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.policy = RecrawlPolicy("s", "MZ", state_dir=self.tmp.name, min_interval=60, max_interval=7 * 86400)
+        self.addCleanup(self.policy.close)
+
+    def test_estimator(self):
+        self.assertGreater(change_rate(10, 36000), change_rate(0, 36000))
+        self.assertAlmostEqual(change_probability(1 / 3600, 3600), 0.632, places=3)
+        self.assertEqual(change_probability(1.0, -5), 0.0)
+
+    def test_observe_tracks_changes(self):
+        self.assertFalse(self.policy.known("https://ex.com/a"))
+        self.assertFalse(self.policy.observe("https://ex.com/a", "h1", T0))
+        self.assertTrue(self.policy.known("https://ex.com/a/"))
+        self.assertFalse(self.policy.observe("https://ex.com/a", "h1", T0 + HOUR))
+        self.assertTrue(self.policy.observe("https://ex.com/a", "h2", T0 + 2 * HOUR))
+
+    def test_budget_goes_to_pages_that_change(self):
+        # Front page changes every hour, the archive page never does
+        for i in range(24):
+            self.policy.observe("https://ex.com/", f"front-{i}", T0 + i * HOUR)
+            self.policy.observe("https://ex.com/archive", "same", T0 + i * HOUR)
+        self.assertGreater(self.policy.rate("https://ex.com/"), 10 * self.policy.rate("https://ex.com/archive"))
+        now = T0 + 25 * HOUR
+        self.assertEqual(self.policy.due(1, now), ["https://ex.com/"])
+        self.assertEqual(self.policy.due(5, now), ["https://ex.com/"])  # archive not yet due
+        self.assertEqual(self.policy.due(5, now, exclude=["https://ex.com"]), [])
+        self.assertEqual(self.policy.due(0, now), [])
+
+    def test_stale_urls_are_always_eligible(self):
+        self.policy.observe("https://ex.com/archive", "same", T0)
+        self.policy.observe("https://ex.com/archive", "same", T0 + HOUR)
+        self.assertEqual(self.policy.due(5, T0 + 2 * HOUR), [])
+        self.assertEqual(self.policy.due(5, T0 + timedelta(days=8)), ["https://ex.com/archive"])
+
+
+if __name__ == "__main__":
+    unittest.main()
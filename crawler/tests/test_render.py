@@ -2,7 +2,11 @@ import asyncio
 import unittest
 from unittest.mock import AsyncMock, patch
 
-from crawler.core.render import render_html, RenderNotAvailable
+from crawler.core.render import RenderNotAvailable, RenderPool, needs_render, render_html
+
+ARTICLE = "<html><body><article>" + "<p>Texto do artigo com conteúdo suficiente.</p>" * 40 + "</article></body></html>"
+SHELL = '<html><head><title>App</title></head><body><div id="root"></div><script src="/app.js"></script></body></html>'
+NOSCRIPT = "<html><body><noscript>Please enable JavaScript to read this story.</noscript><p>Subscribe today</p></body></html>"
 
 
 class TestRender(unittest.IsolatedAsyncioTestCase):
@@ -31,5 +35,57 @@ class TestRender(unittest.IsolatedAsyncioTestCase):
             await render_html("https://example.com", fallback_to_fetch=False)
 
 
+class TestNeedsRender(unittest.TestCase):
+    def test_static_article_is_not_rendered(self):
+        self.assertIsNone(needs_render(ARTICLE, {"text": "x" * 1000}))
+        # Rich text wins even when the page also carries SPA markers
+        self.assertIsNone(needs_render(SHELL, {"text": "x" * 1000}))
+
+    def test_reasons(self):
+        self.assertEqual(needs_render(SHELL, {"text": ""}), "spa_shell")
+        self.assertEqual(needs_render(NOSCRIPT, {"text": "Subscribe today"}), "noscript")
+        self.assertEqual(needs_render("<html><body></body></html>", {"text": None}), "empty_text")
+        self.assertEqual(needs_render("<p>Short</p>", {"text": "Short"}), "short_text")
+        # Moderately short text without any JS marker stays static
+        self.assertIsNone(needs_render("<p>...</p>", {"text": "x" * 300}))
+
+
+class TestRenderPool(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_is_bounded(self):
+        active = peak = 0
+
+        async def fake(url):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return f"<html>{url}</html>"
+
+        async with RenderPool(concurrency=2, render=fake) as pool:
+            out = await asyncio.gather(*(pool.render(f"u{i}") for i in range(8)))
+        self.assertEqual(out, [f"<html>u{i}</html>" for i in range(8)])
+        self.assertEqual(peak, 2)
+
+    async def test_errors_reach_the_caller_and_workers_survive(self):
+        async def fake(url):
+            if url == "bad":
+                raise ValueError("boom")
+            return "ok"
+
+        async with RenderPool(concurrency=1, render=fake) as pool:
+            with self.assertRaises(ValueError):
+                await pool.render("bad")
+            self.assertEqual(await pool.render("good"), "ok")
+
+    async def test_without_playwright_render_raises_not_available(self):
+        with patch.dict("sys.modules", {"playwright": None, "playwright.async_api": None}):
+            async with RenderPool(concurrency=1) as pool:
+                with self.assertRaises(RenderNotAvailable):
+                    await pool.render("https://example.com")
+                with self.assertRaises(RenderNotAvailable):  # remembered, not retried
+                    await pool.render("https://example.com")
+
+
 if __name__ == "__main__":
     asyncio.run(unittest.main())
@@ -0,0 +1,133 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+try:
+    import pydantic  # type: ignore
+    import pyarrow  # type: ignore
+    _HAS_DEPS = True
+except Exception:
+    _HAS_DEPS = False
+
+from crawler.core import reader, storage
+
+if _HAS_DEPS:
+    from crawler.pipelines import reprocess
+
+
+def _put_page(dt, i, url=True):
+    html = f"<html><head><title>Story {i}</title></head><body><p>Text {i}</p></body></html>".encode()
+    meta = {"charset": "utf-8"}
+    if url:
+        meta["url"] = f"https://example.org/{dt}/{i}"
+    storage.put_gz(f"raw/src/MZ/dt={dt}/page-{i:06d}.html.gz", html, metadata=meta)
+
+
+@unittest.skipIf(not _HAS_DEPS, "pydantic/pyarrow not installed")
+class TestReprocess(unittest.TestCase):
+    def setUp(self):
+        prev = storage.set_backend(storage.MemoryBackend())
+        self.addCleanup(storage.set_backend, prev)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for dt in ("2025-08-15", "2025-08-16"):
+            for i in range(3):
+                _put_page(dt, i)
+        _put_page("2025-08-16", 9, url=False)
+
+    def run_backfill(self, **kw):
+        return reprocess.reprocess_source("src", "MZ", language="pt", workers=2, state_dir=self.tmp.name, **kw)
+
+    def test_rewrites_curated_partitions_and_checkpoints(self):
+        totals = self.run_backfill()
+        self.assertEqual(totals, {"partitions": 2, "pages": 7, "articles": 6})
+        rows = reader.read_curated("articles", "MZ", columns=["title", "dt"], dt_from=date(2025, 8, 16))
+        self.assertEqual(rows, [{"title": f"Story {i}", "dt": "2025-08-16"} for i in range(3)])
+        with open(f"{self.tmp.name}/reprocess-src-MZ.json") as f:
+            done = json.load(f)["done"]
+        self.assertEqual(done["2025-08-16"]["pages"], 4)
+
+    def test_resume_skips_finished_partitions(self):
+        self.run_backfill(dt_to=date(2025, 8, 15))
+        with patch.object(reprocess, "write_curated_articles") as w:
+            totals = self.run_backfill()
+        self.assertEqual(totals["partitions"], 1)
+        self.assertEqual(w.call_args.kwargs["dt"].date(), date(2025, 8, 16))
+        with patch.object(reprocess, "write_curated_articles") as w:
+            self.assertEqual(self.run_backfill()["partitions"], 0)
+            self.assertEqual(self.run_backfill(restart=True)["partitions"], 2)
+
+    def test_large_partitions_are_flushed_in_parts(self):
+        self.run_backfill(flush_rows=2)
+        parts = sorted(p for p in storage.get_backend().objects if "/curated/" in p and "dt=2025-08-15" in p)
+        self.assertRegex(parts[0], r"/part-src--\d{8}T\d{6}-[0-9a-f]{8}-00000\.parquet$")
+        self.assertEqual(len(parts), 2)
+        self.assertEqual(len(reader.read_curated("articles", "MZ", dt_to=date(2025, 8, 15))), 3)
+        # A restart replaces the partition instead of adding to it
+        self.run_backfill(restart=True)
+        self.assertEqual(len(reader.read_curated("articles", "MZ", dt_to=date(2025, 8, 15))), 3)
+
+    def test_failed_rewrite_keeps_the_previous_partition(self):
+        self.run_backfill(flush_rows=2)
+        write = reprocess.write_curated_articles
+
+        def fail_second_part(records, **kw):
+            if kw["part"] == 1:
+                raise OSError("killed")
+            write(records, **kw)
+
+        with patch.object(reprocess, "write_curated_articles", side_effect=fail_second_part):
+            with self.assertRaises(OSError):
+                self.run_backfill(flush_rows=2, restart=True)
+        titles = [r["title"] for r in reader.read_curated("articles", "MZ", columns=["title"], dt_to=date(2025, 8, 15))]
+        self.assertEqual(sorted(set(titles)), [f"Story {i}" for i in range(3)])  # nothing lost
+        self.run_backfill(flush_rows=2)  # the unfinished partition is redone and the leftovers removed
+        self.assertEqual(len(reader.read_curated("articles", "MZ", dt_to=date(2025, 8, 15))), 3)
+
+    def test_partition_where_every_page_fails_is_kept_and_retried(self):
+        self.run_backfill(dt_to=date(2025, 8, 15))
+        with patch.object(reprocess.reader, "reprocess_pages", side_effect=lambda pages, **kw: (p for p in pages if False)):
+            totals = self.run_backfill(restart=True)
+        self.assertEqual(totals["partitions"], 0)
+        self.assertEqual(len(reader.read_curated("articles", "MZ", dt_to=date(2025, 8, 15))), 3)  # old output kept
+        self.assertNotIn("2025-08-15", reprocess.Checkpoint("src", "MZ", self.tmp.name))  # the next run retries it
+        self.assertEqual(self.run_backfill()["partitions"], 2)
+
+    def test_reprocessing_one_source_keeps_other_sources_of_the_country(self):
+        from datetime import datetime
+        from crawler.pipelines.article import to_article
+
+        day = datetime(2025, 8, 15)
+        other = to_article("https://other.example/1", "<title>Other</title><p>x</p>", country="MZ", language="pt", source="src-b")
+        reprocess._write_partition([other], source="src-b", country="MZ", dt=day, flush_rows=10)
+        self.run_backfill(dt_to=date(2025, 8, 15))
+        self.run_backfill(dt_to=date(2025, 8, 15), restart=True)
+        titles = sorted(r["title"] for r in reader.read_curated("articles", "MZ", columns=["title"], dt_to=date(2025, 8, 15)))
+        self.assertEqual(titles, ["Other"] + [f"Story {i}" for i in range(3)])
+
+    def test_hard_pressure_from_the_watchdog_flushes_the_buffer(self):
+        from datetime import datetime
+        from crawler.ops.memory import MemoryBudget, set_budget
+
+        rss = [0]
+        budget = MemoryBudget(1000, rss=lambda: rss[0])
+        self.addCleanup(set_budget, set_budget(budget))
+
+        def articles():
+            yield "a"
+            yield "b"
+            rss[0] = 1000
+            budget.check()  # what the watchdog thread would do
+            yield "c"
+            yield "d"
+
+        with patch.object(reprocess, "write_curated_articles") as w:
+            reprocess._write_partition(articles(), source="src", country="MZ", dt=datetime(2025, 8, 15), flush_rows=100)
+        self.assertEqual([c.args[0] for c in w.call_args_list], [["a", "b", "c"], ["d"]])
+        self.assertNotIn("reprocess_buffer", budget._flushers)
+
+
+if __name__ == "__main__":
+    unittest.main()
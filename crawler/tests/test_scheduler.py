@@ -6,6 +6,7 @@ from unittest.mock import patch, AsyncMock
 
 import logging
 import crawler.ops.scheduler as sched
+from crawler.core.catalog import Catalog
 
 
 class TestScheduler(unittest.IsolatedAsyncioTestCase):
@@ -35,8 +36,8 @@ class TestScheduler(unittest.IsolatedAsyncioTestCase):
             def __init__(self):
                 self.jobs = []
                 self.started = False
-            def add_job(self, func, trigger, minute, hour, day, month, day_of_week, id, replace_existing):
-                self.jobs.append({"id": id, "trigger": trigger, "minute": minute})
+            def add_job(self, func, trigger, minute, hour, day, month, day_of_week, id, replace_existing, **kwargs):
+                self.jobs.append({"id": id, "trigger": trigger, "minute": minute, "func": func, **kwargs})
             def start(self):
                 self.started = True
 
@@ -48,7 +49,7 @@ class TestScheduler(unittest.IsolatedAsyncioTestCase):
             return orig_make(self, name, level, fn, lno, msg, args, exc_info, func, extra, sinfo)
         with patch.object(logging.Logger, "makeRecord", safe_make):
             with patch.object(sched, "AsyncIOScheduler", DummyScheduler):
-                with patch.object(sched, "_load_catalog", return_value=dummy_catalog):
+                with patch.object(sched, "_load_catalog", return_value=Catalog.from_dict(dummy_catalog)):
                     async def run_source_coro(source, country, max_pages, **kwargs):
                         return None
                     sch = sched.start_scheduler(Path("/x"), run_source_coro)
@@ -57,6 +58,60 @@ class TestScheduler(unittest.IsolatedAsyncioTestCase):
                     # Only one valid job should be scheduled
                     self.assertEqual(len(sch.jobs), 1)
                     self.assertEqual(sch.jobs[0]["id"], "src1:MZ")
+                    self.assertTrue(sch.jobs[0]["coalesce"])
+
+    async def test_scheduled_job_runs_through_limiter(self):
+        calls = []
+
+        class DummyScheduler:
+            def __init__(self):
+                self.jobs = []
+            def add_job(self, func, **kwargs):
+                self.jobs.append(func)
+            def start(self):
+                pass
+
+        async def run_source_coro(source, country, max_pages, **kwargs):
+            calls.append((source, country, max_pages))
+
+        catalog = Catalog.from_dict({"sources": [{"name": "s", "country": "MZ", "schedule": "0 * * * *", "max_pages": 3}]})
+        with patch.object(sched, "AsyncIOScheduler", DummyScheduler), \
+             patch.object(sched, "_load_catalog", return_value=catalog):
+            sch = sched.start_scheduler(Path("/x"), run_source_coro, max_concurrent=1, spread_seconds=0)
+        await sch.jobs[0]()
+        self.assertEqual(calls, [("s", "MZ", 3)])
+        self.assertEqual(sch.limiter.max_concurrent, 1)
+
+    async def test_limiter_caps_concurrency_and_skips_overlaps(self):
+        limiter = sched.RunLimiter(max_concurrent=2)
+        running = 0
+        peak = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+        tasks = [asyncio.create_task(limiter.run(f"s{i}:MZ", 0.0, work)) for i in range(4)]
+        await asyncio.sleep(0)
+        skipped = await limiter.run("s0:MZ", 0.0, work)
+        self.assertFalse(skipped)
+        self.assertEqual(limiter.active, {"s0:MZ", "s1:MZ", "s2:MZ", "s3:MZ"})
+        release.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(results, [True] * 4)
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.active, set())
+
+    def test_spread_offset_is_deterministic_and_bounded(self):
+        offsets = [sched.spread_offset(f"src{i}:MZ", 600) for i in range(50)]
+        self.assertEqual(offsets, [sched.spread_offset(f"src{i}:MZ", 600) for i in range(50)])
+        self.assertTrue(all(0 <= o < 600 for o in offsets))
+        self.assertGreater(len(set(offsets)), 40)
+        self.assertEqual(sched.spread_offset("x:MZ", 0), 0)
 
 
 if __name__ == "__main__":
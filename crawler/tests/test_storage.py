@@ -1,5 +1,7 @@
 import gzip
 import io
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -7,6 +9,11 @@ import crawler.core.storage as storage
 
 
 class TestStorage(unittest.TestCase):
+    def setUp(self):
+        # S3Backend keeps its client; start each test from a fresh default backend
+        storage.set_backend(None)
+        self.addCleanup(storage.set_backend, None)
+
     def test_put_gz_raises_when_boto_missing(self):
         with patch.object(storage, "boto3", None):
             with self.assertRaises(RuntimeError):
@@ -31,6 +38,108 @@ class TestStorage(unittest.TestCase):
             out = f.read()
         self.assertEqual(out, b"hello world")
 
+    def test_s3_backend_builds_one_client_for_all_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        mock_client = MagicMock()
+        with patch.object(storage, "_client", return_value=mock_client) as make:
+            backend = storage.S3Backend()
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                list(ex.map(lambda i: backend.put(f"b/k{i}", b"x"), range(64)))
+            backend.exists("b/k0")
+        make.assert_called_once()
+        self.assertEqual(mock_client.put_object.call_count, 64)
+
+
+class TestBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(storage.set_backend, None)
+
+    def test_incomplete_backend_fails_at_construction(self):
+        class NoDelete(storage.StorageBackend):
+            put = get = get_object = exists = list = open_write = open_read = lambda self, *a, **k: None
+
+        with self.assertRaises(TypeError):
+            NoDelete()
+        storage.MemoryBackend()  # complete backends still instantiate
+
+    def _roundtrip(self, backend):
+        backend.put("b/raw/x.html.gz", b"abc", content_type="text/html", content_encoding="gzip", metadata={"k": "v"})
+        self.assertTrue(backend.exists("b/raw/x.html.gz"))
+        self.assertFalse(backend.exists("b/raw/y"))
+        self.assertEqual(backend.get("b/raw/x.html.gz"), b"abc")
+        with backend.open_write("b/cur/data.bin") as f:
+            f.write(b"123")
+        with backend.open_read("b/cur/data.bin") as f:
+            self.assertEqual(f.read(), b"123")
+        self.assertEqual(sorted(backend.list("b/raw/")), ["b/raw/x.html.gz"])
+
+    def test_local_list_walks_only_below_the_prefix(self):
+        backend = storage.LocalBackend(self.tmp.name)
+        for key in ("b/raw/s/dt=1/a", "b/raw/s/dt=1/b", "b/raw/s/dt=2/c", "b/cur/x"):
+            backend.put(key, b"")
+        walked = []
+        real_walk = os.walk
+        with patch.object(storage.os, "walk", side_effect=lambda top: walked.append(top) or real_walk(top)):
+            self.assertEqual(sorted(backend.list("b/raw/s/dt=1/")), ["b/raw/s/dt=1/a", "b/raw/s/dt=1/b"])
+            self.assertEqual(sorted(backend.list("b/raw/s/dt=")), ["b/raw/s/dt=1/a", "b/raw/s/dt=1/b", "b/raw/s/dt=2/c"])
+            self.assertEqual(list(backend.list("b/missing/")), [])
+        self.assertEqual([os.path.relpath(w, backend.root.resolve()) for w in walked], ["b/raw/s/dt=1", "b/raw/s"])
+        self.assertEqual(len(list(backend.list(""))), 4)
+
+    def test_memory_backend(self):
+        self._roundtrip(storage.MemoryBackend())
+
+    def test_local_backend_atomic_and_sidecar_metadata(self):
+        backend = storage.LocalBackend(self.tmp.name)
+        self._roundtrip(backend)
+        self.assertEqual(backend.metadata("b/raw/x.html.gz")["metadata"], {"k": "v"})
+        with self.assertRaises(RuntimeError):
+            with backend.open_write("b/cur/data.bin") as f:
+                f.write(b"partial")
+                raise RuntimeError("crash mid-write")
+        self.assertEqual(backend.get("b/cur/data.bin"), b"123")  # old version intact
+        self.assertEqual([n for n in os.listdir(os.path.join(self.tmp.name, "b/cur")) if n.startswith(".tmp-")], [])
+        with self.assertRaises(ValueError):
+            backend.put("../escape", b"x")
+
+    def test_local_put_file(self):
+        backend = storage.LocalBackend(self.tmp.name)
+        src = os.path.join(self.tmp.name, "src.bin")
+        with open(src, "wb") as f:
+            f.write(b"x" * 10000)
+        backend.put_file("b/copy.bin", src)
+        self.assertEqual(backend.get("b/copy.bin"), b"x" * 10000)
+
+    def test_put_gz_and_parquet_through_active_backend(self):
+        mem = storage.MemoryBackend()
+        storage.set_backend(mem)
+        with patch.object(storage, "S3Config") as Cfg:
+            Cfg.return_value.bucket = "b"
+            storage.put_gz("raw/k", b"hello", metadata={"h": "1"})
+            self.assertEqual(gzip.decompress(storage.get_bytes("raw/k")), b"hello")
+        data, meta = mem.objects["b/raw/k"]
+        self.assertEqual(gzip.decompress(data), b"hello")
+        self.assertEqual((meta["content_encoding"], meta["metadata"]), ("gzip", {"h": "1"}))
+        try:
+            import pyarrow  # noqa: F401
+        except Exception:
+            return
+        storage.write_parquet("b/cur/data.parquet", [{"a": 1}, {"a": 2}])
+        self.assertEqual(storage.read_parquet("b/cur/data.parquet"), [{"a": 1}, {"a": 2}])
+
+    def test_sync_to_s3_uploads_and_clears_spool(self):
+        spool = storage.LocalBackend(self.tmp.name)
+        spool.put("b/raw/1", b"one", content_type="text/html", content_encoding="gzip", metadata={"m": "1"})
+        spool.put("b/raw/2", b"two")
+        target = storage.MemoryBackend()
+        n, size = storage.sync_to_s3(spool, target, prefix="b/raw/", workers=2)
+        self.assertEqual((n, size), (2, 6))
+        self.assertEqual(target.objects["b/raw/1"][1]["metadata"], {"m": "1"})
+        self.assertEqual(list(spool.list("b/")), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from crawler.bench.synthetic_web import SyntheticWeb, WebConfig
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as r:
+            return r.status, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+class TestSyntheticWeb(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.web = SyntheticWeb(WebConfig(pages=5, latency_ms=0, body_kb=1, min_gap=10), hosts=2)
+        self.hosts = await self.web.start()
+
+    async def asyncTearDown(self):
+        await self.web.close()
+
+    async def get(self, url):
+        return await asyncio.to_thread(_get, url)
+
+    async def test_pages_robots_sitemap_and_violations(self):
+        host = self.hosts[0]
+        status, body = await self.get(f"{host}/robots.txt")
+        self.assertIn(b"Disallow: /private/", body)
+        self.assertIn(f"Sitemap: {host}/sitemap.xml".encode(), body)
+        status, body = await self.get(f"{host}/sitemap.xml")
+        self.assertEqual(body.count(b"<loc>"), 5 + 10)
+        status, body = await self.get(f"{host}/p/3")
+        self.assertEqual(status, 200)
+        self.assertIn("Notícia 3".encode(), body)
+        self.assertEqual((await self.get(f"{host}/p/99"))[0], 404)
+        await self.get(f"{host}/private/1")
+        stats = json.loads((await self.get(f"{self.hosts[1]}/__stats"))[1])
+        first = stats[host.removeprefix("http://")]
+        self.assertEqual(first["requests"], 5)
+        self.assertEqual(first["violations"], {"too_fast": 4, "ignored_retry_after": 0, "disallowed": 1})
+        self.assertEqual(stats[self.hosts[1].removeprefix("http://")]["requests"], 0)
+
+    async def test_throttling(self):
+        self.web.cfg.throttle_rate = 1.0
+        status, _ = await self.get(f"{self.hosts[0]}/p/1")
+        self.assertEqual(status, 429)
+        await self.get(f"{self.hosts[0]}/p/1")
+        self.assertEqual(self.web.stats[self.hosts[0].removeprefix("http://")].ignored_retry_after, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,59 @@ class TestWorkersTasks(unittest.TestCase):
         _ = tasks.app
         self.assertTrue(True)
 
+    def test_crawl_from_frontier_acks_successes_and_releases_failures(self):
+        import asyncio
+        from unittest.mock import AsyncMock, MagicMock, patch
+
+        frontier = MagicMock()
+        frontier.claim.return_value = ["https://ex.com/ok", "https://ex.com/bad"]
+        frontier.complete.return_value = True
+
+        async def crawl(client, job, url, renderer=None):
+            if url.endswith("bad"):
+                raise RuntimeError("boom")
+            return {"url": url}
+
+        ctx = AsyncMock()
+        with patch.object(tasks, "http_client", return_value=ctx), patch.object(tasks, "_crawl", side_effect=crawl):
+            out = asyncio.run(tasks.crawl_from_frontier(frontier, {"source": "s", "country": "MZ"}, batch=2))
+        self.assertEqual(out, [{"url": "https://ex.com/ok"}])
+        frontier.complete.assert_called_once_with("https://ex.com/ok")
+        frontier.release.assert_called_once_with("https://ex.com/bad", delay=60.0)
+
+
+    def test_crawl_from_frontier_renews_leases_of_later_urls(self):
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+
+        try:
+            import fakeredis  # type: ignore
+        except Exception:
+            self.skipTest("fakeredis not installed")
+        from crawler.core import frontier as frontier_mod
+
+        clock = [1000.0]
+        r = fakeredis.FakeRedis(decode_responses=True)
+        mine = frontier_mod.Frontier(r, "s", "MZ", worker_id="a", lease_seconds=300)
+        other = frontier_mod.Frontier(r, "s", "MZ", worker_id="b", lease_seconds=300)
+        urls = [f"https://ex.com/{i}" for i in range(3)]
+        mine.add(urls, not_before=0)
+        stolen = []
+
+        async def crawl(client, job, url, renderer=None):
+            stolen.extend(other.claim(3))  # another worker polls while this one is busy
+            clock[0] += 200  # slow fetch: retries, politeness delay, render timeout
+            return {"url": url}
+
+        with patch.object(frontier_mod, "time", types.SimpleNamespace(time=lambda: clock[0])), \
+             patch.object(tasks, "http_client", return_value=AsyncMock()), \
+             patch.object(tasks, "_crawl", side_effect=crawl):
+            out = asyncio.run(tasks.crawl_from_frontier(mine, {"source": "s", "country": "MZ"}, batch=3))
+        # The batch outlives one lease (600s > 300s), yet no URL was handed to the other worker
+        self.assertEqual(stolen, [])
+        self.assertEqual([o["url"] for o in out], urls)
+        self.assertEqual(mine.stats()["leased"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
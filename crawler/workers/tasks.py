@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import logging
 import os
+from contextlib import AsyncExitStack
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # Optional Celery integration; provide a no-op fallback if Celery isn't installed
 try:
@@ -10,11 +12,16 @@ try:
 except Exception:  # pragma: no cover
     Celery = None  # type: ignore
 
+from ..core.encoding import decode_response
 from ..core.fetch import fetch, http_client
-from ..core.render import render_html, RenderNotAvailable
+from ..core.parse import parse_article
+from ..core.render import RenderNotAvailable, RenderPool, needs_render, render_html
+from ..ops.metrics import render_decisions_total
 from ..pipelines.article import to_article
 
 
+log = logging.getLogger("crawler.workers")
+
 BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 
 if Celery:
@@ -23,6 +30,72 @@ else:  # pragma: no cover
     app = None  # type: ignore
 
 
+async def _crawl(client, job: dict, url: str, renderer: Optional[RenderPool] = None) -> dict:
+    # Static first: with job["render"] only pages whose static HTML lacks the article go to the browser
+    r = await fetch(url, client)
+    html = decode_response(r).text
+    parsed = parse_article(html)
+    if job.get("render"):
+        reason = needs_render(html, parsed)
+        render_decisions_total.labels(source=job.get("source"), country=job.get("country"),
+                                      decision=reason or "static").inc()
+        if reason:
+            try:
+                html = await renderer.render(url) if renderer is not None else await render_html(url, fallback_to_fetch=False)
+                parsed = parse_article(html)
+            except Exception as exc:
+                # Keep the static result; RenderNotAvailable means Playwright/browsers are missing
+                level = logging.INFO if isinstance(exc, RenderNotAvailable) else logging.WARNING
+                log.log(level, "render_failed", extra={"detail": f"{url}: {exc}"})
+    art = to_article(url, None, country=job.get("country"), language=job.get("language"), source=job.get("source"),
+                     parsed=parsed)
+    return art.model_dump()
+
+
+async def crawl_from_frontier(frontier, job: dict, batch: int = 20, retry_delay: float = 60.0) -> List[dict]:
+    """Claim up to ``batch`` URLs from a shared Frontier, crawl them and ack each.
+
+    Each URL's lease is renewed right before it is crawled, so URLs late in
+    the batch do not expire while earlier ones fetch, retry or render. Failed
+    URLs are released back to the frontier after ``retry_delay`` seconds (or
+    dead-lettered after too many attempts). Under memory pressure
+    (ops.memory) the batch is halved, or nothing is claimed at all.
+    """
+    from ..ops.memory import HARD, SOFT, get_budget
+
+    out: List[dict] = []
+    budget = get_budget()
+    level = budget.check() if budget is not None else 0
+    if level == HARD:
+        # Pause: leave URLs in the frontier for workers with headroom
+        log.warning("frontier_paused", extra={"detail": "memory pressure"})
+        return out
+    urls = frontier.claim(max(1, batch // 2) if level == SOFT else batch)
+    if not urls:
+        return out
+    async with AsyncExitStack() as stack:
+        client = await stack.enter_async_context(http_client())
+        # One browser for the whole batch, launched only if some page needs it
+        renderer = await stack.enter_async_context(RenderPool()) if job.get("render") else None
+        for url in urls:
+            if not frontier.renew(url):
+                # Expired and reclaimed while earlier URLs were crawled: the new owner fetches it
+                log.warning("frontier_lease_lost", extra={"detail": url})
+                continue
+            try:
+                result = await _crawl(client, job, url, renderer)
+            except Exception:
+                log.warning("frontier_fetch_failed", extra={"detail": url}, exc_info=True)
+                frontier.release(url, delay=retry_delay)
+                continue
+            if frontier.complete(url):
+                out.append(result)
+            else:
+                # Lease expired and another worker reclaimed the URL; its result wins
+                log.warning("frontier_lease_lost", extra={"detail": url})
+    return out
+
+
 if app:
     @app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
     def crawl_url(self, job: dict, url: str):  # type: ignore
@@ -34,17 +107,38 @@ if app:
 
         async def _run():
             async with http_client() as client:
-                if job.get("render"):
-                    try:
-                        html = await render_html(url)
-                    except RenderNotAvailable:
-                        # Fallback: simple fetch text
-                        r = await fetch(url, client)
-                        html = r.text
-                else:
-                    r = await fetch(url, client)
-                    html = r.text
-                art = to_article(url, html, country=job.get("country"), language=job.get("language"), source=job.get("source"))
-                return art.model_dump()
+                if not job.get("render"):
+                    return await _crawl(client, job, url)
+                async with RenderPool(concurrency=1) as renderer:
+                    return await _crawl(client, job, url, renderer)
 
         return asyncio.run(_run())
+
+    try:
+        from celery.signals import worker_process_init  # type: ignore
+    except Exception:  # pragma: no cover
+        worker_process_init = None  # type: ignore
+
+    if worker_process_init is not None:
+        @worker_process_init.connect
+        def _start_memory_watchdog(**_):  # type: ignore
+            # Per pool process, after fork: threads do not survive fork
+            from ..ops.memory import get_budget
+
+            budget = get_budget()
+            if budget is not None:
+                budget.start_watchdog()
+
+    @app.task
+    def crawl_frontier_batch(job: dict, batch: int = 20):  # type: ignore
+        """Crawl a batch claimed from the shared Redis frontier of ``job``'s source/country.
+
+        Any number of workers can run this concurrently without fetching the
+        same URL twice.
+        """
+        import asyncio
+
+        from ..core.frontier import Frontier, redis_client
+
+        frontier = Frontier(redis_client(), job["source"], job["country"])
+        return asyncio.run(crawl_from_frontier(frontier, job, batch))